@@ -4,7 +4,6 @@ import socket
 from dotenv import load_dotenv
 load_dotenv()  # Cargar variables de entorno desde .env
 
-import queue
 import re
 import secrets
 import threading
@@ -12,10 +11,12 @@ import urllib.error
 import urllib.parse
 import urllib.request
 import uuid
+import hashlib
 import json
+import math
 import time
 from collections import defaultdict
-from datetime import datetime
+from datetime import datetime, timezone
 from functools import wraps
 
 from flask import (
@@ -23,22 +24,35 @@ from flask import (
     Response,
     abort,
     jsonify,
+    make_response,
     redirect,
     render_template,
     request,
+    send_file,
     session,
     stream_with_context,
     url_for,
 )
+from werkzeug.http import is_resource_modified
 
+import config
 from db import init_db
-from repositories.client_repository import ClientRepository
+from repositories.client_repository import VALID_ACTIVITY_TIPOS, ClientRepository
 from repositories.interest_repository import InterestRepository
-from repositories.property_repository import PropertyRepository
+from repositories.match_repository import MatchRepository
+from repositories.pagination import TOTAL_MODES
+from repositories.portfolio_repository import EXPORT_SECTIONS, PortfolioRepository, iter_ndjson
+from repositories.property_repository import RANGE_FILTERS, PropertyRepository
 from repositories.user_repository import UserRepository
 from services.auth_service import AuthService
+from services.cache_utils import normalize_url
 from services.client_service import sanitize_client_payload
+from services.image_cache import ImageCache
+from services.job_scheduler import JobScheduler
+from services.job_store import create_job_store
 from services.property_service import PropertyService
+from services.render_cache import RenderCache
+from services.scrape_cache import ScrapeCache
 from services.scraper_service import ScraperService
 
 
@@ -59,7 +73,8 @@ if not _secret:
     )
 app.secret_key = _secret
 
-init_db()
+# init_db() no corre al importar: lo hace el master de gunicorn (gunicorn.conf.py) una
+# sola vez antes de levantar los workers, o el bloque __main__ con el server de desarrollo.
 
 
 @app.teardown_appcontext
@@ -70,6 +85,15 @@ def _close_db(exc):
         db.close()
 
 
+@app.before_request
+def _hide_static_dotfiles():
+    # Los manifiestos de fotos (.blobs.json) y otros archivos ocultos no se sirven.
+    if request.endpoint == "static":
+        filename = (request.view_args or {}).get("filename") or ""
+        if any(part.startswith(".") for part in re.split(r"[\\/]", filename)):
+            abort(404)
+
+
 @app.after_request
 def _set_security_headers(response):
     response.headers["X-Content-Type-Options"] = "nosniff"
@@ -77,13 +101,38 @@ def _set_security_headers(response):
     response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
     return response
 
+render_cache = RenderCache(
+    config.RENDER_CACHE_DIR,
+    memory_entries=config.RENDER_CACHE_MEMORY_ENTRIES,
+    disk_enabled=config.RENDER_CACHE_DISK,
+)
 user_repo = UserRepository()
-property_repo = PropertyRepository()
+property_repo = PropertyRepository(on_change=render_cache.invalidate)
 client_repo = ClientRepository()
 interest_repo = InterestRepository()
+match_repo = MatchRepository(budget_tolerance=config.MATCH_BUDGET_TOLERANCE)
 auth_service = AuthService(user_repo)
-scraper_service = ScraperService()
-property_service = PropertyService(property_repo, base_dir=BASE_DIR)
+scraper_service = ScraperService(
+    payload_cache=ScrapeCache(
+        config.FIRECRAWL_CACHE_DIR,
+        ttl_seconds=config.FIRECRAWL_CACHE_TTL_SECONDS,
+        mode=config.FIRECRAWL_CACHE_MODE,
+        max_bytes=config.FIRECRAWL_CACHE_MAX_BYTES,
+    )
+)
+property_service = PropertyService(
+    property_repo,
+    base_dir=BASE_DIR,
+    download_workers=config.IMAGE_DOWNLOAD_WORKERS,
+    per_host_concurrency=config.IMAGE_DOWNLOAD_PER_HOST,
+    download_deadline_seconds=config.IMAGE_DOWNLOAD_DEADLINE_SECONDS,
+)
+portfolio_repo = PortfolioRepository(batch_size=config.PORTFOLIO_BATCH_SIZE, images=property_service)
+image_cache = ImageCache(
+    config.IMAGE_CACHE_DIR,
+    max_bytes=config.IMAGE_CACHE_MAX_BYTES,
+    ttl_seconds=config.IMAGE_CACHE_TTL_SECONDS,
+)
 
 # ── CSRF ──────────────────────────────────────
 def _get_csrf_token():
@@ -127,18 +176,30 @@ def _record_login_attempt(key: str):
     _login_attempts[key].append(time.time())
 
 
-JOBS: dict = {}
-_jobs_lock = threading.Lock()
+job_store = create_job_store(config.JOB_STORE, poll_interval=config.JOB_STORE_POLL_SECONDS)
 _JOB_TTL_SECONDS = 600  # 10 min
-_JOB_HARD_TIMEOUT_SECONDS = 180
+_JOB_HARD_TIMEOUT_SECONDS = config.GENERATION_HARD_TIMEOUT_SECONDS
+_QUEUE_MARKER = "__QUEUE__:"
+# El job acaba de quedarse con la URL: lo que escribió antes es de cuando él también esperaba.
+_FLIGHT_LEADER_MARKER = "__FLIGHT_LEADER__"
+# Un scrape que no libera su URL en este tiempo (proceso caído) deja de bloquear a otros.
+_FLIGHT_TTL_SECONDS = _JOB_HARD_TIMEOUT_SECONDS + 60
+# Un job sin terminar se da por perdido recién cuando ni la cola llena ni el tope de
+# duración explican que siga abierto; los terminados duran _JOB_TTL_SECONDS.
+_JOB_ABANDONED_SECONDS = (
+    (config.GENERATION_MAX_PENDING // max(1, config.GENERATION_WORKERS) + 2) * _JOB_HARD_TIMEOUT_SECONDS
+    + _JOB_TTL_SECONDS
+)
+
+generation_scheduler = JobScheduler(
+    max_workers=config.GENERATION_WORKERS,
+    max_pending=config.GENERATION_MAX_PENDING,
+    thread_name_prefix="generar",
+)
 
 
 def _cleanup_stale_jobs():
-    now = time.time()
-    with _jobs_lock:
-        stale = [k for k, v in JOBS.items() if now - v.get("created_at", now) > _JOB_TTL_SECONDS]
-        for k in stale:
-            JOBS.pop(k, None)
+    job_store.cleanup(_JOB_TTL_SECONDS, _JOB_ABANDONED_SECONDS)
 
 
 def get_user(username: str):
@@ -393,6 +454,19 @@ def cambiar_password():
     return jsonify({"ok": True})
 
 
+@app.route("/api/admin/cache", methods=["GET"])
+@admin_required
+def cache_stats():
+    return jsonify({"render": render_cache.stats()})
+
+
+@app.route("/api/admin/generacion", methods=["GET"])
+@admin_required
+def generation_stats():
+    # Por proceso: cada worker de gunicorn tiene su propio pool.
+    return jsonify(generation_scheduler.stats())
+
+
 @app.route("/api/admin/usuarios", methods=["GET"])
 @admin_required
 def listar_usuarios():
@@ -475,52 +549,62 @@ def generar():
 
     _cleanup_stale_jobs()
     job_id = uuid.uuid4().hex
-    log_queue = queue.Queue()
-    with _jobs_lock:
-        JOBS[job_id] = {
-            "queue": log_queue,
-            "status": "running",
-            "result_url": None,
-            "error_message": None,
-            "user": username,
-            "created_at": time.time(),
-        }
-
-    threading.Thread(
-        target=_run_generation,
-        args=(job_id, url_prop, nombre, whatsapp, form_url),
-        daemon=True,
-    ).start()
-    return jsonify({"job_id": job_id})
+    job_store.create(job_id, username)
+
+    def report_position(position: int) -> None:
+        job_store.append(job_id, f"{_QUEUE_MARKER}{position}")
+
+    position = generation_scheduler.submit(
+        _run_generation,
+        job_id, username, url_prop, nombre, whatsapp, form_url,
+        on_position=report_position,
+    )
+    if position is None:
+        job_store.delete(job_id)
+        return jsonify({"error": "Hay demasiadas fichas en proceso. Probá de nuevo en unos minutos."}), 429
+    return jsonify({"job_id": job_id, "queue_position": position})
 
 
 @app.route("/api/stream/<job_id>")
 @login_required
 def stream(job_id):
-    with _jobs_lock:
-        job = JOBS.get(job_id)
+    job = job_store.get(job_id)
     if not job or job.get("user") != session["username"]:
         abort(403)
 
+    # Cortar el stream no borra el job (lo hace la limpieza, _JOB_TTL_SECONDS después de
+    # terminar): al reconectar, EventSource manda el último `id` y se sigue desde ahí.
+    try:
+        after_seq = max(0, int(request.headers.get("Last-Event-ID") or 0))
+    except ValueError:
+        after_seq = 0
+
     def generate():
-        try:
-            while True:
-                try:
-                    msg = job["queue"].get(timeout=30)
+        # El job puede estar corriendo en otro proceso: se sigue su log por seq.
+        last_seq = after_seq
+        while True:
+            lines = job_store.read_lines(job_id, after_seq=last_seq, timeout=30)
+            if not lines:
+                if job_store.get(job_id) is None:
+                    yield "event: failed\ndata: El proceso ya no está disponible\n\n"
+                    break
+                yield "data: trabajando...\n\n"
+                continue
+            for last_seq, msg in lines:
+                if msg in ("__DONE__", "__ERROR__"):
+                    final = job_store.get(job_id) or {}
                     if msg == "__DONE__":
-                        result = job.get("result_url") or ""
-                        yield f"event: done\ndata: {result}\n\n"
-                        break
-                    if msg == "__ERROR__":
-                        error_msg = (job.get("error_message") or "Error inesperado").replace("\n", " ")
-                        yield f"event: failed\ndata: {error_msg}\n\n"
-                        break
-                    yield f"data: {msg.replace(chr(10), ' ')}\n\n"
-                except queue.Empty:
-                    yield "data: trabajando...\n\n"
-        finally:
-            with _jobs_lock:
-                JOBS.pop(job_id, None)
+                        yield f"id: {last_seq}\nevent: done\ndata: {final.get('result_url') or ''}\n\n"
+                    else:
+                        error_msg = (final.get("error_message") or "Error inesperado").replace("\n", " ")
+                        yield f"id: {last_seq}\nevent: failed\ndata: {error_msg}\n\n"
+                    return
+                if msg.startswith(_QUEUE_MARKER):
+                    yield f"id: {last_seq}\nevent: queue\ndata: {msg[len(_QUEUE_MARKER):]}\n\n"
+                    continue
+                if msg.startswith("__"):
+                    continue  # otras marcas internas (_FLIGHT_LEADER_MARKER)
+                yield f"id: {last_seq}\ndata: {msg.replace(chr(10), ' ')}\n\n"
 
     return Response(
         stream_with_context(generate()),
@@ -529,8 +613,66 @@ def stream(job_id):
     )
 
 
+_PROPERTY_TEMPLATE_PATH = os.path.join(app.root_path, app.template_folder or "templates", "property_detail.html")
+
+
+def _property_content_version(version: dict) -> str:
+    # El HTML depende de la fila y del template desplegado.
+    try:
+        template_stamp = int(os.path.getmtime(_PROPERTY_TEMPLATE_PATH))
+    except OSError:
+        template_stamp = 0
+    return f"{version['updated_at']}|{template_stamp}"
+
+
+def _property_etag(version: dict, content_version: str, is_owner: bool) -> str:
+    raw = f"{version['id']}|{content_version}|{int(is_owner)}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:24]
+
+
+def _property_last_modified(version: dict) -> datetime | None:
+    try:
+        # updated_at se guarda en hora local sin zona (datetime.now().isoformat()).
+        return datetime.fromisoformat(version["updated_at"]).astimezone(timezone.utc)
+    except (TypeError, ValueError):
+        return None
+
+
+def _conditional_property_response(version: dict):
+    """Responde 304 si el cliente ya tiene esta versión de la ficha; si no, la renderiza."""
+    is_owner = session.get("username") == version["owner_username"]
+    content_version = _property_content_version(version)
+    etag = _property_etag(version, content_version, is_owner)
+    last_modified = _property_last_modified(version)
+    # Decide solo el ETag: Last-Modified va en segundos y updated_at en microsegundos, así
+    # que con If-Modified-Since dos ediciones en el mismo segundo darían un 304 viejo.
+    if not is_resource_modified(request.environ, etag=etag):
+        response = Response(status=304)
+    else:
+        html = render_cache.get(version["id"], is_owner, content_version)
+        if html is None:
+            html = _render_property_detail(version["id"], is_owner)
+            render_cache.put(version["id"], is_owner, content_version, html)
+        response = make_response(html)
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    if is_owner:
+        response.cache_control.private = True
+    response.vary.add("Cookie")
+    return response
+
+
 @app.route("/propiedad/<int:property_id>")
 def property_detail(property_id: int):
+    version = property_repo.get_version(property_id)
+    if not version:
+        abort(404)
+    return _conditional_property_response(version)
+
+
+def _render_property_detail(property_id: int, is_owner: bool) -> str:
     prop = property_repo.get_property(property_id)
     if not prop:
         abort(404)
@@ -552,7 +694,6 @@ def property_detail(property_id: int):
     info_adicional = prop.get("info_adicional", {}) or {}
     map_embed_url, maps_url, map_location_label = _build_property_map_context(prop, detalles, info_adicional)
 
-    is_owner = session.get("username") == prop.get("owner_username")
     return render_template(
         "property_detail.html",
         prop=prop,
@@ -570,6 +711,9 @@ def property_detail(property_id: int):
     )
 
 
+_PROXY_IMAGE_MAX_AGE = 3600
+
+
 @app.route("/proxy-image")
 def proxy_image():
     image_url = (request.args.get("url") or "").strip()
@@ -581,6 +725,15 @@ def proxy_image():
         abort(400)
     referer_url = re.sub(r"[\r\n]", "", referer_url)
 
+    cached = image_cache.get(image_url)
+    if cached:
+        cached_path, cached_type = cached
+        try:
+            return send_file(cached_path, mimetype=cached_type, max_age=_PROXY_IMAGE_MAX_AGE)
+        except OSError:
+            # Otro worker la desalojó entre el get y el envío: se vuelve a bajar.
+            pass
+
     origin = PropertyService._origin_from_url(referer_url)
     header_sets = [
         PropertyService._image_request_headers(referer_url=referer_url, origin=origin, include_referer=True),
@@ -594,7 +747,12 @@ def proxy_image():
             with urllib.request.urlopen(req, timeout=30) as response:
                 data = response.read()
                 content_type = (response.headers.get_content_type() or "").lower() or "image/jpeg"
-            return Response(data, mimetype=content_type, headers={"Cache-Control": "public, max-age=3600"})
+            image_cache.put(image_url, data, content_type)
+            return Response(
+                data,
+                mimetype=content_type,
+                headers={"Cache-Control": f"public, max-age={_PROXY_IMAGE_MAX_AGE}"},
+            )
         except Exception as exc:
             last_error = exc
 
@@ -603,20 +761,68 @@ def proxy_image():
     abort(502)
 
 
+def _int_arg(name: str, default: int) -> int:
+    raw = (request.args.get(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        raise ValueError(f"{name} debe ser un número entero") from None
+
+
+def _pagination_args(default_per_page: int) -> dict:
+    """page/per_page (offset) o cursor (keyset). `total` = exact|cached|none; con cursor
+    el total por defecto sale del caché para no recontar en cada página."""
+    per_page = min(100, max(1, _int_arg("per_page", default_per_page)))
+    cursor = (request.args.get("cursor") or "").strip() or None
+    total_mode = (request.args.get("total") or "").strip().lower()
+    if total_mode not in TOTAL_MODES:
+        total_mode = "cached" if cursor else "exact"
+    page = max(1, _int_arg("page", 1))
+    return {
+        "limit": per_page,
+        "offset": 0 if cursor else (page - 1) * per_page,
+        "cursor": cursor,
+        "total_mode": total_mode,
+    }
+
+
+def _range_args() -> dict[str, float]:
+    """Filtros por rango de /propiedades (precio_min, m2_max, ...). Vacíos se ignoran."""
+    ranges = {}
+    for name in RANGE_FILTERS:
+        raw = (request.args.get(name) or "").strip().replace(",", ".")
+        if not raw:
+            continue
+        try:
+            value = float(raw)
+        except ValueError:
+            value = math.nan
+        # float() también acepta "nan" e "inf", que no sirven como límite.
+        if not math.isfinite(value):
+            raise ValueError(f"{name} debe ser un número")
+        ranges[name] = value
+    return ranges
+
+
 @app.route("/propiedades")
 @login_required
 def properties_list():
     username = session["username"]
-    page = max(1, int(request.args.get("page") or 1))
-    per_page = min(100, max(1, int(request.args.get("per_page") or 20)))
     search = (request.args.get("q") or "").strip()
     portal = (request.args.get("portal") or "").strip()
-    result = property_repo.list_properties(
-        limit=per_page, offset=(page - 1) * per_page,
-        owner_username=username,
-        source_portal=portal or None,
-        search=search,
-    )
+    try:
+        result = property_repo.list_properties(
+            owner_username=username,
+            source_portal=portal or None,
+            search=search,
+            ranges=_range_args(),
+            moneda=(request.args.get("moneda") or "USD").strip().upper(),
+            **_pagination_args(20),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     return jsonify(result)
 
 
@@ -704,9 +910,12 @@ def list_clients():
     username = session["username"]
     search = (request.args.get("q") or "").strip()
     estado = (request.args.get("estado") or "").strip()
-    page = max(1, int(request.args.get("page") or 1))
-    per_page = min(100, max(1, int(request.args.get("per_page") or 50)))
-    result = client_repo.list_clients(owner_username=username, search=search, estado=estado, limit=per_page, offset=(page - 1) * per_page)
+    try:
+        result = client_repo.list_clients(
+            owner_username=username, search=search, estado=estado, **_pagination_args(50)
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     return jsonify(result)
 
 
@@ -793,7 +1002,7 @@ def add_client_activity(client_id: int):
     data = request.json or {}
     tipo = (data.get("tipo") or "nota").strip()
     texto = (data.get("texto") or "").strip()[:1000]
-    if tipo not in {"nota", "llamada", "visita", "whatsapp"}:
+    if tipo not in VALID_ACTIVITY_TIPOS:
         tipo = "nota"
     if not texto:
         return jsonify({"error": "Texto requerido"}), 400
@@ -859,6 +1068,64 @@ def interests_by_property(property_id: int):
     return jsonify(interest_repo.by_property(property_id, session["username"]))
 
 
+# ── Client-Property Matching ───────────────────
+def _match_limit() -> int:
+    try:
+        return min(100, max(1, int(request.args.get("limit") or 20)))
+    except ValueError:
+        return 20
+
+
+@app.route("/api/clientes/<int:client_id>/matches")
+@login_required
+def matches_for_client(client_id: int):
+    matches = match_repo.properties_for_client(client_id, session["username"], limit=_match_limit())
+    if matches is None:
+        return jsonify({"error": "Cliente no encontrado"}), 404
+    return jsonify(matches)
+
+
+@app.route("/api/propiedades/<int:property_id>/matches")
+@login_required
+def matches_for_property(property_id: int):
+    matches = match_repo.clients_for_property(property_id, session["username"], limit=_match_limit())
+    if matches is None:
+        return jsonify({"error": "Propiedad no encontrada"}), 404
+    return jsonify(matches)
+
+
+# ── Export / import NDJSON de la cartera ───────
+@app.route("/api/cartera/exportar")
+@login_required
+def export_portfolio():
+    raw = (request.args.get("secciones") or "").strip()
+    sections = [s.strip() for s in raw.split(",") if s.strip()] or list(EXPORT_SECTIONS)
+    unknown = [s for s in sections if s not in EXPORT_SECTIONS]
+    if unknown:
+        return jsonify({"error": f"Secciones inválidas: {', '.join(unknown)}"}), 400
+    username = session["username"]
+
+    def generate():
+        for record in portfolio_repo.iter_export(username, sections):
+            yield json.dumps(record, ensure_ascii=False) + "\n"
+
+    filename = f"cartera-{username}-{datetime.now():%Y%m%d}.ndjson"
+    return Response(
+        stream_with_context(generate()),
+        mimetype="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/api/cartera/importar", methods=["POST"])
+@login_required
+@csrf_protect
+def import_portfolio():
+    # El cuerpo es el NDJSON crudo: se lee línea por línea, sin cargarlo entero.
+    counts = portfolio_repo.import_records(session["username"], iter_ndjson(request.stream))
+    return jsonify({"ok": True, **counts})
+
+
 def _build_image_src(image: str, referer_url: str) -> str:
     value = (image or "").strip()
     if not re.match(r"^https?://", value, re.I):
@@ -867,14 +1134,11 @@ def _build_image_src(image: str, referer_url: str) -> str:
     return f"/proxy-image?{query}"
 
 
-def _run_generation(job_id, source_url, agent_name, agent_whatsapp, form_url):
-    with _jobs_lock:
-        job = JOBS[job_id]
-    q = job["queue"]
+def _run_generation(job_id, owner_username, source_url, agent_name, agent_whatsapp, form_url):
     started_at = time.time()
 
     def log(msg: str):
-        q.put(msg)
+        job_store.append(job_id, msg)
 
     def ensure_not_timed_out(stage: str) -> None:
         if time.time() - started_at > _JOB_HARD_TIMEOUT_SECONDS:
@@ -882,13 +1146,26 @@ def _run_generation(job_id, source_url, agent_name, agent_whatsapp, form_url):
                 f"El proceso superó el límite de {_JOB_HARD_TIMEOUT_SECONDS} segundos durante {stage}."
             )
 
+    flight_key = normalize_url(source_url)
     try:
         cached = property_service.property_repo.find_by_source_url(source_url)
+        # Si el dueño de la URL falla, los que esperaban vuelven a pedirla: uno solo la toma
+        # y scrapea, el resto sigue al nuevo dueño.
+        while not cached:
+            owner = job_store.claim_flight(flight_key, job_id, source_url, ttl_seconds=_FLIGHT_TTL_SECONDS)
+            if owner["job_id"] == job_id:
+                log(_FLIGHT_LEADER_MARKER)
+                break
+            log("Otro asesor está generando esta misma publicación. Esperando su resultado...")
+            _follow_flight(flight_key, owner["job_id"], log, ensure_not_timed_out)
+            cached = property_service.property_repo.find_by_source_url(owner["source_url"])
+            if not cached:
+                log("La otra generación no terminó bien. Reintentando...")
         if cached:
             log("Esta URL ya fue procesada anteriormente. Usando datos en caché (sin re-scrapear)...")
             property_id = property_service.save_from_cache(
                 source_url=source_url,
-                owner_username=job.get("user", "admin"),
+                owner_username=owner_username or "admin",
                 agent_name=agent_name or "Asesor",
                 agent_whatsapp=agent_whatsapp or "",
                 form_url=form_url or "",
@@ -903,7 +1180,7 @@ def _run_generation(job_id, source_url, agent_name, agent_whatsapp, form_url):
             log("Scraping listo. Guardando propiedad e imágenes...")
             property_id = property_service.save_scraped_property(
                 source_url=source_url,
-                owner_username=job.get("user", "admin"),
+                owner_username=owner_username or "admin",
                 agent_name=agent_name or "Asesor",
                 agent_whatsapp=agent_whatsapp or "",
                 form_url=form_url or "",
@@ -913,53 +1190,99 @@ def _run_generation(job_id, source_url, agent_name, agent_whatsapp, form_url):
         ensure_not_timed_out("guardado")
         prop_data = property_repo.get_property(property_id)
         token = prop_data.get("public_token") if prop_data else None
-        job["result_url"] = f"/p/{token}" if token else f"/propiedad/{property_id}"
-        job["status"] = "done"
+        result_url = f"/p/{token}" if token else f"/propiedad/{property_id}"
+        matches = match_repo.clients_for_property(property_id, owner_username or "admin", limit=100) or []
+        if matches:
+            log(f"{len(matches)} cliente(s) de tu cartera buscan una propiedad así.")
+        job_store.finish(job_id, "done", result_url=result_url)
         log("Proceso completado")
-        q.put("__DONE__")
+        log("__DONE__")
     except Exception as e:
         friendly_error = _format_error_message(e)
         log(f"Error: {friendly_error}")
-        job["status"] = "error"
-        job["error_message"] = friendly_error
-        q.put("__ERROR__")
-
+        job_store.finish(job_id, "error", error_message=friendly_error)
+        log("__ERROR__")
+    finally:
+        job_store.release_flight(flight_key, job_id)
+
+
+# Líneas del dueño sobre su propia ficha o su final (ids, clientes de su cartera, cierre):
+# el seguidor escribe las suyas al guardar su ficha.
+_FLIGHT_PRIVATE_LINE_RE = re.compile(r"__|Propiedad guardada|Proceso completado|Error: |\d+ cliente\(s\) de tu cartera")
+
+
+def _follow_flight(flight_key, leader_job_id, log, ensure_not_timed_out):
+    """Repite el progreso del job que ya está scrapeando la URL hasta que la libera.
+
+    El seguidor sigue ocupando su lugar en generation_scheduler mientras espera (y cuenta
+    para el 429): no puede trabarse, porque el dueño ya está corriendo, y la espera no pasa
+    de _JOB_HARD_TIMEOUT_SECONDS.
+    """
+    last_seq = 0
+    leading = False
+    while True:
+        lines = job_store.read_lines(leader_job_id, after_seq=last_seq, timeout=1.0)
+        for last_seq, msg in lines:
+            if msg == _FLIGHT_LEADER_MARKER:
+                leading = True
+            elif leading and not _FLIGHT_PRIVATE_LINE_RE.match(msg):
+                log(msg)
+        owner = job_store.get_flight(flight_key)
+        if not owner or owner["job_id"] != leader_job_id:
+            return
+        ensure_not_timed_out("la espera de la otra generación")
+        if not lines and job_store.get(leader_job_id) is None:
+            # El job del otro ya se limpió: solo queda esperar que libere la URL.
+            time.sleep(config.JOB_STORE_POLL_SECONDS)
 
 
 @app.route("/p/<token>")
 def public_property(token: str):
-    prop = property_repo.find_by_token(token)
-    if not prop:
+    version = property_repo.find_version_by_token(token)
+    if not version:
         abort(404)
-    return property_detail(prop["id"])
+    return _conditional_property_response(version)
+
+
+_SHOWCASE_TTL_SECONDS = 60
+_showcase_cache: dict = {"expires_at": 0.0, "cards": []}
+_showcase_lock = threading.Lock()
+
+
+def _showcase_cards() -> list[dict]:
+    # La landing recibe picos de tráfico y las fichas demo casi no cambian.
+    now = time.monotonic()
+    with _showcase_lock:
+        if _showcase_cache["expires_at"] > now:
+            return _showcase_cache["cards"]
+
+    cards = []
+    for card in property_repo.list_showcase_cards(owner_username="demo", limit=10):
+        first_image = card["first_image"] or PropertyService._placeholder_svg_url()
+        cards.append({
+            "id": card["id"],
+            "titulo": card["titulo"],
+            "precio": card["precio"],
+            "ubicacion": card["ubicacion"],
+            "public_token": card["public_token"],
+            "portal": card["source_portal"],
+            "thumb": _build_image_src(first_image, card["source_url"]),
+            "n_fotos": card["photo_count"] or 1,
+            "detalles": card["detalles"],
+        })
+    with _showcase_lock:
+        _showcase_cache.update(expires_at=now + _SHOWCASE_TTL_SECONDS, cards=cards)
+    return cards
 
 
 @app.route("/showcase")
 def showcase():
-    data = property_repo.list_properties(limit=10, owner_username="demo")
-    props = data.get("items", [])
-    # Resolver imagen principal de cada propiedad para las cards
-    showcased = []
-    for p in props:
-        full = property_repo.get_property(p["id"])
-        if not full:
-            continue
-        images = _resolve_property_images(full)
-        showcased.append({
-            "id": full["id"],
-            "titulo": full["titulo"],
-            "precio": full["precio"],
-            "ubicacion": full["ubicacion"],
-            "public_token": full["public_token"],
-            "portal": full.get("source_portal", "zonaprop"),
-            "thumb": images[0] if images else "",
-            "n_fotos": len(images),
-            "detalles": full.get("detalles", {}),
-        })
-    return render_template("showcase.html", props=showcased)
+    return render_template("showcase.html", props=_showcase_cards())
 
 
 
 if __name__ == "__main__":
+    # Server de desarrollo (un proceso). En producción: gunicorn -c gunicorn.conf.py
+    init_db()
     port = int(os.environ.get("PORT", 8080))
-    app.run(host="0.0.0.0", port=port, debug=False)
+    app.run(host="0.0.0.0", port=port, debug=False, threaded=True)
@@ -0,0 +1,140 @@
+"""
+Benchmark: throughput de lecturas/escrituras mezcladas en SQLite.
+
+Compara la configuración anterior (rollback journal, synchronous=FULL, una conexión
+nueva por llamada) contra la actual (WAL, synchronous=NORMAL, pragmas de caché/mmap y
+conexión reutilizada por hilo). Cada modo corre sobre una base temporal propia.
+
+Uso: python benchmarks/bench_db.py [--seconds 5] [--readers 4] [--writers 2]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import db
+from repositories.property_repository import PropertyRepository
+
+
+MODES = {
+    "legacy": {
+        "DB_JOURNAL_MODE": "DELETE",
+        "DB_SYNCHRONOUS": "FULL",
+        "DB_CACHE_SIZE_KB": 2000,
+        "DB_MMAP_SIZE_BYTES": 0,
+        "DB_REUSE_THREAD_CONNECTIONS": False,
+    },
+    "tuned": {
+        "DB_JOURNAL_MODE": db.DB_JOURNAL_MODE,
+        "DB_SYNCHRONOUS": db.DB_SYNCHRONOUS,
+        "DB_CACHE_SIZE_KB": db.DB_CACHE_SIZE_KB,
+        "DB_MMAP_SIZE_BYTES": db.DB_MMAP_SIZE_BYTES,
+        "DB_REUSE_THREAD_CONNECTIONS": True,
+    },
+}
+
+
+def _sample_payload(i: int) -> dict:
+    return {
+        "owner_username": f"agente{i % 5}",
+        "titulo": f"Departamento 3 ambientes #{i}",
+        "precio": "USD 150.000",
+        "ubicacion": "Palermo, Capital Federal",
+        "descripcion": "Luminoso, balcón al frente. " * 20,
+        "detalles": {"ambientes": "3", "metros_totales": "70"},
+        "caracteristicas": ["Balcón", "Luminoso"],
+        "image_paths": [f"/static/properties/{i}/{n:02d}.jpg" for n in range(1, 21)],
+        "agent_name": "Asesor",
+        "agent_whatsapp": "5491100000000",
+        "source_url": f"https://www.zonaprop.com.ar/aviso-{i}.html",
+    }
+
+
+def run_mode(name: str, seconds: float, readers: int, writers: int, seed_rows: int) -> dict:
+    for key, value in MODES[name].items():
+        setattr(db, key, value)
+    db.DB_PATH = os.path.join(tempfile.mkdtemp(prefix=f"bench_db_{name}_"), "bench.db")
+    db.init_db()
+
+    repo = PropertyRepository()
+    for i in range(seed_rows):
+        repo.create_property(_sample_payload(i))
+
+    stop = threading.Event()
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    counts_lock = threading.Lock()
+
+    def reader(worker: int) -> None:
+        local_reads = local_errors = 0
+        while not stop.is_set():
+            try:
+                repo.list_properties(limit=20, owner_username=f"agente{worker % 5}")
+                repo.get_property(1 + (local_reads % seed_rows))
+                local_reads += 2
+            except Exception:
+                local_errors += 1
+        with counts_lock:
+            counts["reads"] += local_reads
+            counts["errors"] += local_errors
+
+    def writer(worker: int) -> None:
+        local_writes = local_errors = 0
+        i = seed_rows + worker * 1_000_000
+        while not stop.is_set():
+            try:
+                property_id = repo.create_property(_sample_payload(i))
+                repo.update_image_paths(property_id, [f"/static/properties/{property_id}/01.jpg"])
+                local_writes += 2
+                i += 1
+            except Exception:
+                local_errors += 1
+        with counts_lock:
+            counts["writes"] += local_writes
+            counts["errors"] += local_errors
+
+    threads = [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    threads += [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "mode": name,
+        "reads_per_s": counts["reads"] / elapsed,
+        "writes_per_s": counts["writes"] / elapsed,
+        "errors": counts["errors"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seed-rows", type=int, default=500)
+    args = parser.parse_args()
+
+    results = [run_mode(name, args.seconds, args.readers, args.writers, args.seed_rows) for name in MODES]
+    print(f"{'modo':<8} {'lecturas/s':>12} {'escrituras/s':>14} {'errores':>8}")
+    for r in results:
+        print(f"{r['mode']:<8} {r['reads_per_s']:>12.0f} {r['writes_per_s']:>14.0f} {r['errors']:>8}")
+    legacy, tuned = results
+    if legacy["reads_per_s"] and legacy["writes_per_s"]:
+        print(
+            f"\nmejora: lecturas x{tuned['reads_per_s'] / legacy['reads_per_s']:.1f}, "
+            f"escrituras x{tuned['writes_per_s'] / legacy['writes_per_s']:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+Benchmark + regresión de la extracción heurística de ScraperService.
+
+Corre cada etapa de extracción sobre el corpus guardado en benchmarks/corpus/ (entradas
+con el formato de ScrapeCache: markdown/html/rawHtml/images de Firecrawl, sin red),
+reporta tiempo por etapa (mediana) y pico de memoria (tracemalloc), y compara los
+campos extraídos y el orden de la galería del DOM contra benchmarks/corpus/expected.json. Sale con código 1 si cambia
+algún campo o si una etapa supera --max-stage-ms.
+
+Uso:
+  python benchmarks/bench_extraction.py [--repeat 5] [--max-stage-ms 0]
+  python benchmarks/bench_extraction.py --page zonaprop-58812706  # solo esa página
+  python benchmarks/bench_extraction.py --update            # regraba expected.json
+  python benchmarks/bench_extraction.py --import-cache DIR  # suma capturas de FIRECRAWL_CACHE_DIR
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from services.listing_document import ListingDocument
+from services.scrape_cache import ScrapeCache
+from services.scraper_service import ScraperService
+
+
+CORPUS_DIR = os.path.join(BASE_DIR, "benchmarks", "corpus")
+EXPECTED_PATH = os.path.join(CORPUS_DIR, "expected.json")
+
+
+def _warm(document: ListingDocument) -> ListingDocument:
+    """Precalcula el parseo compartido para medir cada etapa sin su costo."""
+    for doc in (document, document.focused):
+        _ = doc.html_text, doc.scripts, doc.img_tags, doc.json_ld
+        doc.meta("og:title")
+    return document
+
+
+def _stages(scraper: ScraperService, page: dict[str, Any]) -> dict[str, Callable[[ListingDocument], Any]]:
+    url = page["url"]
+    portal = page["portal"]
+    listing_id = scraper._extract_listing_id_from_url(url)
+    return {
+        "listing_context": lambda doc: scraper._extract_listing_context(doc, listing_id),
+        "listing_payload": lambda doc: scraper._extract_listing_payload_from_html(doc, url),
+        "description": lambda doc: scraper._extract_description(
+            doc.focused.source_text, doc.focused, doc.source_text, doc
+        ),
+        "features": lambda doc: scraper._extract_features(doc.focused.source_text, doc.focused),
+        "details": lambda doc: (
+            scraper._extract_detail_candidates(doc.focused.source_text),
+            scraper._extract_detail_candidates_from_html(doc.focused),
+        ),
+        "location": lambda doc: scraper._extract_location_from_html(doc.focused),
+        "gallery": lambda doc: scraper._extract_ordered_gallery_image_urls_from_html(doc),
+        "next_data": lambda doc: scraper._extract_image_urls_from_next_data(doc),
+        "contextual_images": lambda doc: scraper._extract_contextual_image_urls_from_html(doc),
+        "select_images": lambda doc: scraper._select_image_urls(
+            portal=portal, document=doc, llm_urls=[], firecrawl_urls=page["images"]
+        ),
+    }
+
+
+def _extract_all(scraper: ScraperService, page: dict[str, Any]) -> dict[str, Any]:
+    """Mismo recorrido que scrape_property, sin red ni validación."""
+    document = ListingDocument(page["markdown"], page["html"])
+    extracted = scraper._build_fallback_from_content(document, page["url"])
+    extracted["image_urls"] = scraper._select_image_urls(
+        portal=page["portal"],
+        document=document,
+        llm_urls=extracted.pop("image_urls", []) or [],
+        firecrawl_urls=page["images"],
+    )
+    return extracted
+
+
+def _expected_fields(scraper: ScraperService, page: dict[str, Any]) -> dict[str, Any]:
+    """Lo que se compara contra expected.json: la extracción completa y el orden de la
+    galería del DOM, que fuera de ZonaProp no siempre llega a image_urls."""
+    fields = _extract_all(scraper, page)
+    document = ListingDocument(page["markdown"], page["html"])
+    fields["galeria_dom"] = scraper._extract_ordered_gallery_image_urls_from_html(document)
+    return fields
+
+
+def _paths(scraper: ScraperService, page: dict[str, Any]) -> tuple[str, str]:
+    """Camino que toma la página en el contexto del aviso y en la galería del DOM."""
+    document = ListingDocument(page["markdown"], page["html"])
+    listing_id = scraper._extract_listing_id_from_url(page["url"])
+    if scraper._extract_listing_object(document, listing_id):
+        context = "objeto JSON"
+    elif listing_id and listing_id in page["html"]:
+        context = "ventanas"
+    else:
+        context = "sin ID"
+    gallery = "índice de tokens" if scraper._gallery_uses_token_index(document) else "ventanas"
+    return context, gallery
+
+
+def load_corpus() -> list[dict[str, Any]]:
+    pages = []
+    for name in sorted(os.listdir(CORPUS_DIR)):
+        if not name.endswith(".json.gz"):
+            continue
+        entry = ScrapeCache._read(os.path.join(CORPUS_DIR, name)) or {}
+        payload = entry.get("payload") or {}
+        url = entry.get("url") or ""
+        pages.append({
+            "name": name[: -len(".json.gz")],
+            "url": url,
+            "portal": ScraperService._detect_portal(url),
+            "markdown": payload.get("markdown") or "",
+            "html": payload.get("raw_html") or payload.get("html") or "",
+            "images": payload.get("images") or [],
+        })
+    return pages
+
+
+def import_cache(cache_dir: str) -> int:
+    """Copia al corpus las respuestas de Firecrawl guardadas por ScrapeCache."""
+    os.makedirs(CORPUS_DIR, exist_ok=True)
+    imported = 0
+    cache = ScrapeCache(cache_dir, ttl_seconds=0, mode="replay")
+    for entry in cache.iter_entries():
+        url = entry.get("url") or ""
+        portal = ScraperService._detect_portal(url)
+        listing_id = ScraperService._extract_listing_id_from_url(url)
+        if portal == "unknown" or not listing_id:
+            continue
+        target = os.path.join(CORPUS_DIR, f"{portal}-{listing_id}.json.gz")
+        with open(target, "wb") as f:
+            f.write(gzip.compress(json.dumps(entry, ensure_ascii=False).encode("utf-8"), compresslevel=9))
+        imported += 1
+    return imported
+
+
+def measure(scraper: ScraperService, pages: list[dict[str, Any]], repeat: int) -> dict[str, dict[str, float]]:
+    results: dict[str, dict[str, float]] = {}
+
+    def record(stage: str, seconds: list[float], peak: int) -> None:
+        row = results.setdefault(stage, {"ms": 0.0, "peak_kb": 0.0})
+        row["ms"] += statistics.median(seconds) * 1000
+        row["peak_kb"] = max(row["peak_kb"], peak / 1024)
+
+    for page in pages:
+        # Parseo compartido (ListingDocument) medido aparte.
+        seconds = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            _warm(ListingDocument(page["markdown"], page["html"]))
+            seconds.append(time.perf_counter() - started)
+        record("document", seconds, _peak(lambda: _warm(ListingDocument(page["markdown"], page["html"]))))
+
+        for stage, fn in _stages(scraper, page).items():
+            seconds = []
+            for _ in range(repeat):
+                document = _warm(ListingDocument(page["markdown"], page["html"]))
+                started = time.perf_counter()
+                fn(document)
+                seconds.append(time.perf_counter() - started)
+            document = _warm(ListingDocument(page["markdown"], page["html"]))
+            record(stage, seconds, _peak(lambda: fn(document)))
+
+        seconds = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            _extract_all(scraper, page)
+            seconds.append(time.perf_counter() - started)
+        record("total", seconds, _peak(lambda: _extract_all(scraper, page)))
+    return results
+
+
+def _peak(fn: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def compare(actual: dict[str, Any], expected: dict[str, Any]) -> list[str]:
+    diffs = []
+    for name in sorted(set(actual) | set(expected)):
+        if name not in expected:
+            diffs.append(f"{name}: sin valores esperados (correr con --update)")
+            continue
+        if name not in actual:
+            diffs.append(f"{name}: falta en el corpus")
+            continue
+        for field in sorted(set(actual[name]) | set(expected[name])):
+            if actual[name].get(field) != expected[name].get(field):
+                got = re.sub(r"\s+", " ", json.dumps(actual[name].get(field), ensure_ascii=False))[:120]
+                diffs.append(f"{name}.{field}: cambió → {got}")
+    return diffs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-stage-ms", type=float, default=0.0, help="falla si una etapa supera este total (0 = sin límite)")
+    parser.add_argument("--page", action="append", default=[], metavar="NOMBRE", help="mide y compara solo esta página (repetible)")
+    parser.add_argument("--update", action="store_true", help="regraba expected.json con la salida actual")
+    parser.add_argument("--import-cache", metavar="DIR", help="copia entradas de ScrapeCache al corpus y sale")
+    args = parser.parse_args()
+
+    if args.import_cache:
+        print(f"importadas: {import_cache(args.import_cache)}")
+        return
+
+    pages = load_corpus()
+    if args.page:
+        pages = [page for page in pages if page["name"] in args.page]
+    if not pages:
+        print(f"sin páginas {', '.join(args.page)} en {CORPUS_DIR}" if args.page else f"corpus vacío en {CORPUS_DIR}")
+        sys.exit(1)
+
+    scraper = ScraperService()
+    actual = {page["name"]: _expected_fields(scraper, page) for page in pages}
+    if args.update:
+        if args.page:
+            print("--update regraba el corpus entero: correrlo sin --page")
+            sys.exit(1)
+        tmp_path = f"{EXPECTED_PATH}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(actual, f, ensure_ascii=False, indent=1, sort_keys=True)
+            f.write("\n")
+        os.replace(tmp_path, EXPECTED_PATH)
+        print(f"expected.json actualizado ({len(actual)} páginas)")
+        return
+
+    results = measure(scraper, pages, max(1, args.repeat))
+    total_kb = sum(len(p["html"]) + len(p["markdown"]) for p in pages) / 1024
+    print(f"corpus: {len(pages)} páginas, {total_kb:.0f} KB de HTML+Markdown\n")
+    print(f"{'página':<32} {'KB':>5} {'<img>':>6}  {'contexto':<12} galería")
+    for page in pages:
+        context, gallery = _paths(scraper, page)
+        img_count = len(ListingDocument(page["markdown"], page["html"]).img_tags)
+        print(f"{page['name']:<32} {len(page['html']) / 1024:>5.0f} {img_count:>6}  {context:<12} {gallery}")
+    print()
+    print(f"{'etapa':<18} {'ms (suma)':>10} {'pico KB':>10}")
+    for stage, row in results.items():
+        print(f"{stage:<18} {row['ms']:>10.1f} {row['peak_kb']:>10.0f}")
+
+    failures = []
+    if os.path.exists(EXPECTED_PATH):
+        with open(EXPECTED_PATH, "r", encoding="utf-8") as f:
+            expected = json.load(f)
+        if args.page:
+            expected = {name: fields for name, fields in expected.items() if name in args.page}
+        failures.extend(compare(json.loads(json.dumps(actual)), expected))
+    else:
+        failures.append("no existe expected.json (correr con --update)")
+    if args.max_stage_ms > 0:
+        failures.extend(
+            f"{stage}: {row['ms']:.1f} ms > {args.max_stage_ms:.1f} ms"
+            for stage, row in results.items()
+            if stage not in ("total", "document") and row["ms"] > args.max_stage_ms
+        )
+
+    if failures:
+        print("\nREGRESIONES:")
+        for line in failures:
+            print(f"  - {line}")
+        sys.exit(1)
+    print("\ncampos extraídos sin cambios")
+
+
+if __name__ == "__main__":
+    main()
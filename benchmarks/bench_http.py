@@ -0,0 +1,200 @@
+"""
+Prueba de carga HTTP: requests por segundo de /p/<token> y /propiedades.
+
+Levanta la app con gunicorn (gunicorn.conf.py) para cada cantidad de workers pedida,
+sobre una base temporal con propiedades sembradas, y le pega desde varios hilos
+clientes con conexiones keep-alive. Con --dev mide también el server de desarrollo
+(`python app.py`, un solo proceso) como referencia.
+
+Uso: python benchmarks/bench_http.py [--workers 1,2,4] [--threads 8] [--clients 16]
+                                     [--seconds 5] [--rows 200] [--dev]
+"""
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+ADMIN_PASSWORD = "bench-admin"
+
+
+def _seed(db_path: str, rows: int) -> list[str]:
+    os.environ["DB_PATH"] = db_path
+    os.environ["ADMIN_PASSWORD"] = ADMIN_PASSWORD
+    import db
+    from repositories.property_repository import PropertyRepository
+
+    db.DB_PATH = db_path
+    db.init_db()
+    repo = PropertyRepository()
+    for i in range(rows):
+        repo.create_property({
+            "owner_username": "admin",
+            "titulo": f"Departamento 3 ambientes #{i}",
+            "precio": "USD 150.000",
+            "ubicacion": "Palermo, Capital Federal",
+            "descripcion": "Luminoso, balcón al frente. " * 20,
+            "detalles": {"ambientes": "3", "metros_totales": "70"},
+            "caracteristicas": ["Balcón", "Luminoso"],
+            "image_paths": [f"/static/properties/{i}/{n:02d}.jpg" for n in range(1, 13)],
+            "agent_name": "Asesor",
+            "agent_whatsapp": "5491100000000",
+            "source_url": f"https://www.zonaprop.com.ar/aviso-{i}.html",
+        })
+    with db.get_connection() as conn:
+        tokens = [r["public_token"] for r in conn.execute("SELECT public_token FROM properties")]
+    db.close_thread_connection()
+    return tokens
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(kind: str, workers: int, threads: int, db_path: str, port: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "DB_PATH": db_path,
+        "PORT": str(port),
+        "SECRET_KEY": "bench-secret",
+        "ADMIN_PASSWORD": ADMIN_PASSWORD,
+        "WEB_CONCURRENCY": str(workers),
+        "WEB_THREADS": str(threads),
+        "WEB_ACCESS_LOG": "",
+    }
+    if kind == "dev":
+        cmd = [sys.executable, "app.py"]
+    else:
+        cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"]
+    proc = subprocess.Popen(cmd, cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"el server ({kind}) no levantó en el puerto {port}")
+
+
+def _login(port: int) -> str:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    body = urllib.parse.urlencode({"username": "admin", "password": ADMIN_PASSWORD})
+    conn.request("POST", "/login", body, {"Content-Type": "application/x-www-form-urlencoded"})
+    response = conn.getresponse()
+    response.read()
+    cookie = (response.getheader("Set-Cookie") or "").split(";", 1)[0]
+    conn.close()
+    if response.status != 302 or not cookie:
+        raise RuntimeError(f"login falló ({response.status})")
+    return cookie
+
+
+def _load(port: int, paths: list[str], headers: dict[str, str], clients: int, seconds: float) -> dict[str, float]:
+    stop = threading.Event()
+    latencies: list[float] = []
+    counts = {"ok": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def client(worker: int) -> None:
+        local: list[float] = []
+        ok = errors = 0
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        i = worker
+        while not stop.is_set():
+            path = paths[i % len(paths)]
+            i += clients
+            started = time.perf_counter()
+            try:
+                conn.request("GET", path, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                if response.status == 200:
+                    ok += 1
+                    local.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+                if response.will_close:
+                    conn.close()
+                    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            counts["ok"] += ok
+            counts["errors"] += errors
+
+    pool = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    started = time.perf_counter()
+    for t in pool:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+    return {
+        "rps": counts["ok"] / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": p95 * 1000,
+        "errors": counts["errors"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="cantidades de workers gunicorn, separadas por coma")
+    parser.add_argument("--threads", type=int, default=8, help="hilos por worker (WEB_THREADS)")
+    parser.add_argument("--clients", type=int, default=16, help="hilos clientes concurrentes")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duración por endpoint")
+    parser.add_argument("--rows", type=int, default=200, help="propiedades sembradas")
+    parser.add_argument("--dev", action="store_true", help="incluir el server de desarrollo como referencia")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bench_http_"), "bench.db")
+    tokens = _seed(db_path, args.rows)
+    runs = [("dev", 1)] if args.dev else []
+    runs += [("gunicorn", int(n)) for n in args.workers.split(",") if n.strip()]
+    endpoints = {
+        "/p/<token>": ([f"/p/{t}" for t in tokens], False),
+        "/propiedades": (["/propiedades?per_page=20", "/propiedades?per_page=20&q=palermo"], True),
+    }
+
+    print(f"{args.rows} propiedades, {args.clients} clientes, {args.seconds:.0f}s por endpoint, "
+          f"{args.threads} hilos/worker, {os.cpu_count()} CPUs\n")
+    print(f"{'server':<10} {'workers':>7} {'endpoint':<14} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'errores':>8}")
+    for kind, workers in runs:
+        port = _free_port()
+        proc = _start_server(kind, workers, args.threads, db_path, port)
+        try:
+            cookie = _login(port)
+            for name, (paths, needs_login) in endpoints.items():
+                headers = {"Cookie": cookie} if needs_login else {}
+                row = _load(port, paths, headers, args.clients, args.seconds)
+                print(f"{kind:<10} {workers:>7} {name:<14} {row['rps']:>9.0f} {row['p50_ms']:>8.1f} "
+                      f"{row['p95_ms']:>8.1f} {row['errors']:>8}")
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Benchmark del matching cliente ↔ propiedad (repositories/match_repository.py).
+
+Siembra una cartera sintética en una base temporal y mide, por consulta:
+- "escaneo": traer todas las propiedades activas del asesor, normalizar cada una en
+  Python (zona, tipo, ambientes, precio en USD) y puntuarlas, que es lo que haría falta
+  sin las columnas derivadas (match_*, *_num);
+- "indexado": MatchRepository.properties_for_client / clients_for_property.
+También mide el alta de un cliente (incluye indexar sus zonas) y chequea que el escaneo
+y la consulta indexada devuelvan las mismas propiedades.
+
+Uso: python benchmarks/bench_matching.py [--properties 20000] [--clients 2000] [--queries 200]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+OWNER = "admin"
+ZONAS = ["palermo", "belgrano", "caballito", "nuñez", "villa urquiza", "recoleta", "almagro", "olivos"]
+TIPOS = [("Departamento", "depto"), ("PH", "ph"), ("Casa", "casa"), ("Oficina", "oficina")]
+
+
+def _seed(n_properties: int, n_clients: int) -> None:
+    import db
+    from repositories.client_repository import ClientRepository
+    from repositories.property_repository import PropertyRepository
+    from services.client_service import sanitize_client_payload
+
+    rng = random.Random(7)
+    props = PropertyRepository()
+    for i in range(n_properties):
+        titulo, _ = rng.choice(TIPOS)
+        zona = rng.choice(ZONAS).title()
+        precio = f"USD {rng.randrange(60, 600) * 1000:,}".replace(",", ".") if rng.random() < 0.9 else "Consultar precio"
+        props.create_property({
+            "owner_username": OWNER,
+            "titulo": f"{titulo} {rng.randint(1, 5)} ambientes #{i}",
+            "precio": precio,
+            "ubicacion": f"Calle {i}, {zona}, Capital Federal",
+            "descripcion": "Luminoso, apto crédito." if rng.random() < 0.3 else "Luminoso.",
+            "detalles": {"ambientes": str(rng.randint(1, 5))},
+            "agent_name": "Asesor",
+            "agent_whatsapp": "5491100000000",
+        })
+    clients = ClientRepository()
+    for i in range(n_clients):
+        amb_min = rng.randint(1, 3)
+        _, payload = sanitize_client_payload({
+            "nombre": "Cliente Prueba",
+            "telefono": f"11{i:08d}",
+            "zonas": rng.sample(ZONAS, rng.randint(0, 3)),
+            "tipos": rng.sample([t for _, t in TIPOS], rng.randint(0, 2)),
+            "presupuesto": str(rng.randrange(80, 500) * 1000),
+            "ambientes_min": amb_min,
+            "ambientes_max": amb_min + rng.randint(0, 2),
+            "apto_credito": rng.choice(["si", "no", "indiferente"]),
+        })
+        clients.create_client(OWNER, payload)
+    db.close_thread_connection()
+
+
+def _scan_properties_for_client(client: dict, budget_factor: float, limit: int) -> list[int]:
+    """Lo mismo que properties_for_client, recorriendo y normalizando toda la cartera."""
+    from db import get_connection
+    from repositories.client_repository import client_zona_keys
+    from repositories.property_attributes import parse_amount, property_attributes
+
+    zonas = set(client_zona_keys(client["zonas"])) - {""}
+    tipos = set(client["tipos"])
+    budget = parse_amount(client["presupuesto"]) or None
+    with get_connection() as conn:
+        rows = conn.execute(
+            """
+            SELECT id, titulo, precio, ubicacion, descripcion, detalles_json, caracteristicas_json,
+                   source_url, created_at
+            FROM properties WHERE owner_username = ? AND deleted_at IS NULL
+            """,
+            (OWNER,),
+        ).fetchall()
+    scored = []
+    for r in rows:
+        m = property_attributes({
+            "titulo": r["titulo"], "precio": r["precio"], "ubicacion": r["ubicacion"],
+            "descripcion": r["descripcion"], "detalles": json.loads(r["detalles_json"] or "{}"),
+            "caracteristicas": json.loads(r["caracteristicas_json"] or "[]"), "source_url": r["source_url"],
+        })
+        amb = m["ambientes_num"]
+        precio = m["precio_num"] if m["precio_moneda"] == "USD" else None
+        if zonas and m["match_zona"] not in zonas:
+            continue
+        if m["match_tipo"] and tipos and m["match_tipo"] not in tipos:
+            continue
+        if amb is not None and client["ambientes_min"] is not None and amb < client["ambientes_min"]:
+            continue
+        if amb is not None and client["ambientes_max"] is not None and amb > client["ambientes_max"]:
+            continue
+        if precio is not None and budget and precio > budget * budget_factor:
+            continue
+        score = 3 if m["match_zona"] and m["match_zona"] in zonas else 0
+        if precio is not None and budget:
+            score += 3 if precio <= budget else 1
+        score += 2 if m["match_tipo"] and m["match_tipo"] in tipos else 0
+        score += 2 if amb is not None and (client["ambientes_min"] is not None or client["ambientes_max"] is not None) else 0
+        score += 1 if client["apto_credito_estado"] == "si" and m["match_apto_credito"] else 0
+        if score > 0:
+            scored.append((-score, r["created_at"], r["id"]))
+    scored.sort(key=lambda t: (t[0], _desc(t[1]), -t[2]))
+    return [property_id for _, _, property_id in scored[:limit]]
+
+
+def _desc(value: str) -> tuple:
+    return tuple(-ord(ch) for ch in value)
+
+
+def _ms(fn, args_list) -> float:
+    samples = []
+    for args in args_list:
+        started = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--properties", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench_matching_"), "bench.db")
+    import db
+    from repositories.client_repository import ClientRepository
+    from repositories.match_repository import MatchRepository
+    from services.client_service import sanitize_client_payload
+
+    db.init_db()
+    started = time.perf_counter()
+    _seed(args.properties, args.clients)
+    print(f"{args.properties} propiedades y {args.clients} clientes sembrados en {time.perf_counter() - started:.1f}s\n")
+
+    with db.get_connection() as conn:
+        client_rows = conn.execute("SELECT * FROM clients WHERE deleted_at IS NULL").fetchall()
+        property_ids = [r["id"] for r in conn.execute("SELECT id FROM properties")]
+    clients = [
+        {**ClientRepository._row_to_dict(r), "apto_credito_estado": r["apto_credito_estado"]} for r in client_rows
+    ]
+    rng = random.Random(11)
+    sample_clients = [rng.choice(clients) for _ in range(args.queries)]
+    sample_properties = [rng.choice(property_ids) for _ in range(args.queries)]
+    repo = MatchRepository()
+
+    mismatches = sum(
+        [m["id"] for m in repo.properties_for_client(c["id"], OWNER)]
+        != _scan_properties_for_client(c, repo.budget_factor, 20)
+        for c in sample_clients[:20]
+    )
+    scan_ms = _ms(
+        lambda c: _scan_properties_for_client(c, repo.budget_factor, 20),
+        [(c,) for c in sample_clients[: max(1, args.queries // 20)]],
+    )
+    indexed_ms = _ms(lambda cid: repo.properties_for_client(cid, OWNER), [(c["id"],) for c in sample_clients])
+    reverse_ms = _ms(lambda pid: repo.clients_for_property(pid, OWNER), [(pid,) for pid in sample_properties])
+    _, payload = sanitize_client_payload({
+        "nombre": "Cliente Nuevo", "telefono": "1199999999", "zonas": ZONAS[:3], "tipos": ["depto"],
+    })
+    create_ms = _ms(lambda: ClientRepository().create_client(OWNER, payload), [()] * 50)
+
+    print(f"{'operación':<42} {'ms (mediana)':>12}")
+    print(f"{'matches de un cliente, escaneo':<42} {scan_ms:>12.2f}")
+    print(f"{'matches de un cliente, indexado':<42} {indexed_ms:>12.2f}")
+    print(f"{'clientes para una propiedad, indexado':<42} {reverse_ms:>12.2f}")
+    print(f"{'alta de cliente (con zonas indexadas)':<42} {create_ms:>12.2f}")
+    print(f"\n{'resultados iguales al escaneo' if not mismatches else f'{mismatches}/20 clientes con resultados distintos'}")
+
+
+if __name__ == "__main__":
+    main()
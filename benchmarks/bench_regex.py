@@ -0,0 +1,153 @@
+"""
+Microbenchmark del registro de regex precompiladas del scraper.
+
+Corre la extracción completa (la misma de bench_extraction.py) sobre el corpus dos veces:
+con los patrones compilados al importar el módulo, y reemplazándolos por un proxy que
+hace lo que hacía el código antes, `re.search(patrón, texto, flags)` en cada llamada
+(pasando por el caché interno de `re`). Para no contar el costo del proxy como ahorro,
+también mide el proxy llamando directo al patrón compilado, y el ahorro es la diferencia
+entre esos dos. Reporta CPU por scrape y cuántas llamadas a regex hace un scrape.
+
+Uso: python benchmarks/bench_regex.py [--repeat 20]
+"""
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+from typing import Any
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from benchmarks.bench_extraction import _extract_all, load_corpus
+import services.listing_document as listing_document
+import services.scraper_service as scraper_service
+from services.scraper_service import ScraperService
+
+
+class _PatternProxy:
+    """Se hace pasar por un re.Pattern. Con `inline`, resuelve el patrón en cada llamada."""
+
+    calls = 0
+
+    def __init__(self, compiled: re.Pattern, inline: bool):
+        self.compiled = compiled
+        self.inline = inline
+        self.pattern = compiled.pattern
+        self.flags = compiled.flags
+
+    def _call(self, name: str, *args: Any) -> Any:
+        _PatternProxy.calls += 1
+        if self.inline:
+            return getattr(re, name)(self.pattern, *args, flags=self.flags)
+        return getattr(self.compiled, name)(*args)
+
+    def search(self, string):
+        return self._call("search", string)
+
+    def match(self, string):
+        return self._call("match", string)
+
+    def fullmatch(self, string):
+        return self._call("fullmatch", string)
+
+    def findall(self, string):
+        return self._call("findall", string)
+
+    def finditer(self, string):
+        return self._call("finditer", string)
+
+    def split(self, string):
+        return self._call("split", string)
+
+    def sub(self, repl, string):
+        return self._call("sub", repl, string)
+
+
+def _proxied(value: Any, inline: bool) -> Any:
+    if isinstance(value, re.Pattern):
+        return _PatternProxy(value, inline)
+    if isinstance(value, tuple):
+        return tuple(_proxied(item, inline) for item in value)
+    if isinstance(value, dict):
+        return {key: _proxied(item, inline) for key, item in value.items()}
+    return value
+
+
+def _count(value: Any) -> int:
+    if isinstance(value, tuple):
+        return sum(_count(item) for item in value)
+    if isinstance(value, dict):
+        return sum(_count(item) for item in value.values())
+    return 1
+
+
+def _registry() -> list[tuple[Any, str]]:
+    """(módulo, nombre) de cada patrón del registro: *_RE a nivel de módulo."""
+    return [
+        (module, name)
+        for module in (scraper_service, listing_document)
+        for name in vars(module)
+        if name.endswith("_RE") and name.startswith("_")
+    ]
+
+
+def _run(scraper: ScraperService, pages: list[dict[str, Any]], repeat: int) -> float:
+    """Mediana de ms por scrape, promediada sobre el corpus."""
+    per_page = []
+    for page in pages:
+        seconds = []
+        for _ in range(repeat):
+            started = time.process_time()
+            _extract_all(scraper, page)
+            seconds.append(time.process_time() - started)
+        per_page.append(statistics.median(seconds) * 1000)
+    return statistics.mean(per_page)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    pages = load_corpus()
+    if not pages:
+        print("corpus vacío")
+        sys.exit(1)
+    scraper = ScraperService()
+    repeat = max(1, args.repeat)
+    registry = _registry()
+    originals = {(module, name): getattr(module, name) for module, name in registry}
+
+    compiled_ms = _run(scraper, pages, repeat)
+    proxied_ms: dict[bool, float] = {}
+    for inline in (False, True):
+        for (module, name), value in originals.items():
+            setattr(module, name, _proxied(value, inline))
+        try:
+            _PatternProxy.calls = 0
+            for page in pages:
+                _extract_all(scraper, page)
+            calls = _PatternProxy.calls / len(pages)
+            proxied_ms[inline] = _run(scraper, pages, repeat)
+        finally:
+            for (module, name), value in originals.items():
+                setattr(module, name, value)
+
+    patterns = sum(_count(value) for value in originals.values())
+    print(f"corpus: {len(pages)} páginas, {patterns} patrones en el registro, "
+          f"~{calls:.0f} llamadas a regex por scrape\n")
+    print(f"{'modo':<30} {'ms CPU/scrape':>14}")
+    print(f"{'precompiladas':<30} {compiled_ms:>14.2f}")
+    print(f"{'proxy -> patrón compilado':<30} {proxied_ms[False]:>14.2f}")
+    print(f"{'proxy -> re.<fn>(patrón, ...)':<30} {proxied_ms[True]:>14.2f}")
+    saved = proxied_ms[True] - proxied_ms[False]
+    before = compiled_ms + saved
+    print(f"\nahorro: {saved:.2f} ms de CPU por scrape "
+          f"({saved / before * 100 if before else 0:.0f}% de la extracción sin el registro)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Chequeo de ida y vuelta del export/import NDJSON de la cartera (repositories/portfolio_repository.py).
+
+En una base y una carpeta static/ temporales arma una ficha con fotos locales (blobs
+enlazados en /static/properties/<id>/), un cliente con interés y actividad, y:
+- exporta e importa la cartera a otro asesor en el mismo servidor: las fotos de la ficha
+  importada tienen que vivir en su propia carpeta, enlazadas a los mismos blobs, y seguir
+  ahí después de borrar definitivamente la ficha original;
+- importa el mismo archivo en "otro servidor" (store de blobs vacío): la ficha no puede
+  apuntar a carpetas locales y cae a las URLs originales del portal;
+- reexporta y compara los campos de los registros con los originales.
+Sale con código 1 si algo no se cumple.
+
+Uso: python benchmarks/check_portfolio_roundtrip.py
+"""
+import json
+import os
+import sys
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+PORTAL_URLS = ["https://img.portal.test/a.jpg", "https://img.portal.test/b.jpg"]
+
+
+def _seed(service) -> int:
+    from repositories.client_repository import ClientRepository
+    from repositories.interest_repository import InterestRepository
+    from services.client_service import sanitize_client_payload
+
+    property_id = service.property_repo.create_property({
+        "owner_username": "admin",
+        "titulo": "Depto 3 ambientes en Palermo",
+        "precio": "USD 185.000",
+        "ubicacion": "Palermo, Capital Federal",
+        "descripcion": "Luminoso.",
+        "detalles": {"ambientes": "3"},
+        "source_image_urls": PORTAL_URLS,
+        "agent_name": "Ana",
+        "agent_whatsapp": "5491100000000",
+        "source_url": "https://www.zonaprop.com.ar/aviso-1.html",
+    })
+    target_dir = os.path.join(service.base_dir, "static", "properties", str(property_id))
+    manifest = {}
+    for index, content in enumerate((b"foto uno" * 100, b"foto dos" * 100), start=1):
+        filename = f"{index:02d}.jpg"
+        blob = service.image_store.put_chunks([content], ".jpg")
+        service.image_store.link_into(blob, target_dir, filename)
+        manifest[filename] = blob
+    service.image_store.write_manifest(target_dir, manifest)
+    service.property_repo.update_image_paths(
+        property_id, [f"/static/properties/{property_id}/{name}" for name in sorted(manifest)]
+    )
+    _, payload = sanitize_client_payload({"nombre": "Juan Perez", "telefono": "1155556666", "zonas": ["palermo"]})
+    client_id = ClientRepository().create_client("admin", payload)
+    InterestRepository().add(client_id, property_id, "admin", "le gustó")
+    ClientRepository().add_activity(client_id, "admin", "llamada", "Coordinamos visita")
+    return property_id
+
+
+def _comparable(record: dict) -> dict:
+    # Lo que cambia al importar: ids, fotos locales (carpeta nueva) y updated_at de la ficha.
+    skip = {"id", "client_id", "property_id", "image_paths", "image_blobs", "public_token", "updated_at"}
+    return {k: v for k, v in record.items() if k not in skip}
+
+
+def main() -> None:
+    tmp = tempfile.mkdtemp(prefix="portfolio_roundtrip_")
+    os.environ["DB_PATH"] = os.path.join(tmp, "roundtrip.db")
+    import db
+    from repositories.portfolio_repository import PortfolioRepository
+    from repositories.property_repository import PropertyRepository
+    from services.property_service import PropertyService
+
+    db.init_db()
+    service = PropertyService(PropertyRepository(), base_dir=os.path.join(tmp, "servidor"))
+    source_id = _seed(service)
+    repo = PortfolioRepository(batch_size=2, images=service)
+    exported = [json.loads(json.dumps(r)) for r in repo.iter_export("admin")]
+    problems = []
+
+    counts = repo.import_records("otro", exported)
+    if counts["skipped"] or counts["properties"] != 1 or counts["interests"] != 1 or counts["activity"] != 1:
+        problems.append(f"import en el mismo servidor: {counts}")
+    imported = next(r for r in repo.iter_export("otro") if r["type"] == "property")
+    new_dir = os.path.join(service.base_dir, "static", "properties", str(imported["id"]))
+    expected = [f"/static/properties/{imported['id']}/{name}" for name in ("01.jpg", "02.jpg")]
+    if imported["image_paths"] != expected:
+        problems.append(f"rutas de la ficha importada: {imported['image_paths']} (esperadas {expected})")
+    for name in ("01.jpg", "02.jpg"):
+        path = os.path.join(new_dir, name)
+        if not os.path.isfile(path) or os.stat(path).st_nlink < 2:
+            problems.append(f"{path} no está enlazado a su blob")
+
+    service.delete_property(source_id, owner_username="admin")
+    missing = [name for name in ("01.jpg", "02.jpg") if not os.path.isfile(os.path.join(new_dir, name))]
+    if missing:
+        problems.append(f"borrar la ficha original se llevó fotos de la importada: {missing}")
+
+    other = PropertyService(PropertyRepository(), base_dir=os.path.join(tmp, "otro_servidor"))
+    PortfolioRepository(images=other).import_records("tercero", exported)
+    elsewhere = next(r for r in PortfolioRepository().iter_export("tercero") if r["type"] == "property")
+    if elsewhere["image_paths"] != PORTAL_URLS:
+        problems.append(f"sin los blobs la ficha debería usar las URLs del portal: {elsewhere['image_paths']}")
+
+    reexported = [_comparable(r) for r in PortfolioRepository().iter_export("tercero")]
+    if reexported != [_comparable(r) for r in exported]:
+        problems.append("la reexportación no coincide con el archivo original")
+
+    for problem in problems:
+        print(f"FALLA  {problem}")
+    if problems:
+        sys.exit(1)
+    print("ida y vuelta sin cambios; las fotos importadas viven en la carpeta de su ficha")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Chequeo de planes de consulta de los caminos calientes.
+
+Arma una base temporal con datos de prueba, ejecuta las operaciones de cada request
+(vista pública por token, generación por source_url, listados, papelera, matching, log
+de jobs) a través de los repositorios reales y captura el SQL que mandan a SQLite.
+A cada sentencia le pide EXPLAIN QUERY PLAN y falla (exit 1) si alguna recorre una
+tabla entera ("SCAN <tabla>") en lugar de buscar por índice. Los ORDER BY que necesitan
+un B-tree temporal se informan como aviso.
+
+Uso: python benchmarks/check_query_plans.py [--rows 2000] [--verbose]
+"""
+import argparse
+import os
+import sys
+import tempfile
+from typing import Any, Callable
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+OWNER = "admin"
+
+
+def _seed(rows: int) -> dict[str, Any]:
+    from db import get_connection
+    from repositories.client_repository import ClientRepository
+    from repositories.interest_repository import InterestRepository
+    from repositories.property_repository import PropertyRepository
+    from services.client_service import sanitize_client_payload
+
+    props = PropertyRepository()
+    clients = ClientRepository()
+    property_ids = []
+    for i in range(rows):
+        property_ids.append(props.create_property({
+            "owner_username": OWNER if i % 4 else "otro",
+            "titulo": f"Departamento {i % 5 + 1} ambientes #{i}",
+            "precio": f"USD {100 + i % 300}.000",
+            "ubicacion": ["Palermo", "Belgrano", "Caballito"][i % 3] + ", Capital Federal",
+            "descripcion": "Luminoso, balcón al frente.",
+            "detalles": {"ambientes": str(i % 5 + 1), "metros_totales": str(40 + i % 80)},
+            "agent_name": "Asesor",
+            "agent_whatsapp": "5491100000000",
+            "source_url": f"https://www.zonaprop.com.ar/aviso-{i}.html",
+        }))
+    for property_id in property_ids[::10]:
+        props.soft_delete_property(property_id)
+    client_ids = []
+    for i in range(max(1, rows // 5)):
+        _, payload = sanitize_client_payload({
+            "nombre": "Cliente Prueba",
+            "telefono": f"11{i:08d}",
+            "zonas": [["palermo"], ["belgrano", "caballito"], []][i % 3],
+            "tipos": ["depto"],
+            "presupuesto": str(150000 + i * 1000),
+        })
+        client_ids.append(clients.create_client(OWNER, payload))
+    for client_id in client_ids[::7]:
+        clients.soft_delete_client(client_id, OWNER)
+    interests = InterestRepository()
+    for client_id, property_id in zip(client_ids[1::7], property_ids[1::9]):
+        interests.add(client_id, property_id, OWNER)
+    with get_connection() as conn:
+        token = conn.execute("SELECT public_token FROM properties WHERE deleted_at IS NULL LIMIT 1").fetchone()[0]
+    return {
+        "property_id": property_ids[1],
+        "client_id": client_ids[1],
+        "token": token,
+        "source_url": "https://www.zonaprop.com.ar/aviso-1.html",
+    }
+
+
+def _hot_paths(seed: dict[str, Any]) -> list[tuple[str, Callable[[], Any]]]:
+    from repositories.client_repository import ClientRepository
+    from repositories.interest_repository import InterestRepository
+    from repositories.match_repository import MatchRepository
+    from repositories.portfolio_repository import PortfolioRepository
+    from repositories.property_repository import PropertyRepository
+    from services.job_store import SqliteJobStore
+
+    props = PropertyRepository()
+    clients = ClientRepository()
+    interests = InterestRepository()
+    matches = MatchRepository()
+    portfolio = PortfolioRepository(batch_size=200)
+    jobs = SqliteJobStore()
+    jobs.create("job-plan", OWNER)
+    jobs.append("job-plan", "línea")
+
+    def second_page(list_fn, **kwargs):
+        first = list_fn(owner_username=OWNER, limit=20, **kwargs)
+        return list_fn(owner_username=OWNER, limit=20, cursor=first["next_cursor"], total_mode="none", **kwargs)
+
+    return [
+        ("find_by_token", lambda: props.find_by_token(seed["token"])),
+        ("find_version_by_token", lambda: props.find_version_by_token(seed["token"])),
+        ("find_by_source_url", lambda: props.find_by_source_url(seed["source_url"])),
+        ("list_properties", lambda: props.list_properties(owner_username=OWNER, limit=20)),
+        ("list_properties (cursor)", lambda: second_page(props.list_properties)),
+        ("list_properties (portal)", lambda: props.list_properties(owner_username=OWNER, source_portal="zonaprop")),
+        ("list_properties (q)", lambda: props.list_properties(owner_username=OWNER, search="palermo")),
+        ("list_properties (precio)", lambda: props.list_properties(
+            owner_username=OWNER, ranges={"precio_min": 150000, "precio_max": 200000})),
+        ("list_properties (m2)", lambda: props.list_properties(owner_username=OWNER, ranges={"m2_min": 100})),
+        ("list_deleted_properties", lambda: props.list_deleted_properties(OWNER)),
+        ("list_showcase_cards", lambda: props.list_showcase_cards(OWNER)),
+        ("list_clients", lambda: clients.list_clients(owner_username=OWNER)),
+        ("list_clients (cursor)", lambda: second_page(clients.list_clients)),
+        ("list_clients (q)", lambda: clients.list_clients(owner_username=OWNER, search="cliente")),
+        ("list_deleted_clients", lambda: clients.list_deleted_clients(OWNER)),
+        ("interests.by_client", lambda: interests.by_client(seed["client_id"], OWNER)),
+        ("interests.by_property", lambda: interests.by_property(seed["property_id"], OWNER)),
+        ("matches.properties_for_client", lambda: matches.properties_for_client(seed["client_id"], OWNER)),
+        ("matches.clients_for_property", lambda: matches.clients_for_property(seed["property_id"], OWNER)),
+        ("portfolio.iter_export", lambda: sum(1 for _ in portfolio.iter_export(OWNER))),
+        ("job_store.get", lambda: jobs.get("job-plan")),
+        ("job_store.read_lines", lambda: jobs.read_lines("job-plan", 0, timeout=0)),
+    ]
+
+
+def _plan_problems(conn, statement: str) -> tuple[list[str], list[str], list[str]]:
+    """(plan, scans, avisos) de una sentencia capturada."""
+    plan = [row["detail"] for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}")]
+    scans = [d for d in plan if d.startswith("SCAN ") and "VIRTUAL TABLE" not in d and "CONSTANT ROW" not in d]
+    warnings = [d for d in plan if "TEMP B-TREE" in d]
+    return plan, scans, warnings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000, help="propiedades sembradas")
+    parser.add_argument("--verbose", action="store_true", help="imprimir el plan de cada sentencia")
+    args = parser.parse_args()
+
+    os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="query_plans_"), "plans.db")
+    import db
+
+    db.init_db()
+    seed = _seed(max(50, args.rows))
+    conn = db.get_connection()
+    failures = 0
+    for name, operation in _hot_paths(seed):
+        statements: list[str] = []
+        conn.set_trace_callback(statements.append)
+        try:
+            operation()
+        finally:
+            conn.set_trace_callback(None)
+        queries = [s for s in statements if s.lstrip().split(None, 1)[0].upper() in {"SELECT", "UPDATE", "DELETE"}]
+        scans: list[str] = []
+        warnings: list[str] = []
+        for statement in queries:
+            plan, statement_scans, statement_warnings = _plan_problems(conn, statement)
+            scans += statement_scans
+            warnings += statement_warnings
+            if args.verbose:
+                print(f"  {' '.join(statement.split())[:110]}")
+                for detail in plan:
+                    print(f"      {detail}")
+        status = "FALLA" if scans else "ok"
+        failures += bool(scans)
+        print(f"{status:<6} {name:<34} {len(queries)} consulta(s)")
+        for detail in scans:
+            print(f"         recorre la tabla: {detail}")
+        for detail in dict.fromkeys(warnings):
+            print(f"         aviso: {detail}")
+
+    if failures:
+        print(f"\n{failures} camino(s) caliente(s) con recorridos de tabla")
+        sys.exit(1)
+    print("\nningún camino caliente recorre tablas enteras")
+
+
+if __name__ == "__main__":
+    main()
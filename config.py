@@ -1,6 +1,8 @@
 """Configuración centralizada de la aplicación."""
 import os
 
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
 # Security
 SECRET_KEY = os.environ.get("SECRET_KEY", "").strip()
 
@@ -8,8 +10,47 @@ SECRET_KEY = os.environ.get("SECRET_KEY", "").strip()
 STATIC_DIR = "static"
 PROPERTIES_DIR = os.path.join(STATIC_DIR, "properties")
 
+# Cachés en disco (imágenes proxificadas, respuestas de Firecrawl, etc.)
+CACHE_DIR = os.environ.get("CACHE_DIR", "").strip() or os.path.join(BASE_DIR, "cache")
+
+# Proxy de imágenes: caché local para no volver a pedir cada foto al CDN del portal
+IMAGE_CACHE_DIR = os.path.join(CACHE_DIR, "images")
+IMAGE_CACHE_MAX_BYTES = int(os.environ.get("IMAGE_CACHE_MAX_MB", "512")) * 1024 * 1024
+IMAGE_CACHE_TTL_SECONDS = int(os.environ.get("IMAGE_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# HTML renderizado de las fichas (/p/<token>, /propiedad/<id>): entradas en memoria y copia en disco
+RENDER_CACHE_DIR = os.path.join(CACHE_DIR, "render")
+RENDER_CACHE_MEMORY_ENTRIES = int(os.environ.get("RENDER_CACHE_MEMORY_ENTRIES", "256"))
+RENDER_CACHE_DISK = os.environ.get("RENDER_CACHE_DISK", "true").lower() == "true"
+
+# Generación de fichas: workers concurrentes y tope de la cola de espera
+GENERATION_WORKERS = int(os.environ.get("GENERATION_WORKERS", "3"))
+GENERATION_MAX_PENDING = int(os.environ.get("GENERATION_MAX_PENDING", "20"))
+# Tope de duración de una generación (scrape + fotos); gunicorn.conf.py lo usa para el apagado
+GENERATION_HARD_TIMEOUT_SECONDS = int(os.environ.get("GENERATION_HARD_TIMEOUT_SECONDS", "180"))
+# Estado y log de los jobs: "sqlite" (compartido entre procesos) o "memory" (un solo proceso)
+JOB_STORE = os.environ.get("JOB_STORE", "sqlite").strip().lower()
+JOB_STORE_POLL_SECONDS = float(os.environ.get("JOB_STORE_POLL_SECONDS", "0.5"))
+
+# Descarga de fotos al generar: concurrencia total, por host y tiempo límite del lote
+IMAGE_DOWNLOAD_WORKERS = int(os.environ.get("IMAGE_DOWNLOAD_WORKERS", "8"))
+IMAGE_DOWNLOAD_PER_HOST = int(os.environ.get("IMAGE_DOWNLOAD_PER_HOST", "4"))
+IMAGE_DOWNLOAD_DEADLINE_SECONDS = float(os.environ.get("IMAGE_DOWNLOAD_DEADLINE_SECONDS", "90"))
+
+# Matching cliente ↔ propiedad: cuánto puede pasarse el precio del presupuesto (0.1 = 10%)
+MATCH_BUDGET_TOLERANCE = float(os.environ.get("MATCH_BUDGET_TOLERANCE", "0.1"))
+
+# Exportación/importación NDJSON de la cartera: filas por lectura y por transacción
+PORTFOLIO_BATCH_SIZE = int(os.environ.get("PORTFOLIO_BATCH_SIZE", "500"))
+
 # Firecrawl API
 FIRECRAWL_API_KEY = os.environ.get("FIRECRAWL_API_KEY", "").strip()
 
+# Caché de respuestas crudas de Firecrawl: "on", "off" o "replay" (solo lee, nunca llama a la API)
+FIRECRAWL_CACHE_DIR = os.path.join(CACHE_DIR, "firecrawl")
+FIRECRAWL_CACHE_MODE = os.environ.get("FIRECRAWL_CACHE_MODE", "on").strip().lower()
+FIRECRAWL_CACHE_TTL_SECONDS = int(os.environ.get("FIRECRAWL_CACHE_TTL_SECONDS", str(3 * 24 * 3600)))
+FIRECRAWL_CACHE_MAX_BYTES = int(os.environ.get("FIRECRAWL_CACHE_MAX_MB", "256")) * 1024 * 1024
+
 # Debug mode
 DEBUG = os.environ.get("DEBUG", "false").lower() == "true"
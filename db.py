@@ -1,6 +1,9 @@
 import json
 import os
+import re
 import sqlite3
+import threading
+import unicodedata
 from datetime import datetime
 
 
@@ -8,181 +11,486 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.environ.get("DB_PATH", "").strip() or os.path.join(BASE_DIR, "properties.db")
 USERS_JSON_PATH = os.path.join(BASE_DIR, "users.json")
 
+# Pragmas de conexión. WAL deja leer mientras un job escribe; NORMAL es seguro con WAL
+# (solo se arriesga la última transacción ante un corte de luz, nunca la integridad).
+DB_JOURNAL_MODE = os.environ.get("DB_JOURNAL_MODE", "WAL").strip().upper()
+DB_SYNCHRONOUS = os.environ.get("DB_SYNCHRONOUS", "NORMAL").strip().upper()
+DB_BUSY_TIMEOUT_MS = int(os.environ.get("DB_BUSY_TIMEOUT_MS", "5000"))
+DB_CACHE_SIZE_KB = int(os.environ.get("DB_CACHE_SIZE_KB", "16384"))
+DB_MMAP_SIZE_BYTES = int(os.environ.get("DB_MMAP_SIZE_MB", "128")) * 1024 * 1024
+# Fuera de un request (threads de generación, scripts) reutilizar una conexión por hilo.
+DB_REUSE_THREAD_CONNECTIONS = os.environ.get("DB_REUSE_THREAD_CONNECTIONS", "true").lower() == "true"
+
+_thread_local = threading.local()
+_journal_mode_lock = threading.Lock()
+_journal_mode_applied: set[tuple[str, str]] = set()
+
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, timeout=DB_BUSY_TIMEOUT_MS / 1000)
+    conn.row_factory = sqlite3.Row
+    _apply_pragmas(conn)
+    return conn
+
+
+def _apply_pragmas(conn: sqlite3.Connection) -> None:
+    # journal_mode queda persistido en el archivo: alcanza con fijarlo una vez por proceso.
+    key = (DB_PATH, DB_JOURNAL_MODE)
+    if key not in _journal_mode_applied:
+        with _journal_mode_lock:
+            if key not in _journal_mode_applied:
+                conn.execute(f"PRAGMA journal_mode = {DB_JOURNAL_MODE}")
+                _journal_mode_applied.add(key)
+    conn.execute(f"PRAGMA synchronous = {DB_SYNCHRONOUS}")
+    conn.execute(f"PRAGMA busy_timeout = {int(DB_BUSY_TIMEOUT_MS)}")
+    conn.execute(f"PRAGMA cache_size = {-abs(int(DB_CACHE_SIZE_KB))}")
+    conn.execute(f"PRAGMA mmap_size = {int(DB_MMAP_SIZE_BYTES)}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+
 
 def get_connection() -> sqlite3.Connection:
-    """Devuelve una conexión SQLite. Dentro de un request Flask, reutiliza la misma."""
+    """Devuelve una conexión SQLite. Dentro de un request Flask, reutiliza la misma;
+    fuera de un request, reutiliza una por hilo."""
     try:
         from flask import g, has_app_context
         if has_app_context():
             if "db" not in g:
-                g.db = sqlite3.connect(DB_PATH, check_same_thread=False)
-                g.db.row_factory = sqlite3.Row
+                g.db = _connect()
             return g.db
     except ImportError:
         pass
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
+    if not DB_REUSE_THREAD_CONNECTIONS:
+        return _connect()
+    cached = getattr(_thread_local, "conn", None)
+    if cached is not None:
+        if cached[0] == DB_PATH:
+            return cached[1]
+        cached[1].close()
+    conn = _connect()
+    _thread_local.conn = (DB_PATH, conn)
     return conn
 
 
+def close_thread_connection() -> None:
+    """Cierra la conexión reutilizada por el hilo actual (p. ej. antes de un fork)."""
+    cached = getattr(_thread_local, "conn", None)
+    if cached is not None:
+        cached[1].close()
+        _thread_local.conn = None
+
+
+# Índices de búsqueda full-text (FTS5, sin acentos). Columnas = columnas de la tabla base.
+FTS_TABLES = {
+    "properties_fts": ("properties", ("titulo", "ubicacion", "descripcion", "tags_json")),
+    "clients_fts": ("clients", ("nombre", "telefono", "zonas_json", "tipos_json")),
+}
+_fts_present: dict[tuple[str, str], bool] = {}
+
+
+def fts_enabled(conn: sqlite3.Connection, fts_table: str) -> bool:
+    """Indica si la tabla FTS existe en la base actual (se consulta una vez por proceso)."""
+    key = (DB_PATH, fts_table)
+    if key not in _fts_present:
+        row = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (fts_table,),
+        ).fetchone()
+        _fts_present[key] = bool(row)
+    return _fts_present[key]
+
+
+def build_fts_query(search: str) -> str:
+    """Convierte lo que tipea el usuario en una consulta FTS5: todos los términos, por prefijo."""
+    tokens = re.findall(r"\w+", search or "", re.UNICODE)
+    return " ".join(f'"{token}"*' for token in tokens[:8])
+
+
 def hash_pw(pw: str) -> str:
     from werkzeug.security import generate_password_hash
     return generate_password_hash(pw)
 
 
 def init_db() -> None:
+    """Lleva la base a SCHEMA_VERSION. Con el esquema al día es una sola lectura de
+    PRAGMA user_version: no revisa columnas, índices ni datos legados."""
     with get_connection() as conn:
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS users (
-                username TEXT PRIMARY KEY,
-                password_hash TEXT NOT NULL,
-                role TEXT NOT NULL DEFAULT 'user',
-                nombre TEXT NOT NULL DEFAULT '',
-                whatsapp TEXT NOT NULL DEFAULT '',
-                form_url TEXT NOT NULL DEFAULT '',
-                active INTEGER NOT NULL DEFAULT 1,
-                created_at TEXT NOT NULL
-            )
-            """
-        )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS properties (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                owner_username TEXT NOT NULL DEFAULT 'admin',
-                source_portal TEXT NOT NULL DEFAULT 'zonaprop',
-                titulo TEXT NOT NULL,
-                precio TEXT NOT NULL,
-                ubicacion TEXT NOT NULL,
-                descripcion TEXT NOT NULL,
-                detalles_json TEXT NOT NULL,
-                caracteristicas_json TEXT NOT NULL,
-                info_adicional_json TEXT NOT NULL,
-                image_paths_json TEXT NOT NULL,
-                agent_name TEXT NOT NULL,
-                agent_whatsapp TEXT NOT NULL,
-                form_url TEXT NOT NULL DEFAULT '',
-                source_url TEXT NOT NULL,
-                created_at TEXT NOT NULL
-            )
-            """
-        )
-        _ensure_properties_owner_column(conn)
-        _ensure_properties_source_portal_column(conn)
-        _ensure_properties_source_image_urls_column(conn)
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS clients (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                owner_username TEXT NOT NULL,
-                nombre TEXT NOT NULL,
-                telefono TEXT NOT NULL DEFAULT '',
-                presupuesto TEXT NOT NULL DEFAULT '',
-                tipo TEXT NOT NULL DEFAULT 'otro',
-                ambientes TEXT NOT NULL DEFAULT '',
-                apto_credito INTEGER NOT NULL DEFAULT 0,
-                zonas_busqueda TEXT NOT NULL DEFAULT '',
-                notas_resumidas TEXT NOT NULL DEFAULT '',
-                situacion TEXT NOT NULL DEFAULT '',
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL
-            )
-            """
-        )
-        conn.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_properties_created_at
-            ON properties(created_at DESC)
-            """
-        )
-        conn.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_properties_owner_username
-            ON properties(owner_username)
-            """
-        )
-        conn.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_properties_source_portal
-            ON properties(source_portal)
-            """
+        if _schema_version(conn) < SCHEMA_VERSION:
+            _run_migrations(conn)
+
+    _bootstrap_users()
+
+
+def _schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _run_migrations(conn: sqlite3.Connection) -> None:
+    """Aplica, en orden, cada migración pendiente en su propia transacción.
+
+    BEGIN IMMEDIATE toma el lock de escritura antes de releer la versión, así dos
+    procesos que arrancan a la vez no aplican la misma migración dos veces.
+    """
+    conn.commit()
+    for version, migration in enumerate(MIGRATIONS, start=1):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if _schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+
+# Las migraciones 1-4 son idempotentes (IF NOT EXISTS, _ensure_column): una base de antes
+# del runner (user_version = 0) las corre todas y solo agrega lo que le falta.
+def _migration_base_schema(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            username TEXT PRIMARY KEY,
+            password_hash TEXT NOT NULL,
+            role TEXT NOT NULL DEFAULT 'user',
+            nombre TEXT NOT NULL DEFAULT '',
+            whatsapp TEXT NOT NULL DEFAULT '',
+            form_url TEXT NOT NULL DEFAULT '',
+            active INTEGER NOT NULL DEFAULT 1,
+            created_at TEXT NOT NULL
         )
-        conn.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_clients_owner_username
-            ON clients(owner_username)
-            """
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS properties (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            owner_username TEXT NOT NULL DEFAULT 'admin',
+            source_portal TEXT NOT NULL DEFAULT 'zonaprop',
+            titulo TEXT NOT NULL,
+            precio TEXT NOT NULL,
+            ubicacion TEXT NOT NULL,
+            descripcion TEXT NOT NULL,
+            detalles_json TEXT NOT NULL,
+            caracteristicas_json TEXT NOT NULL,
+            info_adicional_json TEXT NOT NULL,
+            image_paths_json TEXT NOT NULL,
+            agent_name TEXT NOT NULL,
+            agent_whatsapp TEXT NOT NULL,
+            form_url TEXT NOT NULL DEFAULT '',
+            source_url TEXT NOT NULL,
+            created_at TEXT NOT NULL
         )
-        conn.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_clients_updated_at
-            ON clients(updated_at DESC)
-            """
+        """
+    )
+    _ensure_properties_owner_column(conn)
+    _ensure_properties_source_portal_column(conn)
+    _ensure_properties_source_image_urls_column(conn)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS clients (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            owner_username TEXT NOT NULL,
+            nombre TEXT NOT NULL,
+            telefono TEXT NOT NULL DEFAULT '',
+            presupuesto TEXT NOT NULL DEFAULT '',
+            tipo TEXT NOT NULL DEFAULT 'otro',
+            ambientes TEXT NOT NULL DEFAULT '',
+            apto_credito INTEGER NOT NULL DEFAULT 0,
+            zonas_busqueda TEXT NOT NULL DEFAULT '',
+            notas_resumidas TEXT NOT NULL DEFAULT '',
+            situacion TEXT NOT NULL DEFAULT '',
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
         )
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_properties_created_at
+        ON properties(created_at DESC)
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_properties_owner_username
+        ON properties(owner_username)
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_properties_source_portal
+        ON properties(source_portal)
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_clients_owner_username
+        ON clients(owner_username)
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_clients_updated_at
+        ON clients(updated_at DESC)
+        """
+    )
+    # Paginación keyset: (dueño, clave de orden, id) recorre cada página sin OFFSET.
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_properties_owner_created_id
+        ON properties(owner_username, created_at DESC, id DESC)
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_clients_owner_updated_id
+        ON clients(owner_username, updated_at DESC, id DESC)
+        """
+    )
 
-        _ensure_column(conn, "properties", "deleted_at", "TEXT")
-        _ensure_column(conn, "clients", "deleted_at", "TEXT")
-        _ensure_column(conn, "clients", "estado", "TEXT NOT NULL DEFAULT 'nuevo_lead'")
-        _ensure_column(conn, "clients", "proxima_accion", "TEXT NOT NULL DEFAULT ''")
-        _ensure_column(conn, "clients", "proxima_accion_fecha", "TEXT NOT NULL DEFAULT ''")
-        _ensure_column(conn, "clients", "proxima_accion_nota", "TEXT NOT NULL DEFAULT ''")
-        _ensure_column(conn, "clients", "apto_credito_estado", "TEXT NOT NULL DEFAULT 'indiferente'")
-        _ensure_column(conn, "clients", "tipos_json", "TEXT NOT NULL DEFAULT '[]'")
-        _ensure_column(conn, "clients", "ambientes_min", "INTEGER")
-        _ensure_column(conn, "clients", "ambientes_max", "INTEGER")
-        _ensure_column(conn, "clients", "zonas_json", "TEXT NOT NULL DEFAULT '[]'")
-        _migrate_clients_crm_enums(conn)
-        _ensure_column(conn, "properties", "tags_json", "TEXT NOT NULL DEFAULT '[]'")
-        _ensure_column(conn, "properties", "public_token", "TEXT")
-        _migrate_public_tokens(conn)
+    _ensure_column(conn, "properties", "deleted_at", "TEXT")
+    _ensure_column(conn, "clients", "deleted_at", "TEXT")
+    _ensure_column(conn, "clients", "estado", "TEXT NOT NULL DEFAULT 'nuevo_lead'")
+    _ensure_column(conn, "clients", "proxima_accion", "TEXT NOT NULL DEFAULT ''")
+    _ensure_column(conn, "clients", "proxima_accion_fecha", "TEXT NOT NULL DEFAULT ''")
+    _ensure_column(conn, "clients", "proxima_accion_nota", "TEXT NOT NULL DEFAULT ''")
+    _ensure_column(conn, "clients", "apto_credito_estado", "TEXT NOT NULL DEFAULT 'indiferente'")
+    _ensure_column(conn, "clients", "tipos_json", "TEXT NOT NULL DEFAULT '[]'")
+    _ensure_column(conn, "clients", "ambientes_min", "INTEGER")
+    _ensure_column(conn, "clients", "ambientes_max", "INTEGER")
+    _ensure_column(conn, "clients", "zonas_json", "TEXT NOT NULL DEFAULT '[]'")
+    _migrate_clients_crm_enums(conn)
+    _ensure_column(conn, "properties", "tags_json", "TEXT NOT NULL DEFAULT '[]'")
+    _ensure_column(conn, "properties", "public_token", "TEXT")
+    _migrate_public_tokens(conn)
+    _ensure_column(conn, "properties", "updated_at", "TEXT")
+    conn.execute("UPDATE properties SET updated_at = created_at WHERE updated_at IS NULL")
 
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS client_property_interests (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                client_id INTEGER NOT NULL,
-                property_id INTEGER NOT NULL,
-                owner_username TEXT NOT NULL,
-                nota TEXT NOT NULL DEFAULT '',
-                created_at TEXT NOT NULL,
-                UNIQUE(client_id, property_id)
-            )
-            """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS client_property_interests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            client_id INTEGER NOT NULL,
+            property_id INTEGER NOT NULL,
+            owner_username TEXT NOT NULL,
+            nota TEXT NOT NULL DEFAULT '',
+            created_at TEXT NOT NULL,
+            UNIQUE(client_id, property_id)
         )
-        conn.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_cpi_client
-            ON client_property_interests(client_id)
-            """
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_cpi_client
+        ON client_property_interests(client_id)
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_cpi_property
+        ON client_property_interests(property_id)
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS client_activity_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            client_id INTEGER NOT NULL,
+            owner_username TEXT NOT NULL,
+            tipo TEXT NOT NULL DEFAULT 'nota',
+            texto TEXT NOT NULL,
+            created_at TEXT NOT NULL
         )
-        conn.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_cpi_property
-            ON client_property_interests(property_id)
-            """
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_cal_client
+        ON client_activity_log(client_id)
+        """
+    )
+
+
+def _migration_jobs(conn: sqlite3.Connection) -> None:
+    """Jobs de generación compartidos entre procesos (services/job_store.py)."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            user TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'running',
+            result_url TEXT,
+            error_message TEXT,
+            created_at REAL NOT NULL,
+            finished_at REAL
         )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS client_activity_log (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                client_id INTEGER NOT NULL,
-                owner_username TEXT NOT NULL,
-                tipo TEXT NOT NULL DEFAULT 'nota',
-                texto TEXT NOT NULL,
-                created_at TEXT NOT NULL
-            )
-            """
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS job_log_lines (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id TEXT NOT NULL,
+            message TEXT NOT NULL
         )
-        conn.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_cal_client
-            ON client_activity_log(client_id)
-            """
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_job_log_lines_job
+        ON job_log_lines(job_id, seq)
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS job_flights (
+            flight_key TEXT PRIMARY KEY,
+            job_id TEXT NOT NULL,
+            source_url TEXT NOT NULL,
+            created_at REAL NOT NULL
         )
-        conn.commit()
+        """
+    )
 
-    _bootstrap_users()
+
+def _migration_search_indexes(conn: sqlite3.Connection) -> None:
+    _ensure_search_indexes(conn)
+
+
+def _migration_property_attributes(conn: sqlite3.Connection) -> None:
+    # Atributos derivados al guardar (repositories/property_attributes.py): claves del
+    # matching cliente ↔ propiedad y precio, m², ambientes y expensas como números.
+    _ensure_column(conn, "properties", "match_zona", "TEXT")
+    _ensure_column(conn, "properties", "match_tipo", "TEXT")
+    _ensure_column(conn, "properties", "match_apto_credito", "INTEGER NOT NULL DEFAULT 0")
+    _ensure_column(conn, "properties", "precio_moneda", "TEXT")
+    _ensure_column(conn, "properties", "precio_num", "INTEGER")
+    _ensure_column(conn, "properties", "metros_totales_num", "REAL")
+    _ensure_column(conn, "properties", "ambientes_num", "INTEGER")
+    _ensure_column(conn, "properties", "expensas_num", "INTEGER")
+    _ensure_column(conn, "properties", "attrs_version", "INTEGER")
+    # Reemplazado por idx_properties_owner_zona (el precio ahora es precio_num).
+    conn.execute("DROP INDEX IF EXISTS idx_properties_owner_match_zona")
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_properties_owner_zona
+        ON properties(owner_username, match_zona)
+        WHERE deleted_at IS NULL
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_properties_owner_precio
+        ON properties(owner_username, precio_moneda, precio_num)
+        WHERE deleted_at IS NULL
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_properties_owner_metros
+        ON properties(owner_username, metros_totales_num)
+        WHERE deleted_at IS NULL
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_properties_owner_ambientes
+        ON properties(owner_username, ambientes_num)
+        WHERE deleted_at IS NULL
+        """
+    )
+    # Zonas buscadas por cada cliente, una fila por zona ("" = cualquier zona).
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS client_search_zonas (
+            owner_username TEXT NOT NULL,
+            zona TEXT NOT NULL,
+            client_id INTEGER NOT NULL,
+            PRIMARY KEY (owner_username, zona, client_id)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_client_search_zonas_client
+        ON client_search_zonas(client_id)
+        """
+    )
+    _backfill_property_attributes(conn)
+    _backfill_client_search_zonas(conn)
+
+
+def _migration_hot_lookup_indexes(conn: sqlite3.Connection) -> None:
+    """Índices de las consultas de cada request (benchmarks/check_query_plans.py las revisa).
+
+    Los listados filtran siempre filas activas (deleted_at IS NULL), así que sus índices
+    son parciales y no cargan con la papelera; la papelera usa (dueño, deleted_at, fecha).
+    """
+    # /p/<token> en cada vista pública; el token es aleatorio, nunca se repite.
+    conn.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_properties_public_token
+        ON properties(public_token)
+        """
+    )
+    # find_by_source_url en cada generación: la más nueva de las activas con esa URL.
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_properties_source_url_active
+        ON properties(source_url, created_at DESC)
+        WHERE deleted_at IS NULL
+        """
+    )
+    # Listados paginados por cursor (created_at, id) y papelera de cada asesor.
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_properties_owner_active_created
+        ON properties(owner_username, created_at DESC, id DESC)
+        WHERE deleted_at IS NULL
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_properties_owner_deleted
+        ON properties(owner_username, deleted_at, created_at)
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_clients_owner_active_updated
+        ON clients(owner_username, updated_at DESC, id DESC)
+        WHERE deleted_at IS NULL
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_clients_owner_deleted
+        ON clients(owner_username, deleted_at, updated_at)
+        """
+    )
+    # Cubiertos por los anteriores (mismo prefijo): solo encarecían cada escritura.
+    for index in (
+        "idx_properties_owner_username",
+        "idx_properties_owner_created_id",
+        "idx_clients_owner_username",
+        "idx_clients_owner_updated_id",
+    ):
+        conn.execute(f"DROP INDEX IF EXISTS {index}")
+
+
+# Nunca reordenar ni borrar: la posición (desde 1) es el user_version que deja cada una.
+# Un cambio de esquema nuevo = una función nueva al final de la lista. Para recalcular los
+# atributos derivados (ATTRIBUTES_VERSION) agregar una que llame a _backfill_property_attributes.
+MIGRATIONS = (
+    _migration_base_schema,
+    _migration_jobs,
+    _migration_search_indexes,
+    _migration_property_attributes,
+    _migration_hot_lookup_indexes,
+)
+SCHEMA_VERSION = len(MIGRATIONS)
 
 
 def _bootstrap_users() -> None:
@@ -265,6 +573,84 @@ def _migrate_public_tokens(conn: sqlite3.Connection) -> None:
     )
 
 
+def _backfill_property_attributes(conn: sqlite3.Connection) -> None:
+    """Calcula los atributos derivados de las propiedades guardadas con otra versión de las reglas."""
+    from repositories.property_attributes import ATTRIBUTE_COLUMNS, ATTRIBUTES_VERSION, property_attributes
+
+    rows = conn.execute(
+        """
+        SELECT id, titulo, precio, ubicacion, descripcion, detalles_json, caracteristicas_json, source_url
+        FROM properties WHERE attrs_version IS NULL OR attrs_version != ?
+        """,
+        (ATTRIBUTES_VERSION,),
+    ).fetchall()
+    if not rows:
+        return
+    updates = []
+    for r in rows:
+        attributes = property_attributes({
+            "titulo": r["titulo"],
+            "precio": r["precio"],
+            "ubicacion": r["ubicacion"],
+            "descripcion": r["descripcion"],
+            "detalles": json.loads(r["detalles_json"] or "{}"),
+            "caracteristicas": json.loads(r["caracteristicas_json"] or "[]"),
+            "source_url": r["source_url"],
+        })
+        updates.append([attributes[column] for column in ATTRIBUTE_COLUMNS] + [r["id"]])
+    assignments = ", ".join(f"{column} = ?" for column in ATTRIBUTE_COLUMNS)
+    conn.executemany(f"UPDATE properties SET {assignments} WHERE id = ?", updates)
+
+
+# Copia congelada de las reglas de client_repository (VALID_CLIENT_ZONAS, zona_match_key,
+# client_zona_keys y el fallback a zonas_busqueda de _row_to_dict) tal como estaban en la
+# migración 4: cambiar el repositorio no cambia lo que hace esta migración.
+_MIGRATION_4_ZONAS = frozenset({
+    "agronomia", "almagro", "balvanera", "barracas", "belgrano", "boedo", "caballito",
+    "chacarita", "coghlan", "colegiales", "constitucion", "flores", "floresta", "la boca",
+    "la paternal", "liniers", "mataderos", "monserrat", "monte castro", "nunez",
+    "palermo", "parque avellaneda", "parque chacabuco", "parque chas", "parque patricios",
+    "puerto madero", "recoleta", "retiro", "saavedra", "san cristobal", "san nicolas",
+    "san telmo", "velez sarsfield", "versalles", "villa crespo", "villa del parque",
+    "villa devoto", "villa general mitre", "villa lugano", "villa luro", "villa ortuzar",
+    "villa pueyrredon", "villa real", "villa riachuelo", "villa santa rita", "villa soldati",
+    "villa urquiza", "olivos", "vicente lopez", "la lucila", "martinez", "san isidro",
+    "acassuso", "beccar", "munro", "florida", "carapachay", "villa adelina",
+})
+
+
+def _migration_4_zona_keys(zonas_json: str | None, zonas_busqueda: str | None) -> list[str]:
+    try:
+        zonas = json.loads(zonas_json) if zonas_json else []
+    except (json.JSONDecodeError, TypeError):
+        zonas = []
+    if not zonas:
+        zonas = [z.strip() for z in (zonas_busqueda or "").split(",") if z.strip()]
+    keys = (
+        unicodedata.normalize("NFKD", str(z)).encode("ascii", "ignore").decode("ascii").lower().strip()
+        for z in zonas
+    )
+    return [key for key in dict.fromkeys(keys) if key in _MIGRATION_4_ZONAS] or [""]
+
+
+def _backfill_client_search_zonas(conn: sqlite3.Connection) -> None:
+    """Indexa las zonas de los clientes creados antes de client_search_zonas."""
+    rows = conn.execute(
+        """
+        SELECT id, owner_username, zonas_json, zonas_busqueda FROM clients
+        WHERE id NOT IN (SELECT client_id FROM client_search_zonas)
+        """
+    ).fetchall()
+    conn.executemany(
+        "INSERT OR IGNORE INTO client_search_zonas(owner_username, zona, client_id) VALUES (?, ?, ?)",
+        [
+            (r["owner_username"], zona, r["id"])
+            for r in rows
+            for zona in _migration_4_zona_keys(r["zonas_json"], r["zonas_busqueda"])
+        ],
+    )
+
+
 def _ensure_column(conn: sqlite3.Connection, table: str, column: str, col_type: str) -> None:
     cols = conn.execute(f"PRAGMA table_info({table})").fetchall()
     if column not in {c["name"] for c in cols}:
@@ -333,3 +719,58 @@ def _migrate_clients_crm_enums(conn: sqlite3.Connection) -> None:
         WHERE apto_credito_estado IS NULL OR apto_credito_estado = ''
         """
     )
+
+
+def _ensure_search_indexes(conn: sqlite3.Connection) -> None:
+    try:
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp._fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE IF EXISTS temp._fts5_probe")
+    except sqlite3.OperationalError:
+        # SQLite sin FTS5: los repositorios siguen buscando con LIKE.
+        return
+    for fts_table, (base_table, columns) in FTS_TABLES.items():
+        _ensure_fts_table(conn, fts_table, base_table, columns)
+        _fts_present[(DB_PATH, fts_table)] = True
+
+
+def _ensure_fts_table(conn: sqlite3.Connection, fts_table: str, base_table: str, columns: tuple[str, ...]) -> None:
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (fts_table,),
+    ).fetchone()
+    cols = ", ".join(columns)
+    new_cols = ", ".join(f"new.{c}" for c in columns)
+    old_cols = ", ".join(f"old.{c}" for c in columns)
+    conn.execute(
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5(
+            {cols},
+            content='{base_table}', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {base_table} BEGIN
+            INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.id, {new_cols});
+        END
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {base_table} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+        END
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE OF {cols} ON {base_table} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+            INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.id, {new_cols});
+        END
+        """
+    )
+    if not exists:
+        conn.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
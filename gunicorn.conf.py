@@ -0,0 +1,62 @@
+"""
+Servidor de producción: gunicorn -c gunicorn.conf.py
+
+Workers gthread (varios procesos, cada uno con varios hilos) para que una descarga
+lenta de /proxy-image o un stream SSE no bloqueen al resto. `kill -HUP <master>`
+recarga el código levantando workers nuevos y dejando terminar a los viejos.
+"""
+import os
+import secrets
+import subprocess
+import sys
+
+from dotenv import load_dotenv
+load_dotenv()  # Antes de importar config: los valores salen del entorno
+
+import config
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+wsgi_app = "app:app"
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+worker_class = "gthread"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+threads = int(os.environ.get("WEB_THREADS", "8"))
+# Margen para que terminen las fichas en generación al recargar o apagar: el worker
+# viejo espera a sus jobs en curso, que duran a lo sumo GENERATION_HARD_TIMEOUT_SECONDS.
+graceful_timeout = int(
+    os.environ.get("WEB_GRACEFUL_TIMEOUT", str(config.GENERATION_HARD_TIMEOUT_SECONDS + 30))
+)
+# gthread no corta requests largos (SSE) por `timeout`: solo workers colgados. Mientras
+# espera sus jobs al salir el worker ya no le avisa al master, así que no puede ser menor
+# que el margen de arriba o el master lo mataría antes.
+timeout = max(int(os.environ.get("WEB_TIMEOUT", "120")), graceful_timeout)
+keepalive = 5
+max_requests = int(os.environ.get("WEB_MAX_REQUESTS", "0"))
+max_requests_jitter = max(0, max_requests // 10)
+preload_app = False
+accesslog = os.environ.get("WEB_ACCESS_LOG", "-") or None
+errorlog = "-"
+
+
+def on_starting(server):
+    # Todos los workers firman la sesión con la misma clave: sin SECRET_KEY cada
+    # proceso generaría la suya y el login se perdería al cambiar de worker.
+    if not os.environ.get("SECRET_KEY", "").strip():
+        os.environ["SECRET_KEY"] = secrets.token_hex(32)
+        server.log.warning("SECRET_KEY no configurado — sesiones se perderán al reiniciar.")
+    _init_db(server)
+
+
+def on_reload(server):
+    # HUP tras un deploy: correr las migraciones del código nuevo antes de los workers nuevos.
+    _init_db(server)
+
+
+def _init_db(server):
+    # Una sola vez, antes del fork: los workers no migran en paralelo. Corre en un proceso
+    # aparte para que cada HUP importe db.py y todo lo que usen las migraciones desde
+    # disco; el master nunca los importa.
+    subprocess.run([sys.executable, "-c", "import db; db.init_db()"], cwd=BASE_DIR, check=True)
+    server.log.info("Base inicializada")
@@ -7,6 +7,7 @@ Uso: python3 migrate_descriptions.py
 import sqlite3
 import re
 import os
+from datetime import datetime
 
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "properties.db")
 
@@ -38,12 +39,20 @@ def main():
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
     rows = conn.execute("SELECT id, descripcion FROM properties").fetchall()
+    # updated_at alimenta el ETag de la ficha; bases viejas todavía no la tienen.
+    has_updated_at = "updated_at" in {c["name"] for c in conn.execute("PRAGMA table_info(properties)")}
 
     updated = 0
     for row in rows:
         cleaned = clean_description(row["descripcion"])
         if cleaned != row["descripcion"]:
-            conn.execute("UPDATE properties SET descripcion = ? WHERE id = ?", (cleaned, row["id"]))
+            if has_updated_at:
+                conn.execute(
+                    "UPDATE properties SET descripcion = ?, updated_at = ? WHERE id = ?",
+                    (cleaned, datetime.now().isoformat(), row["id"]),
+                )
+            else:
+                conn.execute("UPDATE properties SET descripcion = ? WHERE id = ?", (cleaned, row["id"]))
             updated += 1
             print(f"  Propiedad {row['id']}: descripción actualizada")
 
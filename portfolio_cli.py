@@ -0,0 +1,91 @@
+"""
+Exporta o importa la cartera de un asesor (propiedades, clientes, intereses y actividad)
+como NDJSON: un registro JSON por línea, con "type" = property | client | interest | activity.
+
+Uso:
+  python portfolio_cli.py export --owner admin [--secciones properties,clients] [-o cartera.ndjson]
+  python portfolio_cli.py import --owner admin [--batch-size 1000] cartera.ndjson   (o "-" para leer de stdin)
+
+La exportación escribe a medida que lee (memoria constante); la importación inserta por
+lotes de PORTFOLIO_BATCH_SIZE registros, uno por transacción.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env"))
+
+import config
+from db import init_db
+from repositories.portfolio_repository import EXPORT_SECTIONS, PortfolioRepository, iter_ndjson
+from repositories.property_repository import PropertyRepository
+from services.property_service import PropertyService
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def export(repo: PortfolioRepository, owner: str, sections: list[str], output: str) -> None:
+    out = sys.stdout if output == "-" else open(output, "w", encoding="utf-8")
+    total = 0
+    try:
+        for record in repo.iter_export(owner, sections):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            total += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"✓ {total} registros exportados de {owner}", file=sys.stderr)
+
+
+def import_(repo: PortfolioRepository, owner: str, path: str) -> None:
+    started = time.perf_counter()
+    source = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        counts = repo.import_records(owner, iter_ndjson(source))
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    summary = ", ".join(f"{counts[s]} {s}" for s in EXPORT_SECTIONS)
+    print(f"✓ Importado en {time.perf_counter() - started:.1f}s: {summary} ({counts['skipped']} omitidos)",
+          file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    batch_help = "registros por transacción al importar"
+    parser.add_argument("--batch-size", type=int, default=config.PORTFOLIO_BATCH_SIZE, help=batch_help)
+    # También después del subcomando (import --batch-size 1000 ...). SUPPRESS hace que el
+    # subparser no pise con su default el valor dado antes del subcomando.
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--batch-size", type=int, default=argparse.SUPPRESS, help=batch_help)
+    sub = parser.add_subparsers(dest="command", required=True)
+    exp = sub.add_parser("export", parents=[common], help="escribir la cartera como NDJSON")
+    exp.add_argument("--owner", required=True, help="usuario dueño de la cartera")
+    exp.add_argument("--secciones", default=",".join(EXPORT_SECTIONS), help="secciones separadas por coma")
+    exp.add_argument("-o", "--output", default="-", help="archivo de salida (- = stdout)")
+    imp = sub.add_parser("import", parents=[common], help="cargar un NDJSON en la cartera de un asesor")
+    imp.add_argument("--owner", required=True, help="usuario que recibe los registros")
+    imp.add_argument("path", help="archivo NDJSON (- = stdin)")
+    args = parser.parse_args()
+
+    init_db()
+    # Con el PropertyService las fotos locales viajan como blobs y se enlazan al importar.
+    images = PropertyService(PropertyRepository(), BASE_DIR)
+    repo = PortfolioRepository(batch_size=args.batch_size, images=images)
+    if args.command == "export":
+        sections = [s.strip() for s in args.secciones.split(",") if s.strip()]
+        unknown = [s for s in sections if s not in EXPORT_SECTIONS]
+        if unknown:
+            parser.error(f"secciones inválidas: {', '.join(unknown)}")
+        export(repo, args.owner, sections, args.output)
+    else:
+        import_(repo, args.owner, args.path)
+
+
+if __name__ == "__main__":
+    main()
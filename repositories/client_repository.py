@@ -1,8 +1,10 @@
 import json
+import unicodedata
 from datetime import datetime
 from typing import Any
 
-from db import get_connection
+from db import build_fts_query, fts_enabled, get_connection
+from repositories.pagination import apply_cursor, count_cache, count_rows, decode_cursor, encode_cursor
 
 
 # ── Valid ENUMs (fuente de verdad) ─────────────────
@@ -14,6 +16,7 @@ VALID_CLIENT_ESTADOS = {
 VALID_CLIENT_ACCIONES = {
     "", "llamar", "enviar_propiedades", "coordinar_visita", "seguimiento", "esperar_respuesta",
 }
+VALID_ACTIVITY_TIPOS = {"nota", "llamada", "visita", "whatsapp"}
 VALID_CLIENT_ZONAS = {
     "agronomia", "almagro", "balvanera", "barracas", "belgrano", "boedo", "caballito",
     "chacarita", "coghlan", "colegiales", "constitucion", "flores", "floresta", "la boca",
@@ -27,6 +30,30 @@ VALID_CLIENT_ZONAS = {
     "acassuso", "beccar", "munro", "florida", "carapachay", "villa adelina",
 }
 
+
+def zona_match_key(text: str) -> str:
+    """Minúsculas y sin acentos: la clave con la que se indexan zonas ("nuñez" → "nunez")."""
+    return unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode("ascii").lower()
+
+
+# Zonas como claves de matching (ver repositories/property_attributes.py).
+MATCH_ZONAS = frozenset(zona_match_key(z) for z in VALID_CLIENT_ZONAS)
+
+
+def client_zona_keys(zonas: list[str]) -> list[str]:
+    """Filas de client_search_zonas de un cliente; "" = busca en cualquier zona."""
+    keys = [key for key in dict.fromkeys(zona_match_key(z).strip() for z in zonas or []) if key in MATCH_ZONAS]
+    return keys or [""]
+
+
+def index_client_zonas(conn, client_id: int, owner_username: str, zonas: list[str]) -> None:
+    """Reemplaza las zonas indexadas del cliente (en la transacción de quien llama)."""
+    conn.execute("DELETE FROM client_search_zonas WHERE client_id = ?", (client_id,))
+    conn.executemany(
+        "INSERT OR IGNORE INTO client_search_zonas(owner_username, zona, client_id) VALUES (?, ?, ?)",
+        [(owner_username, zona, client_id) for zona in client_zona_keys(zonas)],
+    )
+
 LEGACY_ESTADO_MAP = {
     "new_lead": "nuevo_lead",
     "contacted": "contactado",
@@ -44,38 +71,78 @@ LEGACY_ACCION_MAP = {
 }
 
 class ClientRepository:
-    def list_clients(self, owner_username: str, search: str = "", estado: str = "", limit: int = 50, offset: int = 0) -> dict[str, Any]:
-        conditions = ["owner_username = ?", "deleted_at IS NULL"]
+    def list_clients(
+        self,
+        owner_username: str,
+        search: str = "",
+        estado: str = "",
+        limit: int = 50,
+        offset: int = 0,
+        cursor: str | None = None,
+        total_mode: str = "exact",
+    ) -> dict[str, Any]:
+        """Lista clientes activos. Con `cursor` pagina por (updated_at, id) en lugar de OFFSET."""
+        position = decode_cursor(cursor) if cursor else {}
+        conditions = ["c.owner_username = ?", "c.deleted_at IS NULL"]
         params: list = [owner_username]
-        if search:
-            conditions.append("(nombre LIKE ? OR telefono LIKE ? OR zonas_json LIKE ? OR tipos_json LIKE ?)")
-            q = f"%{search}%"
-            params.extend([q, q, q, q])
         if estado:
             normalized_estado = LEGACY_ESTADO_MAP.get(estado, estado)
             legacy_estados = [k for k, v in LEGACY_ESTADO_MAP.items() if v == normalized_estado]
             estado_values = [normalized_estado] + legacy_estados
             placeholders = ", ".join("?" for _ in estado_values)
-            conditions.append(f"estado IN ({placeholders})")
+            conditions.append(f"c.estado IN ({placeholders})")
             params.extend(estado_values)
-        where = " AND ".join(conditions)
 
         with get_connection() as conn:
-            count_row = conn.execute(f"SELECT COUNT(*) AS total FROM clients WHERE {where}", params).fetchone()
-            total = count_row["total"] if count_row else 0
+            source = "clients c"
+            order_by = "c.updated_at DESC, c.id DESC"
+            ranked = False
+            if search:
+                fts_query = build_fts_query(search) if fts_enabled(conn, "clients_fts") else ""
+                if fts_query:
+                    # Ranking: nombre > teléfono > zonas > tipos.
+                    source = "clients c JOIN clients_fts ON clients_fts.rowid = c.id"
+                    conditions.append("clients_fts MATCH ?")
+                    params.append(fts_query)
+                    order_by = "bm25(clients_fts, 10.0, 5.0, 2.0, 1.0), c.updated_at DESC, c.id DESC"
+                    ranked = True
+                else:
+                    conditions.append("(c.nombre LIKE ? OR c.telefono LIKE ? OR c.zonas_json LIKE ? OR c.tipos_json LIKE ?)")
+                    q = f"%{search}%"
+                    params.extend([q, q, q, q])
+            where = " AND ".join(conditions)
+
+            page_where, page_params, offset = apply_cursor(
+                where, params, position, offset, ranked=ranked, key_columns="c.updated_at, c.id"
+            )
             rows = conn.execute(
                 f"""
-                SELECT id, owner_username, nombre, telefono, presupuesto, tipo, ambientes,
-                       apto_credito, zonas_busqueda, notas_resumidas, situacion,
-                       estado, proxima_accion, proxima_accion_fecha,
-                       tipos_json, ambientes_min, ambientes_max, zonas_json,
-                       created_at, updated_at
-                FROM clients WHERE {where}
-                ORDER BY updated_at DESC LIMIT ? OFFSET ?
+                SELECT c.id, c.owner_username, c.nombre, c.telefono, c.presupuesto, c.tipo, c.ambientes,
+                       c.apto_credito, c.zonas_busqueda, c.notas_resumidas, c.situacion,
+                       c.estado, c.proxima_accion, c.proxima_accion_fecha,
+                       c.tipos_json, c.ambientes_min, c.ambientes_max, c.zonas_json,
+                       c.created_at, c.updated_at
+                FROM {source} WHERE {page_where}
+                ORDER BY {order_by} LIMIT ? OFFSET ?
                 """,
-                params + [limit, offset],
+                page_params + [limit + 1, offset],
             ).fetchall()
-        return {"items": [self._row_to_dict(r) for r in rows], "total": total, "limit": limit, "offset": offset}
+            total = count_rows(conn, "clients", source, where, params, total_mode)
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(
+                {"o": offset + limit} if ranked else {"k": [last["updated_at"], last["id"]]}
+            )
+        return {
+            "items": [self._row_to_dict(r) for r in rows],
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": next_cursor,
+        }
 
     def create_client(self, owner_username: str, payload: dict[str, Any]) -> int:
         now = datetime.now().isoformat()
@@ -86,10 +153,10 @@ class ClientRepository:
                     owner_username, nombre, telefono, presupuesto, tipo, ambientes,
                     apto_credito, zonas_busqueda, notas_resumidas, situacion,
                     estado, proxima_accion, proxima_accion_fecha,
-                    tipos_json, ambientes_min, ambientes_max, zonas_json,
+                    tipos_json, ambientes_min, ambientes_max, zonas_json, apto_credito_estado,
                     created_at, updated_at
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                 (
                     owner_username,
@@ -109,12 +176,16 @@ class ClientRepository:
                     payload.get("ambientes_min"),
                     payload.get("ambientes_max"),
                     json.dumps(payload.get("zonas", []), ensure_ascii=False),
+                    payload.get("apto_credito_estado", "indiferente"),
                     now,
                     now,
                 ),
             )
+            client_id = int(cur.lastrowid)
+            index_client_zonas(conn, client_id, owner_username, payload.get("zonas", []))
             conn.commit()
-            return int(cur.lastrowid)
+            count_cache.invalidate("clients")
+            return client_id
 
     def update_client(self, client_id: int, owner_username: str, payload: dict[str, Any]) -> bool:
         now = datetime.now().isoformat()
@@ -126,7 +197,7 @@ class ClientRepository:
                     apto_credito = ?, zonas_busqueda = ?, notas_resumidas = ?, situacion = ?,
                     estado = ?, proxima_accion = ?, proxima_accion_fecha = ?,
                     tipos_json = ?, ambientes_min = ?, ambientes_max = ?, zonas_json = ?,
-                    updated_at = ?
+                    apto_credito_estado = ?, updated_at = ?
                 WHERE id = ? AND owner_username = ?
                 """,
                 (
@@ -146,12 +217,16 @@ class ClientRepository:
                     payload.get("ambientes_min"),
                     payload.get("ambientes_max"),
                     json.dumps(payload.get("zonas", []), ensure_ascii=False),
+                    payload.get("apto_credito_estado", "indiferente"),
                     now,
                     client_id,
                     owner_username,
                 ),
             )
+            if cur.rowcount:
+                index_client_zonas(conn, client_id, owner_username, payload.get("zonas", []))
             conn.commit()
+            count_cache.invalidate("clients")
             return cur.rowcount > 0
 
     def soft_delete_client(self, client_id: int, owner_username: str) -> bool:
@@ -162,6 +237,7 @@ class ClientRepository:
                 (now, client_id, owner_username),
             )
             conn.commit()
+            count_cache.invalidate("clients")
             return cur.rowcount > 0
 
     def restore_client(self, client_id: int, owner_username: str) -> bool:
@@ -171,6 +247,7 @@ class ClientRepository:
                 (client_id, owner_username),
             )
             conn.commit()
+            count_cache.invalidate("clients")
             return cur.rowcount > 0
 
     def list_deleted_clients(self, owner_username: str) -> list[dict[str, Any]]:
@@ -195,7 +272,10 @@ class ClientRepository:
                 "DELETE FROM clients WHERE id = ? AND owner_username = ?",
                 (client_id, owner_username),
             )
+            if cur.rowcount:
+                conn.execute("DELETE FROM client_search_zonas WHERE client_id = ?", (client_id,))
             conn.commit()
+            count_cache.invalidate("clients")
             return cur.rowcount > 0
 
     def empty_trash(self, owner_username: str) -> int:
@@ -204,7 +284,15 @@ class ClientRepository:
                 "DELETE FROM clients WHERE owner_username = ? AND deleted_at IS NOT NULL",
                 (owner_username,),
             )
+            conn.execute(
+                """
+                DELETE FROM client_search_zonas
+                WHERE owner_username = ? AND client_id NOT IN (SELECT id FROM clients WHERE owner_username = ?)
+                """,
+                (owner_username, owner_username),
+            )
             conn.commit()
+            count_cache.invalidate("clients")
             return cur.rowcount
 
     def add_activity(self, client_id: int, owner_username: str, tipo: str, texto: str) -> int:
@@ -0,0 +1,143 @@
+from typing import Any
+
+from db import get_connection
+
+# Presupuesto del cliente ("150.000", en USD) como entero; NULL si no cargó uno.
+_BUDGET_SQL = "NULLIF(CAST(REPLACE(c.presupuesto, '.', '') AS INTEGER), 0)"
+_PRECIO_USD_SQL = "(CASE WHEN p.precio_moneda = 'USD' THEN p.precio_num END)"
+_CLIENT_WANTS_TIPO_SQL = "EXISTS (SELECT 1 FROM json_each(c.tipos_json) WHERE value = p.match_tipo)"
+
+# Par (c, p) compatible. Lo que la propiedad no informa (tipo, ambientes, precio en USD)
+# no la descarta: solo deja de sumar puntos. Un par sin ningún punto no es un match.
+_MATCH_FILTER_SQL = f"""
+    (p.match_tipo IS NULL OR p.match_tipo = '' OR c.tipos_json IN ('', '[]') OR {_CLIENT_WANTS_TIPO_SQL})
+    AND (p.ambientes_num IS NULL OR c.ambientes_min IS NULL OR p.ambientes_num >= c.ambientes_min)
+    AND (p.ambientes_num IS NULL OR c.ambientes_max IS NULL OR p.ambientes_num <= c.ambientes_max)
+    AND ({_PRECIO_USD_SQL} IS NULL OR {_BUDGET_SQL} IS NULL OR {_PRECIO_USD_SQL} <= {_BUDGET_SQL} * ?)
+"""
+
+# Puntaje: zona 3, precio dentro del presupuesto 3 (1 si lo pasa dentro de la tolerancia),
+# tipo 2, ambientes 2, apto crédito 1.
+_MATCH_SCORE_SQL = f"""
+    (CASE WHEN p.match_zona != '' AND EXISTS (
+        SELECT 1 FROM client_search_zonas z
+        WHERE z.owner_username = c.owner_username AND z.zona = p.match_zona AND z.client_id = c.id
+     ) THEN 3 ELSE 0 END)
+    + (CASE WHEN {_PRECIO_USD_SQL} IS NULL OR {_BUDGET_SQL} IS NULL THEN 0
+            WHEN {_PRECIO_USD_SQL} <= {_BUDGET_SQL} THEN 3 ELSE 1 END)
+    + (CASE WHEN p.match_tipo != '' AND {_CLIENT_WANTS_TIPO_SQL} THEN 2 ELSE 0 END)
+    + (CASE WHEN p.ambientes_num IS NOT NULL
+             AND (c.ambientes_min IS NOT NULL OR c.ambientes_max IS NOT NULL) THEN 2 ELSE 0 END)
+    + (CASE WHEN c.apto_credito_estado = 'si' AND p.match_apto_credito = 1 THEN 1 ELSE 0 END)
+"""
+
+# Clientes a los que ya no tiene sentido ofrecerles propiedades.
+CLOSED_CLIENT_ESTADOS = ("cerrado", "perdido")
+
+
+class MatchRepository:
+    """Matching cliente ↔ propiedad sobre columnas indexadas.
+
+    Las propiedades guardan sus atributos normalizados (match_*, *_num) al crearse y cada cliente
+    sus zonas en client_search_zonas al crearse o editarse, así que cada consulta es un
+    recorrido de índice por (dueño, zona) y no un escaneo de toda la cartera.
+    """
+
+    def __init__(self, budget_tolerance: float = 0.1):
+        self.budget_factor = 1 + max(0.0, float(budget_tolerance))
+
+    def properties_for_client(self, client_id: int, owner_username: str, limit: int = 20) -> list[dict[str, Any]] | None:
+        """Propiedades activas que le sirven al cliente, mejor puntaje primero. None si no existe."""
+        with get_connection() as conn:
+            client = conn.execute(
+                "SELECT id FROM clients WHERE id = ? AND owner_username = ? AND deleted_at IS NULL",
+                (client_id, owner_username),
+            ).fetchone()
+            if not client:
+                return None
+            zonas = [
+                r["zona"]
+                for r in conn.execute("SELECT zona FROM client_search_zonas WHERE client_id = ?", (client_id,))
+            ]
+            zona_filter = ""
+            params: list = [client_id, owner_username]
+            if zonas and "" not in zonas:
+                zona_filter = f"AND p.match_zona IN ({', '.join('?' for _ in zonas)})"
+                params.extend(zonas)
+            rows = conn.execute(
+                f"""
+                SELECT p.id, p.titulo, p.precio, p.ubicacion, p.public_token,
+                       p.match_zona, p.match_tipo, p.ambientes_num, {_PRECIO_USD_SQL} AS precio_usd,
+                       ({_MATCH_SCORE_SQL}) AS score,
+                       EXISTS (
+                           SELECT 1 FROM client_property_interests cpi
+                           WHERE cpi.client_id = c.id AND cpi.property_id = p.id
+                       ) AS interesado
+                FROM clients c
+                JOIN properties p ON p.owner_username = c.owner_username AND p.deleted_at IS NULL
+                WHERE c.id = ? AND c.owner_username = ? {zona_filter}
+                  AND {_MATCH_FILTER_SQL} AND score > 0
+                ORDER BY score DESC, p.created_at DESC, p.id DESC
+                LIMIT ?
+                """,
+                params + [self.budget_factor, limit],
+            ).fetchall()
+        return [
+            {
+                "id": r["id"],
+                "titulo": r["titulo"],
+                "precio": r["precio"],
+                "ubicacion": r["ubicacion"],
+                "public_token": r["public_token"] or "",
+                "zona": r["match_zona"] or "",
+                "tipo": r["match_tipo"] or "",
+                "ambientes": r["ambientes_num"],
+                "precio_usd": r["precio_usd"],
+                "score": r["score"],
+                "interesado": bool(r["interesado"]),
+            }
+            for r in rows
+        ]
+
+    def clients_for_property(self, property_id: int, owner_username: str, limit: int = 20) -> list[dict[str, Any]] | None:
+        """Clientes activos que buscan algo como la propiedad, mejor puntaje primero. None si no existe."""
+        closed = ", ".join("?" for _ in CLOSED_CLIENT_ESTADOS)
+        with get_connection() as conn:
+            prop = conn.execute(
+                "SELECT id FROM properties WHERE id = ? AND owner_username = ? AND deleted_at IS NULL",
+                (property_id, owner_username),
+            ).fetchone()
+            if not prop:
+                return None
+            rows = conn.execute(
+                f"""
+                SELECT c.id, c.nombre, c.telefono, c.presupuesto, c.estado,
+                       ({_MATCH_SCORE_SQL}) AS score,
+                       EXISTS (
+                           SELECT 1 FROM client_property_interests cpi
+                           WHERE cpi.client_id = c.id AND cpi.property_id = p.id
+                       ) AS interesado
+                FROM properties p
+                JOIN client_search_zonas sz
+                  ON sz.owner_username = p.owner_username AND sz.zona IN (p.match_zona, '')
+                JOIN clients c ON c.id = sz.client_id
+                WHERE p.id = ? AND p.owner_username = ?
+                  AND c.deleted_at IS NULL AND c.estado NOT IN ({closed})
+                  AND {_MATCH_FILTER_SQL} AND score > 0
+                ORDER BY score DESC, c.updated_at DESC, c.id DESC
+                LIMIT ?
+                """,
+                [property_id, owner_username, *CLOSED_CLIENT_ESTADOS, self.budget_factor, limit],
+            ).fetchall()
+        return [
+            {
+                "id": r["id"],
+                "nombre": r["nombre"],
+                "telefono": r["telefono"],
+                "presupuesto": r["presupuesto"],
+                "estado": r["estado"],
+                "score": r["score"],
+                "interesado": bool(r["interesado"]),
+            }
+            for r in rows
+        ]
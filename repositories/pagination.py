@@ -0,0 +1,86 @@
+import base64
+import json
+import threading
+import time
+from typing import Any, Callable
+
+
+TOTAL_MODES = {"exact", "cached", "none"}
+
+
+def encode_cursor(payload: dict[str, Any]) -> str:
+    """Cursor opaco para el cliente: JSON compacto en base64 url-safe."""
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict[str, Any]:
+    """Decodifica un cursor de `encode_cursor`. Lanza ValueError si es inválido."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except Exception as e:
+        raise ValueError("Cursor inválido") from e
+    if not isinstance(payload, dict):
+        raise ValueError("Cursor inválido")
+    return payload
+
+
+class CountCache:
+    """Totales de listados cacheados unos segundos, invalidados al escribir la tabla."""
+
+    def __init__(self, ttl_seconds: float = 30.0):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._values: dict[tuple, tuple[float, int]] = {}
+
+    def get_or_compute(self, key: tuple, compute: Callable[[], int]) -> int:
+        now = time.monotonic()
+        with self._lock:
+            hit = self._values.get(key)
+            if hit and now - hit[0] < self.ttl_seconds:
+                return hit[1]
+        value = compute()
+        with self._lock:
+            self._values[key] = (now, value)
+        return value
+
+    def invalidate(self, table: str) -> None:
+        with self._lock:
+            for key in [k for k in self._values if k and k[0] == table]:
+                self._values.pop(key, None)
+
+
+count_cache = CountCache()
+
+
+def apply_cursor(
+    where: str, params: list, position: dict[str, Any], offset: int, *, ranked: bool, key_columns: str
+) -> tuple[str, list, int]:
+    """Agrega al WHERE la condición keyset del cursor. Devuelve (where, params, offset)."""
+    if not position:
+        return where, params, offset
+    if ranked:
+        # El orden por relevancia no es estable por clave: el cursor guarda el offset.
+        try:
+            return where, params, max(0, int(position["o"]))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError("Cursor inválido") from e
+    key = position.get("k")
+    if not isinstance(key, list) or len(key) != 2:
+        raise ValueError("Cursor inválido")
+    return f"{where} AND ({key_columns}) < (?, ?)", params + list(key), 0
+
+
+def count_rows(conn, table: str, source: str, where: str, params: list, total_mode: str) -> int | None:
+    """Total del listado según `total_mode`: exacto, cacheado o sin total (None)."""
+    if total_mode == "none":
+        return None
+
+    def compute() -> int:
+        row = conn.execute(f"SELECT COUNT(*) AS total FROM {source} WHERE {where}", params).fetchone()
+        return row["total"] if row else 0
+
+    if total_mode == "cached":
+        return count_cache.get_or_compute((table, source, where, tuple(params)), compute)
+    return compute()
@@ -0,0 +1,479 @@
+import json
+import os
+import re
+from datetime import datetime
+from typing import Any, Iterable, Iterator
+
+from db import get_connection
+from repositories.client_repository import VALID_ACTIVITY_TIPOS, ClientRepository, client_zona_keys
+from repositories.pagination import count_cache
+from repositories.property_attributes import ATTRIBUTE_COLUMNS, property_attributes
+from services.client_service import sanitize_client_payload
+from services.property_service import PropertyService
+
+# Secciones del NDJSON en el orden en que se exportan: las referencias (intereses y
+# actividad → cliente/propiedad) siempre apuntan a registros de líneas anteriores.
+EXPORT_SECTIONS = ("properties", "clients", "interests", "activity")
+RECORD_TYPES = {"property": "properties", "client": "clients", "interest": "interests", "activity": "activity"}
+
+_TOKEN_RE = re.compile(r"[0-9A-Za-z]{16,64}")
+# Fotos descargadas: viven en la carpeta de la ficha (/static/properties/<id>/NN.ext).
+LOCAL_IMAGE_PREFIX = "/static/properties/"
+
+
+def iter_ndjson(lines: Iterable[str | bytes]) -> Iterator[dict[str, Any] | None]:
+    """Un dict por línea no vacía; None si la línea no es un objeto JSON válido."""
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", "replace")
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield None
+            continue
+        yield record if isinstance(record, dict) else None
+
+
+def _json_list(raw: str | None) -> list:
+    try:
+        value = json.loads(raw or "[]")
+    except (TypeError, ValueError):
+        return []
+    return value if isinstance(value, list) else []
+
+
+def _json_dict(raw: str | None) -> dict:
+    try:
+        value = json.loads(raw or "{}")
+    except (TypeError, ValueError):
+        return {}
+    return value if isinstance(value, dict) else {}
+
+
+def _str_list(value: Any) -> list[str]:
+    return [v for v in value if isinstance(v, str) and v.strip()] if isinstance(value, list) else []
+
+
+def _text(value: Any, limit: int | None = None) -> str:
+    text = value.strip() if isinstance(value, str) else ""
+    return text[:limit] if limit else text
+
+
+class PortfolioRepository:
+    """Exportación e importación en bloque de la cartera de un asesor como NDJSON.
+
+    La exportación lee por páginas de `batch_size` filas (keyset por id), así que la
+    memoria no crece con la cartera. La importación junta registros del mismo tipo y
+    los inserta con executemany, un lote por transacción.
+
+    Con `images` (el PropertyService de la app) las fotos locales viajan como nombres de
+    blob y al importar se enlazan en la carpeta de la ficha nueva; sin él, o si el blob no
+    está en este servidor, la ficha importada usa las URLs originales del portal.
+    """
+
+    def __init__(self, batch_size: int = 500, images: PropertyService | None = None):
+        self.batch_size = max(1, int(batch_size))
+        self.images = images
+
+    # ── Exportación ───────────────────────────
+    def iter_export(self, owner_username: str, sections: Iterable[str] = EXPORT_SECTIONS) -> Iterator[dict[str, Any]]:
+        """Registros activos del asesor, sección por sección (ver EXPORT_SECTIONS)."""
+        wanted = set(sections)
+        for section in EXPORT_SECTIONS:
+            if section in wanted:
+                yield from getattr(self, f"_export_{section}")(owner_username)
+
+    def _batches(self, sql: str, owner_username: str) -> Iterator[list]:
+        """Pagina `sql` (parámetros: dueño, id del último registro, límite) hasta agotarla.
+
+        Las consultas recorren la tabla por rowid (`+owner_username` evita que SQLite elija
+        el índice por dueño, que obligaría a ordenar toda la cartera en cada página).
+        """
+        last_id = 0
+        while True:
+            with get_connection() as conn:
+                rows = conn.execute(sql, (owner_username, last_id, self.batch_size)).fetchall()
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1]["id"]
+
+    def _export_properties(self, owner_username: str) -> Iterator[dict[str, Any]]:
+        sql = """
+            SELECT id, source_portal, titulo, precio, ubicacion, descripcion,
+                   detalles_json, caracteristicas_json, info_adicional_json,
+                   image_paths_json, source_image_urls_json, agent_name, agent_whatsapp,
+                   form_url, source_url, tags_json, public_token, created_at, updated_at
+            FROM properties
+            WHERE +owner_username = ? AND deleted_at IS NULL AND id > ?
+            ORDER BY id LIMIT ?
+        """
+        for rows in self._batches(sql, owner_username):
+            for r in rows:
+                record = {
+                    "type": "property",
+                    "id": r["id"],
+                    "source_portal": r["source_portal"],
+                    "titulo": r["titulo"],
+                    "precio": r["precio"],
+                    "ubicacion": r["ubicacion"],
+                    "descripcion": r["descripcion"],
+                    "detalles": _json_dict(r["detalles_json"]),
+                    "caracteristicas": _json_list(r["caracteristicas_json"]),
+                    "info_adicional": _json_dict(r["info_adicional_json"]),
+                    "image_paths": _json_list(r["image_paths_json"]),
+                    "source_image_urls": _json_list(r["source_image_urls_json"]),
+                    "agent_name": r["agent_name"],
+                    "agent_whatsapp": r["agent_whatsapp"],
+                    "form_url": r["form_url"] or "",
+                    "source_url": r["source_url"] or "",
+                    "tags": _json_list(r["tags_json"]),
+                    "public_token": r["public_token"] or "",
+                    "created_at": r["created_at"],
+                    "updated_at": r["updated_at"],
+                }
+                if self.images:
+                    record["image_blobs"] = self.images.image_manifest(r["id"])
+                yield record
+
+    def _export_clients(self, owner_username: str) -> Iterator[dict[str, Any]]:
+        sql = """
+            SELECT * FROM clients
+            WHERE +owner_username = ? AND deleted_at IS NULL AND id > ?
+            ORDER BY id LIMIT ?
+        """
+        for rows in self._batches(sql, owner_username):
+            for r in rows:
+                record = ClientRepository._row_to_dict(r)
+                record.pop("owner_username")
+                # "si"/"no"/"indiferente": el bool de _row_to_dict pierde "indiferente".
+                record["apto_credito"] = r["apto_credito_estado"]
+                record["proxima_accion_nota"] = r["proxima_accion_nota"]
+                yield {"type": "client", **record}
+
+    def _export_interests(self, owner_username: str) -> Iterator[dict[str, Any]]:
+        sql = """
+            SELECT cpi.id, cpi.client_id, cpi.property_id, cpi.nota, cpi.created_at
+            FROM client_property_interests cpi
+            JOIN clients c ON c.id = cpi.client_id AND c.deleted_at IS NULL
+            JOIN properties p ON p.id = cpi.property_id AND p.deleted_at IS NULL
+            WHERE cpi.owner_username = ? AND cpi.id > ?
+            ORDER BY cpi.id LIMIT ?
+        """
+        for rows in self._batches(sql, owner_username):
+            for r in rows:
+                yield {
+                    "type": "interest",
+                    "client_id": r["client_id"],
+                    "property_id": r["property_id"],
+                    "nota": r["nota"],
+                    "created_at": r["created_at"],
+                }
+
+    def _export_activity(self, owner_username: str) -> Iterator[dict[str, Any]]:
+        sql = """
+            SELECT a.id, a.client_id, a.tipo, a.texto, a.created_at
+            FROM client_activity_log a
+            JOIN clients c ON c.id = a.client_id AND c.deleted_at IS NULL
+            WHERE a.owner_username = ? AND a.id > ?
+            ORDER BY a.id LIMIT ?
+        """
+        for rows in self._batches(sql, owner_username):
+            for r in rows:
+                yield {
+                    "type": "activity",
+                    "client_id": r["client_id"],
+                    "tipo": r["tipo"],
+                    "texto": r["texto"],
+                    "created_at": r["created_at"],
+                }
+
+    # ── Importación ───────────────────────────
+    def import_records(self, owner_username: str, records: Iterable[dict[str, Any] | None]) -> dict[str, int]:
+        """Importa registros en el formato de iter_export y devuelve cuántos entraron por sección.
+
+        Los ids del archivo solo sirven para enlazar intereses y actividad: cada fila recibe un
+        id nuevo. Un registro inválido, de tipo desconocido o que apunta a un cliente/propiedad
+        que no vino antes en el archivo se cuenta en "skipped". Los lotes ya confirmados quedan
+        aunque un lote posterior falle.
+        """
+        counts = {section: 0 for section in EXPORT_SECTIONS}
+        counts["skipped"] = 0
+        id_maps: dict[str, dict[str, int]] = {"properties": {}, "clients": {}}
+        pending: list[dict[str, Any]] = []
+        pending_section = ""
+
+        def flush() -> None:
+            if pending:
+                inserted = getattr(self, f"_import_{pending_section}")(owner_username, pending, id_maps)
+                counts[pending_section] += inserted
+                counts["skipped"] += len(pending) - inserted
+                pending.clear()
+
+        for record in records:
+            section = RECORD_TYPES.get(str(record.get("type"))) if record else None
+            if not section:
+                counts["skipped"] += 1
+                continue
+            if section != pending_section or len(pending) >= self.batch_size:
+                flush()
+                pending_section = section
+            pending.append(record)
+        flush()
+        return counts
+
+    def _write_batch(self, table: str, build_rows) -> int:
+        """Corre `build_rows(conn, next_id)` y sus inserts en una transacción con el lock tomado.
+
+        Los ids se asignan acá (no con lastrowid) para poder insertar con executemany y aun
+        así saber qué id recibió cada registro. Se parte del mayor entre MAX(id) y
+        sqlite_sequence para no reutilizar ids de filas borradas (AUTOINCREMENT).
+        """
+        with get_connection() as conn:
+            conn.commit()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                next_id = conn.execute(
+                    f"""
+                    SELECT MAX(
+                        COALESCE((SELECT seq FROM sqlite_sequence WHERE name = ?), 0),
+                        COALESCE((SELECT MAX(id) FROM {table}), 0)
+                    ) + 1
+                    """,
+                    (table,),
+                ).fetchone()[0]
+                inserted = build_rows(conn, next_id)
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        return inserted
+
+    def _import_properties(self, owner_username: str, records: list[dict], id_maps: dict) -> int:
+        now = datetime.now().isoformat()
+        batch = [r for r in records if _text(r.get("titulo"))]
+        # (id nuevo, rutas locales del archivo, manifiesto) de las fotos a enlazar al terminar.
+        to_link: list[tuple[int, list[str], dict[str, str]]] = []
+
+        def build_rows(conn, next_id: int) -> int:
+            wanted = [r["public_token"] for r in batch if _TOKEN_RE.fullmatch(str(r.get("public_token") or ""))]
+            taken = set()
+            for start in range(0, len(wanted), 500):
+                chunk = wanted[start:start + 500]
+                taken.update(
+                    row[0]
+                    for row in conn.execute(
+                        f"SELECT public_token FROM properties WHERE public_token IN ({', '.join('?' for _ in chunk)})",
+                        chunk,
+                    )
+                )
+            rows = []
+            for offset, r in enumerate(batch):
+                # Se conserva el token (los links públicos ya compartidos siguen andando) si está libre.
+                token = str(r.get("public_token") or "")
+                if not _TOKEN_RE.fullmatch(token) or token in taken:
+                    token = os.urandom(16).hex()
+                taken.add(token)
+                payload = {
+                    "titulo": _text(r.get("titulo")),
+                    "precio": _text(r.get("precio")),
+                    "ubicacion": _text(r.get("ubicacion")),
+                    "descripcion": _text(r.get("descripcion")),
+                    "detalles": r.get("detalles") if isinstance(r.get("detalles"), dict) else {},
+                    "caracteristicas": r.get("caracteristicas") if isinstance(r.get("caracteristicas"), list) else [],
+                    "source_url": _text(r.get("source_url")),
+                }
+                attributes = property_attributes(payload)
+                # Las rutas locales apuntan a la carpeta de la ficha original (<id viejo>), que
+                # es de otra ficha o de nadie: nunca se guardan tal cual. Mientras no se enlacen
+                # sus blobs, la ficha usa las URLs del portal (como cuando falla la descarga).
+                image_paths = _str_list(r.get("image_paths"))
+                source_image_urls = _str_list(r.get("source_image_urls"))
+                local_paths = [p for p in image_paths if p.startswith(LOCAL_IMAGE_PREFIX)]
+                image_paths = [p for p in image_paths if p not in local_paths] or source_image_urls
+                if local_paths and self.images:
+                    blobs = r.get("image_blobs") if isinstance(r.get("image_blobs"), dict) else {}
+                    to_link.append((next_id + offset, local_paths, blobs))
+                tags = [str(t).strip()[:50] for t in (r.get("tags") or []) if str(t).strip()][:10]
+                rows.append((
+                    next_id + offset,
+                    owner_username,
+                    _text(r.get("source_portal")) or "zonaprop",
+                    payload["titulo"],
+                    payload["precio"],
+                    payload["ubicacion"],
+                    payload["descripcion"],
+                    json.dumps(payload["detalles"], ensure_ascii=False),
+                    json.dumps(payload["caracteristicas"], ensure_ascii=False),
+                    json.dumps(r.get("info_adicional") if isinstance(r.get("info_adicional"), dict) else {}, ensure_ascii=False),
+                    json.dumps(image_paths, ensure_ascii=False),
+                    json.dumps(source_image_urls, ensure_ascii=False),
+                    _text(r.get("agent_name")),
+                    _text(r.get("agent_whatsapp")),
+                    _text(r.get("form_url")),
+                    payload["source_url"],
+                    json.dumps(tags, ensure_ascii=False),
+                    token,
+                    _text(r.get("created_at")) or now,
+                    now,
+                    *(attributes[column] for column in ATTRIBUTE_COLUMNS),
+                ))
+            conn.executemany(
+                f"""
+                INSERT INTO properties(
+                    id, owner_username, source_portal, titulo, precio, ubicacion, descripcion,
+                    detalles_json, caracteristicas_json, info_adicional_json,
+                    image_paths_json, source_image_urls_json, agent_name, agent_whatsapp, form_url,
+                    source_url, tags_json, public_token, created_at, updated_at, {", ".join(ATTRIBUTE_COLUMNS)}
+                )
+                VALUES ({", ".join("?" for _ in range(20 + len(ATTRIBUTE_COLUMNS)))})
+                """,
+                rows,
+            )
+            for offset, r in enumerate(batch):
+                if r.get("id") is not None:
+                    id_maps["properties"][str(r["id"])] = next_id + offset
+            return len(rows)
+
+        if not batch:
+            return 0
+        inserted = self._write_batch("properties", build_rows)
+        count_cache.invalidate("properties")
+        if to_link:
+            self._link_images(to_link)
+        return inserted
+
+    def _link_images(self, to_link: list[tuple[int, list[str], dict[str, str]]]) -> None:
+        """Enlaza las fotos de las fichas recién importadas y guarda sus rutas locales.
+
+        Corre después de confirmar el lote: si se corta a mitad de camino, las fichas quedan
+        con las URLs del portal, nunca con rutas a carpetas ajenas.
+        """
+        updates = []
+        for property_id, local_paths, blobs in to_link:
+            linked = self.images.link_imported_images(property_id, local_paths, blobs)
+            if linked:
+                updates.append((json.dumps(linked, ensure_ascii=False), property_id))
+        if updates:
+            with get_connection() as conn:
+                conn.executemany("UPDATE properties SET image_paths_json = ? WHERE id = ?", updates)
+                conn.commit()
+
+    def _import_clients(self, owner_username: str, records: list[dict], id_maps: dict) -> int:
+        now = datetime.now().isoformat()
+        batch = []
+        for r in records:
+            ok, payload = sanitize_client_payload(r)
+            if ok:
+                batch.append((r, payload))
+
+        def build_rows(conn, next_id: int) -> int:
+            rows = []
+            zona_rows = []
+            for offset, (r, payload) in enumerate(batch):
+                client_id = next_id + offset
+                rows.append((
+                    client_id,
+                    owner_username,
+                    payload["nombre"],
+                    payload["telefono"],
+                    payload["presupuesto"],
+                    payload["tipo"],
+                    payload["ambientes"],
+                    1 if payload["apto_credito"] else 0,
+                    payload["zonas_busqueda"],
+                    payload["notas_resumidas"],
+                    payload["situacion"],
+                    payload["estado"],
+                    payload["proxima_accion"],
+                    payload["proxima_accion_fecha"],
+                    payload["proxima_accion_nota"],
+                    json.dumps(payload["tipos"], ensure_ascii=False),
+                    payload["ambientes_min"],
+                    payload["ambientes_max"],
+                    json.dumps(payload["zonas"], ensure_ascii=False),
+                    payload["apto_credito_estado"],
+                    _text(r.get("created_at")) or now,
+                    _text(r.get("updated_at")) or now,
+                ))
+                zona_rows.extend((owner_username, zona, client_id) for zona in client_zona_keys(payload["zonas"]))
+                if r.get("id") is not None:
+                    id_maps["clients"][str(r["id"])] = client_id
+            conn.executemany(
+                """
+                INSERT INTO clients(
+                    id, owner_username, nombre, telefono, presupuesto, tipo, ambientes,
+                    apto_credito, zonas_busqueda, notas_resumidas, situacion,
+                    estado, proxima_accion, proxima_accion_fecha, proxima_accion_nota,
+                    tipos_json, ambientes_min, ambientes_max, zonas_json, apto_credito_estado,
+                    created_at, updated_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO client_search_zonas(owner_username, zona, client_id) VALUES (?, ?, ?)",
+                zona_rows,
+            )
+            return len(rows)
+
+        if not batch:
+            return 0
+        inserted = self._write_batch("clients", build_rows)
+        count_cache.invalidate("clients")
+        return inserted
+
+    def _import_interests(self, owner_username: str, records: list[dict], id_maps: dict) -> int:
+        now = datetime.now().isoformat()
+        rows = [
+            (
+                id_maps["clients"][str(r.get("client_id"))],
+                id_maps["properties"][str(r.get("property_id"))],
+                owner_username,
+                _text(r.get("nota"), 500),
+                _text(r.get("created_at")) or now,
+            )
+            for r in records
+            if str(r.get("client_id")) in id_maps["clients"] and str(r.get("property_id")) in id_maps["properties"]
+        ]
+        if not rows:
+            return 0
+        with get_connection() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                """
+                INSERT OR IGNORE INTO client_property_interests(client_id, property_id, owner_username, nota, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            inserted = conn.total_changes - before
+            conn.commit()
+        return inserted
+
+    def _import_activity(self, owner_username: str, records: list[dict], id_maps: dict) -> int:
+        now = datetime.now().isoformat()
+        rows = [
+            (
+                id_maps["clients"][str(r.get("client_id"))],
+                owner_username,
+                r.get("tipo") if r.get("tipo") in VALID_ACTIVITY_TIPOS else "nota",
+                _text(r.get("texto"), 1000),
+                _text(r.get("created_at")) or now,
+            )
+            for r in records
+            if str(r.get("client_id")) in id_maps["clients"] and _text(r.get("texto"))
+        ]
+        if not rows:
+            return 0
+        with get_connection() as conn:
+            conn.executemany(
+                "INSERT INTO client_activity_log(client_id, owner_username, tipo, texto, created_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.commit()
+        return len(rows)
@@ -0,0 +1,140 @@
+import json
+import re
+from typing import Any
+
+from repositories.client_repository import MATCH_ZONAS, zona_match_key
+
+_ZONA_RE = re.compile(r"\b(" + "|".join(re.escape(z) for z in sorted(MATCH_ZONAS, key=len, reverse=True)) + r")\b")
+_TIPO_RULES = (
+    ("ph", re.compile(r"\bph\b")),
+    ("depto", re.compile(r"\b(departamentos?|depto|dpto|monoambiente|duplex|triplex|loft|semipiso)\b")),
+    ("casa", re.compile(r"\b(casas?|chalet|quinta)\b")),
+    ("lote", re.compile(r"\b(lotes?|terrenos?)\b")),
+    ("oficina", re.compile(r"\b(oficinas?|consultorio)\b")),
+    ("otro", re.compile(r"\b(local(es)? comercial(es)?|locales?|galpon|deposito|cochera|fondo de comercio)\b")),
+)
+_AMBIENTES_RE = re.compile(r"\d+")
+_MONOAMBIENTE_RE = re.compile(r"\bmonoambiente\b")
+_TITLE_AMBIENTES_RE = re.compile(r"\b(\d{1,2})\s*amb")
+_USD_RE = re.compile(r"usd|us\$|u\$s|u\$d|dolar")
+_ARS_RE = re.compile(r"\$|\bars\b|\bpesos\b")
+_AMOUNT_RE = re.compile(r"\d[\d.]*(?:,\d+)?")
+_DECIMAL_RE = re.compile(r"\d[\d.,]*")
+_APTO_CREDITO_RE = re.compile(r"\bapto\s+credito\b")
+
+
+def match_key(text: str) -> str:
+    """Minúsculas, sin acentos y con espacios simples: la forma en que se comparan zonas y tipos."""
+    return " ".join(zona_match_key(text).split())
+
+
+def zona_from_ubicacion(ubicacion: str) -> str:
+    """Barrio de la ubicación ("Av. Santa Fe 3000, Palermo, Capital Federal" → "palermo").
+
+    Primero un tramo (entre comas) que sea exactamente una zona, así una calle con nombre
+    de barrio ("Florida 500, San Nicolas") no gana; si no, la zona más larga que aparezca.
+    """
+    parts = [match_key(part) for part in (ubicacion or "").split(",")]
+    for part in parts:
+        if part in MATCH_ZONAS:
+            return part
+    found = _ZONA_RE.findall(", ".join(parts))
+    return max(found, key=len) if found else ""
+
+
+def tipo_from_text(*texts: str) -> str:
+    """Tipo de propiedad con el vocabulario de los clientes (VALID_CLIENT_TYPES), o ""."""
+    for text in texts:
+        normalized = match_key(text)
+        for tipo, pattern in _TIPO_RULES:
+            if pattern.search(normalized):
+                return tipo
+    return ""
+
+
+def parse_ambientes(detalles: dict[str, Any], titulo: str = "") -> int | None:
+    raw = str((detalles or {}).get("ambientes") or "")
+    match = _AMBIENTES_RE.search(raw)
+    if match:
+        return int(match.group(0))
+    title = match_key(titulo)
+    if _MONOAMBIENTE_RE.search(title):
+        return 1
+    match = _TITLE_AMBIENTES_RE.search(title)
+    return int(match.group(1)) if match else None
+
+
+def parse_amount(text: str) -> int | None:
+    """Monto de un precio con formato argentino ("185.000", "1.250.000,50") como entero."""
+    match = _AMOUNT_RE.search(text or "")
+    if not match:
+        return None
+    digits = match.group(0).split(",", 1)[0].replace(".", "")
+    return int(digits) if digits else None
+
+
+def parse_precio(precio: str) -> tuple[str | None, int | None]:
+    """("USD" | "ARS", monto) del precio publicado; (None, None) si dice "Consultar precio"."""
+    amount = parse_amount(precio)
+    if amount is None:
+        return None, None
+    text = (precio or "").lower()
+    if _USD_RE.search(text):
+        return "USD", amount
+    if _ARS_RE.search(text):
+        return "ARS", amount
+    return None, amount
+
+
+def parse_decimal(text: str) -> float | None:
+    """Superficie como número: "70", "70.5" (JSON), "70,5" o "1.200" (formato argentino)."""
+    match = _DECIMAL_RE.search(str(text or ""))
+    if not match:
+        return None
+    raw = match.group(0).rstrip(".,")
+    if "," in raw:
+        raw = raw.replace(".", "").replace(",", ".")
+    elif raw.count(".") > 1 or (raw.count(".") == 1 and len(raw.split(".")[1]) == 3):
+        raw = raw.replace(".", "")
+    try:
+        return float(raw)
+    except ValueError:
+        return None
+
+
+def parse_expensas(expensas: str) -> int | None:
+    """Expensas en pesos; None si no hay monto o están publicadas en dólares."""
+    if _USD_RE.search(str(expensas or "").lower()):
+        return None
+    return parse_amount(str(expensas or ""))
+
+
+# Se guardan con la propiedad. Al cambiar las reglas: subir la versión y sumar una migración
+# en db.MIGRATIONS que llame a _backfill_property_attributes (recalcula las filas viejas).
+ATTRIBUTES_VERSION = 1
+ATTRIBUTE_COLUMNS = (
+    "match_zona", "match_tipo", "match_apto_credito",
+    "precio_moneda", "precio_num", "metros_totales_num", "ambientes_num", "expensas_num",
+    "attrs_version",
+)
+
+
+def property_attributes(payload: dict[str, Any]) -> dict[str, Any]:
+    """Columnas derivadas de una propiedad (ATTRIBUTE_COLUMNS), calculadas al guardarla."""
+    detalles = payload.get("detalles") or {}
+    titulo = payload.get("titulo") or ""
+    searchable = " ".join(
+        [titulo, payload.get("descripcion") or "", json.dumps(payload.get("caracteristicas") or [], ensure_ascii=False)]
+    )
+    moneda, precio = parse_precio(payload.get("precio") or "")
+    return {
+        "match_zona": zona_from_ubicacion(payload.get("ubicacion") or ""),
+        "match_tipo": tipo_from_text(titulo, str(detalles.get("tipo") or ""), payload.get("source_url") or ""),
+        "match_apto_credito": 1 if _APTO_CREDITO_RE.search(match_key(searchable)) else 0,
+        "precio_moneda": moneda,
+        "precio_num": precio,
+        "metros_totales_num": parse_decimal(detalles.get("metros_totales")),
+        "ambientes_num": parse_ambientes(detalles, titulo),
+        "expensas_num": parse_expensas(detalles.get("expensas")),
+        "attrs_version": ATTRIBUTES_VERSION,
+    }
@@ -1,24 +1,49 @@
 import json
 import os
 from datetime import datetime
-from typing import Any
+from typing import Any, Callable
 
-from db import get_connection
+from db import build_fts_query, fts_enabled, get_connection
+from repositories.property_attributes import ATTRIBUTE_COLUMNS, property_attributes
+from repositories.pagination import apply_cursor, count_cache, count_rows, decode_cursor, encode_cursor
+
+# Filtros por rango de list_properties: nombre → (columna numérica, operador).
+RANGE_FILTERS = {
+    "precio_min": ("p.precio_num", ">="),
+    "precio_max": ("p.precio_num", "<="),
+    "m2_min": ("p.metros_totales_num", ">="),
+    "m2_max": ("p.metros_totales_num", "<="),
+    "ambientes_min": ("p.ambientes_num", ">="),
+    "ambientes_max": ("p.ambientes_num", "<="),
+    "expensas_min": ("p.expensas_num", ">="),
+    "expensas_max": ("p.expensas_num", "<="),
+}
+PRICE_CURRENCIES = {"USD", "ARS"}
 
 
 class PropertyRepository:
+    def __init__(self, on_change: Callable[[int | None], None] | None = None):
+        # Se llama con el id modificado (None = varias filas) después de cada escritura.
+        self.on_change = on_change
+
+    def _notify_change(self, property_id: int | None) -> None:
+        if self.on_change:
+            self.on_change(property_id)
+
     def create_property(self, payload: dict[str, Any]) -> int:
         token = os.urandom(16).hex()
+        now = datetime.now().isoformat()
+        attributes = property_attributes(payload)
         with get_connection() as conn:
             cur = conn.execute(
-                """
+                f"""
                 INSERT INTO properties(
                     owner_username, source_portal, titulo, precio, ubicacion, descripcion,
                     detalles_json, caracteristicas_json, info_adicional_json,
                     image_paths_json, source_image_urls_json, agent_name, agent_whatsapp, form_url,
-                    source_url, public_token, created_at
+                    source_url, public_token, created_at, updated_at, {", ".join(ATTRIBUTE_COLUMNS)}
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, {", ".join("?" for _ in ATTRIBUTE_COLUMNS)})
                 """,
                 (
                     payload.get("owner_username", "admin"),
@@ -37,11 +62,16 @@ class PropertyRepository:
                     payload.get("form_url", ""),
                     payload.get("source_url", ""),
                     token,
-                    datetime.now().isoformat(),
+                    now,
+                    now,
+                    *(attributes[column] for column in ATTRIBUTE_COLUMNS),
                 ),
             )
             conn.commit()
-            return int(cur.lastrowid)
+            count_cache.invalidate("properties")
+        property_id = int(cur.lastrowid)
+        self._notify_change(property_id)
+        return property_id
 
     def find_by_source_url(self, source_url: str) -> dict[str, Any] | None:
         with get_connection() as conn:
@@ -84,10 +114,11 @@ class PropertyRepository:
     def update_image_paths(self, property_id: int, image_paths: list[str]) -> None:
         with get_connection() as conn:
             conn.execute(
-                "UPDATE properties SET image_paths_json = ? WHERE id = ?",
-                (json.dumps(image_paths, ensure_ascii=False), property_id),
+                "UPDATE properties SET image_paths_json = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(image_paths, ensure_ascii=False), datetime.now().isoformat(), property_id),
             )
             conn.commit()
+        self._notify_change(property_id)
 
     def get_property(self, property_id: int) -> dict[str, Any] | None:
         with get_connection() as conn:
@@ -97,7 +128,7 @@ class PropertyRepository:
                        detalles_json, caracteristicas_json, info_adicional_json,
                        image_paths_json, source_image_urls_json,
                        agent_name, agent_whatsapp, form_url, owner_username, source_portal,
-                       source_url, public_token, created_at
+                       source_url, public_token, created_at, updated_at
                 FROM properties
                 WHERE id = ?
                 """,
@@ -124,6 +155,37 @@ class PropertyRepository:
             "source_url": row["source_url"] or "",
             "public_token": row["public_token"] or "",
             "created_at": row["created_at"],
+            "updated_at": row["updated_at"] or row["created_at"],
+        }
+
+    def get_version(self, property_id: int) -> dict[str, Any] | None:
+        """Sello de versión (id, dueño, updated_at) sin traer las columnas JSON."""
+        with get_connection() as conn:
+            row = conn.execute(
+                "SELECT id, owner_username, updated_at, created_at FROM properties WHERE id = ?",
+                (property_id,),
+            ).fetchone()
+        return self._version_from_row(row)
+
+    def find_version_by_token(self, token: str) -> dict[str, Any] | None:
+        with get_connection() as conn:
+            row = conn.execute(
+                """
+                SELECT id, owner_username, updated_at, created_at
+                FROM properties WHERE public_token = ? AND deleted_at IS NULL
+                """,
+                (token,),
+            ).fetchone()
+        return self._version_from_row(row)
+
+    @staticmethod
+    def _version_from_row(row) -> dict[str, Any] | None:
+        if not row:
+            return None
+        return {
+            "id": row["id"],
+            "owner_username": row["owner_username"] or "admin",
+            "updated_at": row["updated_at"] or row["created_at"],
         }
 
     def find_by_token(self, token: str) -> dict[str, Any] | None:
@@ -134,7 +196,7 @@ class PropertyRepository:
                        detalles_json, caracteristicas_json, info_adicional_json,
                        image_paths_json, source_image_urls_json,
                        agent_name, agent_whatsapp, form_url, owner_username, source_portal,
-                       source_url, public_token, created_at
+                       source_url, public_token, created_at, updated_at
                 FROM properties WHERE public_token = ? AND deleted_at IS NULL
                 """,
                 (token,),
@@ -160,35 +222,88 @@ class PropertyRepository:
             "source_url": row["source_url"] or "",
             "public_token": row["public_token"] or "",
             "created_at": row["created_at"],
+            "updated_at": row["updated_at"] or row["created_at"],
         }
 
-    def list_properties(self, limit: int = 50, offset: int = 0, owner_username: str | None = None, source_portal: str | None = None, search: str = "") -> dict[str, Any]:
-        conditions = ["deleted_at IS NULL"]
+    def list_properties(
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        owner_username: str | None = None,
+        source_portal: str | None = None,
+        search: str = "",
+        cursor: str | None = None,
+        total_mode: str = "exact",
+        ranges: dict[str, float] | None = None,
+        moneda: str = "USD",
+    ) -> dict[str, Any]:
+        """Lista propiedades activas. Con `cursor` pagina por (created_at, id) en lugar de
+        OFFSET; `total_mode` elige total exacto, cacheado unos segundos o sin total.
+        `ranges` filtra por RANGE_FILTERS; los de precio solo comparan precios en `moneda`."""
+        position = decode_cursor(cursor) if cursor else {}
+        conditions = ["p.deleted_at IS NULL"]
         params: list = []
         if owner_username:
-            conditions.append("owner_username = ?")
+            conditions.append("p.owner_username = ?")
             params.append(owner_username)
         if source_portal:
-            conditions.append("source_portal = ?")
+            conditions.append("p.source_portal = ?")
             params.append(source_portal)
-        if search:
-            conditions.append("(titulo LIKE ? OR ubicacion LIKE ?)")
-            q = f"%{search}%"
-            params.extend([q, q])
-        where = " AND ".join(conditions)
+        ranges = {name: value for name, value in (ranges or {}).items() if value is not None}
+        if "precio_min" in ranges or "precio_max" in ranges:
+            if moneda not in PRICE_CURRENCIES:
+                raise ValueError("Moneda inválida")
+            conditions.append("p.precio_moneda = ?")
+            params.append(moneda)
+        for name, value in ranges.items():
+            if name not in RANGE_FILTERS:
+                raise ValueError(f"Filtro inválido: {name}")
+            column, operator = RANGE_FILTERS[name]
+            conditions.append(f"{column} {operator} ?")
+            params.append(value)
 
         with get_connection() as conn:
-            count_row = conn.execute(f"SELECT COUNT(*) AS total FROM properties WHERE {where}", params).fetchone()
-            total = count_row["total"] if count_row else 0
+            source = "properties p"
+            order_by = "p.created_at DESC, p.id DESC"
+            ranked = False
+            if search:
+                fts_query = build_fts_query(search) if fts_enabled(conn, "properties_fts") else ""
+                if fts_query:
+                    # Ranking: título > ubicación > tags > descripción.
+                    source = "properties p JOIN properties_fts ON properties_fts.rowid = p.id"
+                    conditions.append("properties_fts MATCH ?")
+                    params.append(fts_query)
+                    order_by = "bm25(properties_fts, 10.0, 5.0, 1.0, 3.0), p.created_at DESC, p.id DESC"
+                    ranked = True
+                else:
+                    conditions.append("(p.titulo LIKE ? OR p.ubicacion LIKE ?)")
+                    q = f"%{search}%"
+                    params.extend([q, q])
+            where = " AND ".join(conditions)
+
+            page_where, page_params, offset = apply_cursor(
+                where, params, position, offset, ranked=ranked, key_columns="p.created_at, p.id"
+            )
             rows = conn.execute(
                 f"""
-                SELECT id, titulo, precio, ubicacion, created_at, owner_username, source_portal, source_url, tags_json, public_token
-                FROM properties WHERE {where}
-                ORDER BY created_at DESC
+                SELECT p.id, p.titulo, p.precio, p.ubicacion, p.created_at, p.owner_username,
+                       p.source_portal, p.source_url, p.tags_json, p.public_token,
+                       p.precio_moneda, p.precio_num, p.metros_totales_num, p.ambientes_num, p.expensas_num
+                FROM {source} WHERE {page_where}
+                ORDER BY {order_by}
                 LIMIT ? OFFSET ?
                 """,
-                params + [limit, offset],
+                page_params + [limit + 1, offset],
             ).fetchall()
+            total = count_rows(conn, "properties", source, where, params, total_mode)
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(
+                {"o": offset + limit} if ranked else {"k": [last["created_at"], last["id"]]}
+            )
         items = [
             {
                 "id": r["id"],
@@ -201,54 +316,110 @@ class PropertyRepository:
                 "source_url": r["source_url"] or "",
                 "tags": json.loads(r["tags_json"] or "[]"),
                 "public_token": r["public_token"] or "",
+                "precio_moneda": r["precio_moneda"],
+                "precio_num": r["precio_num"],
+                "metros_totales": r["metros_totales_num"],
+                "ambientes": r["ambientes_num"],
+                "expensas": r["expensas_num"],
+            }
+            for r in rows
+        ]
+        return {"items": items, "total": total, "limit": limit, "offset": offset, "next_cursor": next_cursor}
+
+    def list_showcase_cards(self, owner_username: str, limit: int = 10) -> list[dict[str, Any]]:
+        """Datos de las cards del showcase en una sola consulta: primera foto, cantidad de
+        fotos y detalles clave, sin traer ni parsear las columnas JSON completas."""
+        with get_connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT p.id, p.titulo, p.precio, p.ubicacion, p.public_token, p.source_portal, p.source_url,
+                       CASE WHEN COALESCE(json_array_length(p.source_image_urls_json), 0) > 0
+                            THEN json_extract(p.source_image_urls_json, '$[0]')
+                            ELSE json_extract(p.image_paths_json, '$[0]') END AS first_image,
+                       CASE WHEN COALESCE(json_array_length(p.source_image_urls_json), 0) > 0
+                            THEN json_array_length(p.source_image_urls_json)
+                            ELSE COALESCE(json_array_length(p.image_paths_json), 0) END AS photo_count,
+                       json_extract(p.detalles_json, '$.ambientes') AS ambientes,
+                       json_extract(p.detalles_json, '$.metros_totales') AS metros_totales,
+                       json_extract(p.detalles_json, '$.banos') AS banos
+                FROM properties p
+                WHERE p.owner_username = ? AND p.deleted_at IS NULL
+                ORDER BY p.created_at DESC, p.id DESC
+                LIMIT ?
+                """,
+                (owner_username, limit),
+            ).fetchall()
+        return [
+            {
+                "id": r["id"],
+                "titulo": r["titulo"],
+                "precio": r["precio"],
+                "ubicacion": r["ubicacion"],
+                "public_token": r["public_token"] or "",
+                "source_portal": r["source_portal"] or "zonaprop",
+                "source_url": r["source_url"] or "",
+                "first_image": r["first_image"] or "",
+                "photo_count": r["photo_count"] or 0,
+                "detalles": {
+                    "ambientes": r["ambientes"],
+                    "metros_totales": r["metros_totales"],
+                    "banos": r["banos"],
+                },
             }
             for r in rows
         ]
-        return {"items": items, "total": total, "limit": limit, "offset": offset}
 
     def update_tags(self, property_id: int, owner_username: str, tags: list[str]) -> bool:
         with get_connection() as conn:
             cur = conn.execute(
-                "UPDATE properties SET tags_json = ? WHERE id = ? AND owner_username = ? AND deleted_at IS NULL",
-                (json.dumps(tags, ensure_ascii=False), property_id, owner_username),
+                "UPDATE properties SET tags_json = ?, updated_at = ? WHERE id = ? AND owner_username = ? AND deleted_at IS NULL",
+                (json.dumps(tags, ensure_ascii=False), datetime.now().isoformat(), property_id, owner_username),
             )
             conn.commit()
-            return cur.rowcount > 0
+            count_cache.invalidate("properties")
+        self._notify_change(property_id)
+        return cur.rowcount > 0
 
     def soft_delete_all_properties(self, owner_username: str) -> int:
         now = datetime.now().isoformat()
         with get_connection() as conn:
             cur = conn.execute(
-                "UPDATE properties SET deleted_at = ? WHERE owner_username = ? AND deleted_at IS NULL",
-                (now, owner_username),
+                "UPDATE properties SET deleted_at = ?, updated_at = ? WHERE owner_username = ? AND deleted_at IS NULL",
+                (now, now, owner_username),
             )
             conn.commit()
-            return cur.rowcount
+            count_cache.invalidate("properties")
+        self._notify_change(None)
+        return cur.rowcount
 
     def soft_delete_property(self, property_id: int, owner_username: str | None = None) -> bool:
         now = datetime.now().isoformat()
         with get_connection() as conn:
             if owner_username:
                 cur = conn.execute(
-                    "UPDATE properties SET deleted_at = ? WHERE id = ? AND owner_username = ? AND deleted_at IS NULL",
-                    (now, property_id, owner_username),
+                    "UPDATE properties SET deleted_at = ?, updated_at = ? WHERE id = ? AND owner_username = ? AND deleted_at IS NULL",
+                    (now, now, property_id, owner_username),
                 )
             else:
                 cur = conn.execute(
-                    "UPDATE properties SET deleted_at = ? WHERE id = ? AND deleted_at IS NULL",
-                    (now, property_id),
+                    "UPDATE properties SET deleted_at = ?, updated_at = ? WHERE id = ? AND deleted_at IS NULL",
+                    (now, now, property_id),
                 )
             conn.commit()
-            return cur.rowcount > 0
+            count_cache.invalidate("properties")
+        self._notify_change(property_id)
+        return cur.rowcount > 0
 
     def restore_property(self, property_id: int, owner_username: str) -> bool:
         with get_connection() as conn:
             cur = conn.execute(
-                "UPDATE properties SET deleted_at = NULL WHERE id = ? AND owner_username = ? AND deleted_at IS NOT NULL",
-                (property_id, owner_username),
+                "UPDATE properties SET deleted_at = NULL, updated_at = ? WHERE id = ? AND owner_username = ? AND deleted_at IS NOT NULL",
+                (datetime.now().isoformat(), property_id, owner_username),
             )
             conn.commit()
-            return cur.rowcount > 0
+            count_cache.invalidate("properties")
+        self._notify_change(property_id)
+        return cur.rowcount > 0
 
     def list_deleted_properties(self, owner_username: str) -> list[dict[str, Any]]:
         with get_connection() as conn:
@@ -279,4 +450,6 @@ class PropertyRepository:
             else:
                 cur = conn.execute("DELETE FROM properties WHERE id = ? AND deleted_at IS NOT NULL", (property_id,))
             conn.commit()
-            return cur.rowcount > 0
+            count_cache.invalidate("properties")
+        self._notify_change(property_id)
+        return cur.rowcount > 0
@@ -8,7 +8,9 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from dotenv import load_dotenv
 load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env"))
 
+import config
 from db import init_db, get_connection
+from services.scrape_cache import ScrapeCache
 from services.scraper_service import ScraperService
 from services.property_service import PropertyService
 from repositories.property_repository import PropertyRepository
@@ -45,7 +47,14 @@ def main():
     init_db()
     limpiar_fichas_demo()
 
-    scraper  = ScraperService()
+    scraper  = ScraperService(
+        payload_cache=ScrapeCache(
+            config.FIRECRAWL_CACHE_DIR,
+            ttl_seconds=config.FIRECRAWL_CACHE_TTL_SECONDS,
+            mode=config.FIRECRAWL_CACHE_MODE,
+            max_bytes=config.FIRECRAWL_CACHE_MAX_BYTES,
+        )
+    )
     prop_repo = PropertyRepository()
     prop_service = PropertyService(prop_repo, BASE_DIR)
 
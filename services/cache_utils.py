@@ -0,0 +1,144 @@
+import os
+import tempfile
+import threading
+import time
+import urllib.parse
+from typing import Iterator
+
+
+def normalize_url(url: str) -> str:
+    """Normaliza una URL para usarla como clave de caché.
+
+    Baja a minúsculas esquema y host, quita el puerto por defecto y el fragmento,
+    y ordena los parámetros del query para que variantes equivalentes coincidan.
+    """
+    parsed = urllib.parse.urlsplit((url or "").strip())
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or "").lower()
+    port = parsed.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+    query = urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(parsed.query, keep_blank_values=True)))
+    return urllib.parse.urlunsplit((scheme, host, parsed.path or "/", query, ""))
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    """Escribe `data` en `path` vía archivo temporal + os.replace (nunca deja archivos a medias)."""
+    folder = os.path.dirname(path)
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class DiskLRU:
+    """Base de los cachés en disco repartidos en ``<dir>/<hh>/<sha256><ENTRY_SUFFIX>``.
+
+    Lleva el tamaño aproximado y hace el barrido de `evict`: borra las entradas vencidas
+    (el mtime del archivo principal marca cuándo se guardó) y, si el total pasa de
+    `max_bytes` (0 = sin tope), las de uso más viejo hasta el 90% del tope. Las subclases
+    eligen el sufijo y pueden sumar archivos acompañantes o cambiar la fecha de uso.
+    """
+
+    ENTRY_SUFFIX = ""
+    # Al desalojar bajamos hasta este porcentaje del máximo para no barrer en cada put.
+    _EVICT_LOW_WATERMARK = 0.9
+
+    def __init__(self, cache_dir: str, max_bytes: int, ttl_seconds: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max(0, int(max_bytes))
+        self.ttl_seconds = max(0, int(ttl_seconds))
+        self._lock = threading.Lock()
+        self._approx_size: int | None = None
+
+    def _companions(self, path: str) -> tuple[str, ...]:
+        """Archivos que se borran junto con la entrada."""
+        return ()
+
+    def _last_used(self, path: str, stat: os.stat_result) -> float:
+        """Fecha que ordena el desalojo; por defecto, cuándo se guardó."""
+        return stat.st_mtime
+
+    def _record_write(self, size: int, previous_size: int, *, sweep: bool = False) -> None:
+        """Suma una escritura al tamaño y desaloja si se pasó del tope (o si `sweep`)."""
+        with self._lock:
+            if self._approx_size is not None:
+                self._approx_size += size - previous_size
+            needs_eviction = sweep or (self.max_bytes > 0 and self._current_size() > self.max_bytes)
+        if needs_eviction:
+            self.evict()
+
+    def evict(self) -> int:
+        """Borra entradas vencidas y, si hace falta, las menos usadas. Devuelve bytes liberados."""
+        now = time.time()
+        entries: list[tuple[float, int, str]] = []
+        freed = 0
+        with self._lock:
+            for path in self._iter_entries():
+                try:
+                    stat = os.stat(path)
+                    last_used = self._last_used(path, stat)
+                except OSError:
+                    self._remove_entry(path)
+                    continue
+                if now - stat.st_mtime > self.ttl_seconds:
+                    freed += self._remove_entry(path)
+                    continue
+                entries.append((last_used, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            if self.max_bytes > 0 and total > self.max_bytes:
+                target = int(self.max_bytes * self._EVICT_LOW_WATERMARK)
+                entries.sort()
+                for _, size, path in entries:
+                    if total <= target:
+                        break
+                    self._remove_entry(path)
+                    total -= size
+                    freed += size
+            self._approx_size = total
+        return freed
+
+    def _current_size(self) -> int:
+        if self._approx_size is None:
+            total = 0
+            for path in self._iter_entries():
+                try:
+                    total += os.path.getsize(path)
+                except OSError:
+                    continue
+            self._approx_size = total
+        return self._approx_size
+
+    def _iter_entries(self) -> Iterator[str]:
+        if not os.path.isdir(self.cache_dir):
+            return
+        for folder in os.scandir(self.cache_dir):
+            if not folder.is_dir():
+                continue
+            for entry in os.scandir(folder.path):
+                if entry.name.endswith(self.ENTRY_SUFFIX):
+                    yield entry.path
+
+    def _remove_entry(self, path: str) -> int:
+        """Borra la entrada y sus acompañantes. Devuelve el tamaño del archivo principal."""
+        freed = 0
+        try:
+            freed = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            freed = 0
+        for companion in self._companions(path):
+            try:
+                os.remove(companion)
+            except OSError:
+                pass
+        return freed
@@ -0,0 +1,84 @@
+import hashlib
+import os
+import time
+
+from services.cache_utils import DiskLRU, atomic_write, normalize_url
+
+
+_CONTENT_TYPE_EXT = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/avif": ".avif",
+    "image/gif": ".gif",
+}
+
+
+class ImageCache(DiskLRU):
+    """Caché en disco de imágenes remotas, direccionada por contenido de la URL.
+
+    Cada entrada son dos archivos dentro de ``<dir>/<hh>/``:
+      - ``<sha256>.bin``: bytes de la imagen (su mtime marca cuándo se descargó → TTL)
+      - ``<sha256>.meta``: content-type (su mtime marca el último acceso → LRU)
+    """
+
+    ENTRY_SUFFIX = ".bin"
+    # Imágenes más grandes que esto no se guardan (no son fotos de ficha).
+    MAX_ENTRY_BYTES = 15 * 1024 * 1024
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self.ttl_seconds > 0
+
+    def _paths(self, url: str) -> tuple[str, str]:
+        digest = hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+        folder = os.path.join(self.cache_dir, digest[:2])
+        return os.path.join(folder, f"{digest}.bin"), os.path.join(folder, f"{digest}.meta")
+
+    @staticmethod
+    def _meta_path(data_path: str) -> str:
+        return data_path[: -len(".bin")] + ".meta"
+
+    def _companions(self, path: str) -> tuple[str, ...]:
+        return (self._meta_path(path),)
+
+    def _last_used(self, path: str, stat: os.stat_result) -> float:
+        return os.path.getmtime(self._meta_path(path))
+
+    def get(self, url: str) -> tuple[str, str] | None:
+        """Devuelve (ruta_del_archivo, content_type) si hay una entrada vigente."""
+        if not self.enabled:
+            return None
+        data_path, meta_path = self._paths(url)
+        try:
+            fetched_at = os.path.getmtime(data_path)
+            with open(meta_path, "r", encoding="utf-8") as f:
+                content_type = f.read().strip() or "image/jpeg"
+        except OSError:
+            return None
+        if time.time() - fetched_at > self.ttl_seconds:
+            self._remove_entry(data_path)
+            return None
+        try:
+            os.utime(meta_path, None)
+        except OSError:
+            pass
+        return data_path, content_type
+
+    def put(self, url: str, data: bytes, content_type: str) -> str | None:
+        """Guarda la imagen con escritura atómica. Devuelve la ruta o None si no se guardó."""
+        if not self.enabled or not data or len(data) > self.MAX_ENTRY_BYTES:
+            return None
+        content_type = (content_type or "").lower()
+        if content_type not in _CONTENT_TYPE_EXT:
+            return None
+        data_path, meta_path = self._paths(url)
+        try:
+            previous_size = os.path.getsize(data_path) if os.path.exists(data_path) else 0
+            atomic_write(data_path, data)
+            atomic_write(meta_path, content_type.encode("utf-8"))
+        except OSError:
+            return None
+
+        self._record_write(len(data), previous_size)
+        return data_path
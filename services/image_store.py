@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Iterable
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo desarrollo, un único proceso.
+    fcntl = None
+
+from services.cache_utils import atomic_write
+
+_BLOB_NAME_RE = re.compile(r"([0-9a-f]{2})/(\1[0-9a-f]{62})\.[a-z0-9]{1,5}")
+
+
+class ImageBlobStore:
+    """Fotos de las fichas guardadas una sola vez, con nombre = sha256 del contenido.
+
+    Cada ficha sigue sirviendo ``/static/properties/<id>/NN.ext``, pero esos archivos son
+    hard links a ``<blobs_dir>/<hh>/<sha256>.ext``. `blobs_dir` queda fuera de ``static/``
+    (no se sirve: con el sha256 se leería cualquier foto) pero en el mismo filesystem,
+    para poder enlazar. Reutilizar las fotos de otra ficha no
+    copia bytes. La cuenta de referencias es el st_nlink del blob (1 = ya no lo usa
+    ninguna ficha), así que vale entre procesos sin una tabla aparte. El manifiesto
+    ``<carpeta de la ficha>/.blobs.json`` dice a qué blob apunta cada archivo.
+    Si el filesystem no admite hard links, se copia como antes.
+
+    Enlazar y borrar blobs se serializa entre todos los workers con un flock sobre
+    ``<blobs_dir>/.lock``: si no, un worker podría borrar un blob con st_nlink 1 justo
+    antes de que otro lo enlace.
+    """
+
+    MANIFEST_NAME = ".blobs.json"
+    LOCK_NAME = ".lock"
+
+    def __init__(self, blobs_dir: str):
+        self.blobs_dir = blobs_dir
+        # Entre hilos del proceso; el flock de _locked() cubre los demás procesos.
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(self.blobs_dir, exist_ok=True)
+            with open(os.path.join(self.blobs_dir, self.LOCK_NAME), "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def adopt_legacy_dir(self, legacy_dir: str) -> int:
+        """Mueve a `blobs_dir` los blobs de una ubicación anterior y borra esa carpeta.
+
+        Los manifiestos guardan el nombre relativo (``hh/sha256.ext``), así que siguen
+        valiendo. Devuelve cuántos blobs se movieron.
+        """
+        if not os.path.isdir(legacy_dir):
+            return 0
+        moved = 0
+        with self._locked():
+            for root, _dirs, files in os.walk(legacy_dir):
+                for name in files:
+                    blob = os.path.relpath(os.path.join(root, name), legacy_dir).replace(os.sep, "/")
+                    if not _BLOB_NAME_RE.fullmatch(blob):
+                        continue
+                    target = self.blob_path(blob)
+                    if os.path.exists(target):
+                        continue
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    os.replace(os.path.join(root, name), target)
+                    moved += 1
+            # Lo que queda son el lock viejo, temporales o blobs ya presentes (mismo contenido).
+            shutil.rmtree(legacy_dir, ignore_errors=True)
+        return moved
+
+    def blob_path(self, blob: str) -> str:
+        return os.path.join(self.blobs_dir, blob)
+
+    def has_blob(self, blob: str | None) -> bool:
+        """True si `blob` es un nombre de blob válido (``hh/sha256.ext``) y está guardado."""
+        if not isinstance(blob, str) or not _BLOB_NAME_RE.fullmatch(blob):
+            return False
+        return os.path.isfile(self.blob_path(blob))
+
+    @staticmethod
+    def _blob_name(digest: str, ext: str) -> str:
+        return f"{digest[:2]}/{digest}{ext}"
+
+    def put_chunks(
+        self,
+        chunks: Iterable[bytes],
+        ext: str,
+        target_dir: str | None = None,
+        filename: str | None = None,
+    ) -> str:
+        """Escribe los bytes a medida que llegan y los guarda como blob si no existía.
+
+        Con `target_dir` y `filename` además enlaza ``<target_dir>/<filename>`` al blob sin
+        soltar el lock, así nadie puede borrar un blob ya existente entre guardarlo y enlazarlo.
+        Devuelve el nombre del blob (``hh/sha256.ext``). Si `chunks` lanza una excepción
+        no queda nada escrito.
+        """
+        os.makedirs(self.blobs_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=self.blobs_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    f.write(chunk)
+            blob = self._blob_name(digest.hexdigest(), ext)
+            path = self.blob_path(blob)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if target_dir is not None:
+                os.makedirs(target_dir, exist_ok=True)
+            with self._locked():
+                if os.path.exists(path):
+                    os.remove(tmp_path)
+                else:
+                    os.replace(tmp_path, path)
+                if target_dir is not None:
+                    self._link(blob, os.path.join(target_dir, filename))
+            return blob
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def adopt_file(self, path: str) -> str:
+        """Registra como blob un archivo suelto (fichas anteriores al store) sin copiarlo."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        blob = self._blob_name(digest.hexdigest(), os.path.splitext(path)[1])
+        blob_path = self.blob_path(blob)
+        with self._locked():
+            if not os.path.exists(blob_path):
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                try:
+                    os.link(path, blob_path)
+                except FileExistsError:
+                    pass
+                except OSError:
+                    shutil.copy2(path, blob_path)
+        return blob
+
+    def link_into(self, blob: str, target_dir: str, filename: str) -> str:
+        """Deja `<target_dir>/<filename>` apuntando al blob. Devuelve la ruta creada."""
+        target = os.path.join(target_dir, filename)
+        os.makedirs(target_dir, exist_ok=True)
+        with self._locked():
+            self._link(blob, target)
+        return target
+
+    def _link(self, blob: str, target: str) -> None:
+        # Con el lock tomado.
+        if os.path.lexists(target):
+            os.remove(target)
+        try:
+            os.link(self.blob_path(blob), target)
+        except OSError:
+            # Sin soporte de hard links (o blob ya borrado: copy2 también falla).
+            shutil.copy2(self.blob_path(blob), target)
+
+    def read_manifest(self, target_dir: str) -> dict[str, str]:
+        try:
+            with open(os.path.join(target_dir, self.MANIFEST_NAME), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return manifest if isinstance(manifest, dict) else {}
+
+    def write_manifest(self, target_dir: str, manifest: dict[str, str]) -> None:
+        if not manifest:
+            return
+        payload = json.dumps(manifest, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        atomic_write(os.path.join(target_dir, self.MANIFEST_NAME), payload)
+
+    def release_dir(self, target_dir: str) -> int:
+        """Borra la carpeta de una ficha y los blobs que quedaron sin referencias.
+
+        Devuelve cuántos blobs se borraron.
+        """
+        manifest = self.read_manifest(target_dir)
+        if os.path.isdir(target_dir):
+            shutil.rmtree(target_dir)
+        with self._locked():
+            return sum(self._release_blob(blob) for blob in set(manifest.values()))
+
+    def unlink(self, blob: str, target_dir: str, filename: str) -> None:
+        """Deshace un link_into: borra ``<target_dir>/<filename>`` y el blob si quedó sin referencias."""
+        with self._locked():
+            try:
+                os.remove(os.path.join(target_dir, filename))
+            except OSError:
+                pass
+            self._release_blob(blob)
+
+    def _release_blob(self, blob: str) -> bool:
+        # Con el lock tomado.
+        path = self.blob_path(blob)
+        try:
+            if os.stat(path).st_nlink <= 1:
+                os.remove(path)
+                return True
+        except OSError:
+            pass
+        return False
@@ -0,0 +1,84 @@
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+
+class JobScheduler:
+    """Ejecuta trabajos en un pool de tamaño fijo con una cola de espera acotada.
+
+    `submit` devuelve la posición en cola (0 = arranca ya) o None si la cola está llena.
+    Cada trabajo en espera recibe su nueva posición vía `on_position` cuando la cola avanza.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, thread_name_prefix: str = "job"):
+        self.max_workers = max(1, int(max_workers))
+        self.max_pending = max(0, int(max_pending))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=thread_name_prefix)
+        self._lock = threading.Lock()
+        self._waiting: deque[dict[str, Any]] = deque()
+        self._active = 0
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        on_position: Callable[[int], None] | None = None,
+    ) -> int | None:
+        entry = {"on_position": on_position, "reported": None, "report_lock": threading.Lock()}
+        with self._lock:
+            position = self._position_for(len(self._waiting))
+            if position > self.max_pending:
+                return None
+            self._waiting.append(entry)
+        if position:
+            self._report(entry, position)
+        self._executor.submit(self._run, entry, fn, args)
+        return position
+
+    def stats(self) -> dict[str, int]:
+        """Ocupación del pool de este proceso (GET /api/admin/generacion)."""
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "active": self._active,
+                "pending": max(0, len(self._waiting) - (self.max_workers - self._active)),
+                "max_pending": self.max_pending,
+            }
+
+    def _position_for(self, index: int) -> int:
+        # Posición 1 = próximo en arrancar cuando se libere un worker.
+        free_slots = self.max_workers - self._active
+        return max(0, index + 1 - free_slots)
+
+    @staticmethod
+    def _report(entry: dict[str, Any], position: int) -> None:
+        # Los avisos se mandan fuera de self._lock: dos avances seguidos pueden llegar en
+        # desorden, así que solo se informa una posición menor que la última informada.
+        if not entry["on_position"]:
+            return
+        with entry["report_lock"]:
+            if entry["reported"] is not None and position >= entry["reported"]:
+                return
+            entry["reported"] = position
+            try:
+                entry["on_position"](position)
+            except Exception:
+                pass
+
+    def _run(self, entry: dict[str, Any], fn: Callable[..., Any], args: tuple) -> None:
+        with self._lock:
+            try:
+                self._waiting.remove(entry)
+            except ValueError:
+                pass
+            self._active += 1
+            updates = [(waiting, self._position_for(index)) for index, waiting in enumerate(self._waiting)]
+        for waiting, position in updates:
+            if position > 0:
+                self._report(waiting, position)
+        try:
+            fn(*args)
+        finally:
+            with self._lock:
+                self._active -= 1
@@ -0,0 +1,284 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any
+
+from db import get_connection
+
+
+class JobStore(ABC):
+    """Estado y log de los jobs de generación, compartible entre procesos.
+
+    El proceso que corre el job escribe (`append`, `finish`) y cualquier worker web
+    puede leerlo (`get`, `read_lines`), así el stream SSE no depende de caer en el
+    mismo proceso que recibió el POST. Cada línea tiene un `seq` creciente por job.
+
+    Es abstracta: un store al que le falte algún método falla al instanciarse.
+    """
+
+    @abstractmethod
+    def create(self, job_id: str, user: str) -> None:
+        ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        """{"job_id", "user", "status", "result_url", "error_message", "created_at", "finished_at"} o None."""
+
+    @abstractmethod
+    def append(self, job_id: str, message: str) -> None:
+        ...
+
+    @abstractmethod
+    def finish(self, job_id: str, status: str, result_url: str | None = None, error_message: str | None = None) -> None:
+        ...
+
+    @abstractmethod
+    def read_lines(self, job_id: str, after_seq: int = 0, timeout: float = 30.0) -> list[tuple[int, str]]:
+        """Líneas con seq > after_seq. Espera hasta `timeout` segundos si todavía no hay."""
+
+    @abstractmethod
+    def delete(self, job_id: str) -> None:
+        ...
+
+    @abstractmethod
+    def cleanup(self, ttl_seconds: float, abandoned_after_seconds: float) -> None:
+        """Borra los jobs terminados hace más de `ttl_seconds`.
+
+        Los que siguen en cola o corriendo solo se borran si se crearon hace más de
+        `abandoned_after_seconds` (el proceso que los corría se cayó).
+        """
+
+    # Single-flight: un solo job scrapea cada URL normalizada; los demás lo siguen.
+
+    @abstractmethod
+    def claim_flight(self, key: str, job_id: str, source_url: str, ttl_seconds: float) -> dict[str, Any]:
+        """Toma `key` para `job_id` si está libre (o su dueño lleva más de `ttl_seconds`).
+
+        Devuelve el dueño vigente: {"job_id", "source_url", "created_at"}.
+        """
+
+    @abstractmethod
+    def get_flight(self, key: str) -> dict[str, Any] | None:
+        ...
+
+    @abstractmethod
+    def release_flight(self, key: str, job_id: str) -> None:
+        """Libera `key` solo si sigue siendo de `job_id`."""
+
+
+class MemoryJobStore(JobStore):
+    """Jobs en memoria del proceso: solo sirve con un único worker web."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._jobs: dict[str, dict[str, Any]] = {}
+        self._lines: dict[str, list[str]] = {}
+        self._flights: dict[str, dict[str, Any]] = {}
+
+    def create(self, job_id: str, user: str) -> None:
+        with self._cond:
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "user": user,
+                "status": "running",
+                "result_url": None,
+                "error_message": None,
+                "created_at": time.time(),
+                "finished_at": None,
+            }
+            self._lines[job_id] = []
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def append(self, job_id: str, message: str) -> None:
+        with self._cond:
+            lines = self._lines.get(job_id)
+            if lines is None:
+                return
+            lines.append(message)
+            self._cond.notify_all()
+
+    def finish(self, job_id: str, status: str, result_url: str | None = None, error_message: str | None = None) -> None:
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job:
+                job.update(
+                    status=status, result_url=result_url, error_message=error_message, finished_at=time.time()
+                )
+
+    def read_lines(self, job_id: str, after_seq: int = 0, timeout: float = 30.0) -> list[tuple[int, str]]:
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                lines = self._lines.get(job_id) or []
+                if len(lines) > after_seq:
+                    return [(seq, lines[seq - 1]) for seq in range(after_seq + 1, len(lines) + 1)]
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or job_id not in self._jobs:
+                    return []
+                self._cond.wait(remaining)
+
+    def delete(self, job_id: str) -> None:
+        with self._cond:
+            self._jobs.pop(job_id, None)
+            self._lines.pop(job_id, None)
+            self._cond.notify_all()
+
+    def cleanup(self, ttl_seconds: float, abandoned_after_seconds: float) -> None:
+        now = time.time()
+        with self._cond:
+            stale = [
+                k for k, v in self._jobs.items()
+                if (now - v["finished_at"] > ttl_seconds if v["finished_at"] is not None
+                    else now - v["created_at"] > abandoned_after_seconds)
+            ]
+        for job_id in stale:
+            self.delete(job_id)
+
+    def claim_flight(self, key: str, job_id: str, source_url: str, ttl_seconds: float) -> dict[str, Any]:
+        now = time.time()
+        with self._cond:
+            owner = self._flights.get(key)
+            if owner is None or now - owner["created_at"] > ttl_seconds:
+                owner = {"job_id": job_id, "source_url": source_url, "created_at": now}
+                self._flights[key] = owner
+            return dict(owner)
+
+    def get_flight(self, key: str) -> dict[str, Any] | None:
+        with self._cond:
+            owner = self._flights.get(key)
+            return dict(owner) if owner else None
+
+    def release_flight(self, key: str, job_id: str) -> None:
+        with self._cond:
+            owner = self._flights.get(key)
+            if owner and owner["job_id"] == job_id:
+                del self._flights[key]
+
+
+class SqliteJobStore(JobStore):
+    """Jobs en las tablas `jobs`, `job_log_lines` y `job_flights` (creadas en init_db).
+
+    Con WAL, el proceso que genera escribe cada línea en su propia transacción corta y
+    los streams de otros procesos la leen consultando cada `poll_interval` segundos.
+    """
+
+    def __init__(self, poll_interval: float = 0.5):
+        self.poll_interval = max(0.05, float(poll_interval))
+
+    def create(self, job_id: str, user: str) -> None:
+        with get_connection() as conn:
+            conn.execute(
+                "INSERT INTO jobs(job_id, user, status, created_at) VALUES (?, ?, 'running', ?)",
+                (job_id, user, time.time()),
+            )
+            conn.commit()
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        with get_connection() as conn:
+            row = conn.execute(
+                """
+                SELECT job_id, user, status, result_url, error_message, created_at, finished_at
+                FROM jobs WHERE job_id = ?
+                """,
+                (job_id,),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def append(self, job_id: str, message: str) -> None:
+        with get_connection() as conn:
+            conn.execute(
+                "INSERT INTO job_log_lines(job_id, message) VALUES (?, ?)",
+                (job_id, message),
+            )
+            conn.commit()
+
+    def finish(self, job_id: str, status: str, result_url: str | None = None, error_message: str | None = None) -> None:
+        with get_connection() as conn:
+            conn.execute(
+                """
+                UPDATE jobs SET status = ?, result_url = ?, error_message = ?, finished_at = ?
+                WHERE job_id = ?
+                """,
+                (status, result_url, error_message, time.time(), job_id),
+            )
+            conn.commit()
+
+    def read_lines(self, job_id: str, after_seq: int = 0, timeout: float = 30.0) -> list[tuple[int, str]]:
+        deadline = time.monotonic() + timeout
+        with get_connection() as conn:
+            while True:
+                rows = conn.execute(
+                    "SELECT seq, message FROM job_log_lines WHERE job_id = ? AND seq > ? ORDER BY seq",
+                    (job_id, after_seq),
+                ).fetchall()
+                if rows:
+                    return [(row["seq"], row["message"]) for row in rows]
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                time.sleep(min(self.poll_interval, remaining))
+
+    def delete(self, job_id: str) -> None:
+        with get_connection() as conn:
+            conn.execute("DELETE FROM job_log_lines WHERE job_id = ?", (job_id,))
+            conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+            conn.commit()
+
+    def cleanup(self, ttl_seconds: float, abandoned_after_seconds: float) -> None:
+        stale = "finished_at < ? OR (finished_at IS NULL AND created_at < ?)"
+        now = time.time()
+        params = (now - ttl_seconds, now - abandoned_after_seconds)
+        with get_connection() as conn:
+            # Las líneas van por job_id (índice), sin recorrer todo el log.
+            conn.execute(
+                f"DELETE FROM job_log_lines WHERE job_id IN (SELECT job_id FROM jobs WHERE {stale})",
+                params,
+            )
+            conn.execute(f"DELETE FROM jobs WHERE {stale}", params)
+            conn.commit()
+
+    def claim_flight(self, key: str, job_id: str, source_url: str, ttl_seconds: float) -> dict[str, Any]:
+        now = time.time()
+        with get_connection() as conn:
+            # Un dueño que no liberó a tiempo (proceso caído) deja de bloquear la URL.
+            conn.execute(
+                "DELETE FROM job_flights WHERE flight_key = ? AND created_at < ?",
+                (key, now - ttl_seconds),
+            )
+            conn.execute(
+                """
+                INSERT OR IGNORE INTO job_flights(flight_key, job_id, source_url, created_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (key, job_id, source_url, now),
+            )
+            row = conn.execute(
+                "SELECT job_id, source_url, created_at FROM job_flights WHERE flight_key = ?",
+                (key,),
+            ).fetchone()
+            conn.commit()
+        return dict(row)
+
+    def get_flight(self, key: str) -> dict[str, Any] | None:
+        with get_connection() as conn:
+            row = conn.execute(
+                "SELECT job_id, source_url, created_at FROM job_flights WHERE flight_key = ?",
+                (key,),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def release_flight(self, key: str, job_id: str) -> None:
+        with get_connection() as conn:
+            conn.execute("DELETE FROM job_flights WHERE flight_key = ? AND job_id = ?", (key, job_id))
+            conn.commit()
+
+
+def create_job_store(kind: str, poll_interval: float = 0.5) -> JobStore:
+    """Store según JOB_STORE: "sqlite" (por defecto, multi-proceso) o "memory"."""
+    if (kind or "").strip().lower() == "memory":
+        return MemoryJobStore()
+    return SqliteJobStore(poll_interval=poll_interval)
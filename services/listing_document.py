@@ -0,0 +1,271 @@
+import json
+import re
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import cached_property
+from html import unescape
+from typing import Any, Callable
+
+
+_FOCUS_BOUNDARY_RE = re.compile(
+    r"Propiedades similares"
+    r"|Tambi[eé]n te puede interesar"
+    r"|Te puede interesar"
+    r"|Publicaciones del anunciante"
+    r"|Preguntas para la inmobiliaria"
+    r"|Denunciar aviso"
+    r"|Aviso legal",
+    re.I,
+)
+_SCRIPT_RE = re.compile(r"<script([^>]*)>(.*?)</script>", re.I | re.S)
+_IMG_TAG_RE = re.compile(r"<img\b[^>]*>", re.I | re.S)
+# Los valores entre comillas pueden traer ">" (content="a > b"), por eso no alcanza con [^>]*.
+_META_TAG_RE = re.compile(r"""<meta\b(?:[^>"']|"[^"]*"|'[^']*')*>""", re.I)
+_META_KEY_RE = re.compile(r"""(?:property|name)=["']([^"']+)["']""", re.I)
+_META_CONTENT_RE = re.compile(r"""content=["']([^"']+)["']""", re.I)
+_LD_JSON_TYPE_RE = re.compile(r"""type=["']application/ld\+json["']""", re.I)
+_WHITESPACE_RE = re.compile(r"\s+")
+# Tramos en que ListingDocument.html_lower pasa el HTML a minúsculas.
+_LOWER_CHUNK_CHARS = 16 * 1024
+# html_to_text
+_SCRIPT_BLOCK_RE = re.compile(r"(?is)<script[^>]*>.*?</script>")
+_STYLE_BLOCK_RE = re.compile(r"(?is)<style[^>]*>.*?</style>")
+_BR_TAG_RE = re.compile(r"(?i)<br\s*/?>")
+_BLOCK_END_TAG_RE = re.compile(r"(?i)</p>|</div>|</li>|</section>|</article>|</h\d>")
+_TAG_RE = re.compile(r"(?is)<[^>]+>")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+_MULTI_SPACE_RE = re.compile(r"[ \t]{2,}")
+
+
+def focus_listing_content(text: str) -> str:
+    """Corta el texto antes del primer bloque ajeno al aviso (similares, denuncias, etc.)."""
+    if not text:
+        return ""
+    match = _FOCUS_BOUNDARY_RE.search(text)
+    return text[: match.start()] if match else text
+
+
+def find_all(text: str, needle: str, overlapping: bool = False) -> list[int]:
+    """Inicios de `needle` en `text`, en orden. Sin `overlapping`, no se solapan (como str.count)."""
+    positions: list[int] = []
+    if not needle:
+        return positions
+    step = 1 if overlapping else len(needle)
+    index = text.find(needle)
+    while index != -1:
+        positions.append(index)
+        index = text.find(needle, index + step)
+    return positions
+
+
+class TokenIndex:
+    """Posiciones de un grupo de tokens en un texto, buscadas una vez.
+
+    `any_within(start, end)` equivale a `any(token in text[start:end] for token in tokens)`:
+    para cada token, la primera aparición desde `start` es la que antes termina.
+    """
+
+    def __init__(self, text: str, tokens: tuple[str, ...]):
+        self._positions = [
+            (found, len(token))
+            for token in tokens
+            for found in (find_all(text, token, overlapping=True),)
+            if found
+        ]
+
+    def any_within(self, start: int, end: int) -> bool:
+        for found, length in self._positions:
+            i = bisect_left(found, start)
+            if i < len(found) and found[i] + length <= end:
+                return True
+        return False
+
+
+def html_to_text(html: str) -> str:
+    if not html:
+        return ""
+    text = _SCRIPT_BLOCK_RE.sub(" ", html)
+    text = _STYLE_BLOCK_RE.sub(" ", text)
+    text = _BR_TAG_RE.sub("\n", text)
+    text = _BLOCK_END_TAG_RE.sub("\n", text)
+    text = _TAG_RE.sub(" ", text)
+    text = unescape(text)
+    text = text.replace("\xa0", " ")
+    text = text.replace("\r", "")
+    text = _BLANK_LINES_RE.sub("\n\n", text)
+    text = _MULTI_SPACE_RE.sub(" ", text)
+    return text.strip()
+
+
+@dataclass(frozen=True)
+class ScriptBlock:
+    attrs: str
+    content: str
+
+    @property
+    def is_ld_json(self) -> bool:
+        return bool(_LD_JSON_TYPE_RE.search(self.attrs))
+
+    @cached_property
+    def text(self) -> str:
+        """Contenido con las entidades HTML resueltas."""
+        return unescape(self.content.strip())
+
+    @cached_property
+    def parsed_json(self) -> Any:
+        """`text` parseado como JSON (sin el ";" final), o None. Se parsea una sola vez."""
+        try:
+            return json.loads(self.text.strip().rstrip(";"))
+        except Exception:
+            return None
+
+
+@dataclass(frozen=True)
+class ImgTag:
+    start: int
+    end: int
+    tag: str
+
+
+class ListingDocument:
+    """Markdown + HTML de un aviso, parseados una sola vez por scrape.
+
+    Todo lo derivado (texto plano, versión enfocada, scripts, <img>, meta tags, JSON-LD,
+    posiciones de tokens en el HTML) se calcula la primera vez que se pide y se reutiliza en cada extractor. `focused`
+    devuelve otro documento con el contenido recortado antes de los bloques ajenos.
+    """
+
+    def __init__(self, markdown: str, html: str, *, is_focused: bool = False):
+        self.markdown = markdown or ""
+        self.html = html or ""
+        self._is_focused = is_focused
+        self._memo: dict[str, Any] = {}
+        self._token_positions: dict[str, list[int]] = {}
+        self._token_indexes: dict[tuple[str, ...], TokenIndex] = {}
+
+    @cached_property
+    def focused(self) -> "ListingDocument":
+        if self._is_focused:
+            return self
+        return ListingDocument(
+            focus_listing_content(self.markdown),
+            focus_listing_content(self.html),
+            is_focused=True,
+        )
+
+    @cached_property
+    def html_lower(self) -> str:
+        """HTML en minúsculas, con las mismas posiciones que `html`.
+
+        Se baja por tramos: con caracteres no ASCII, str.lower() reserva 12 bytes por
+        carácter mientras trabaja (~5 MB de una vez en una página de 400 KB).
+        """
+        parts = []
+        for start in range(0, len(self.html), _LOWER_CHUNK_CHARS):
+            chunk = self.html[start : start + _LOWER_CHUNK_CHARS]
+            lowered = chunk.lower()
+            if len(lowered) != len(chunk):
+                # Algún carácter se alarga al pasar a minúsculas (İ → i̇): ese queda como está.
+                lowered = "".join(ch.lower() if len(ch.lower()) == 1 else ch for ch in chunk)
+            parts.append(lowered)
+        return "".join(parts)
+
+    def token_positions(self, token: str) -> list[int]:
+        """Posiciones de `token` (en minúsculas) en `html_lower`, buscadas una vez por token."""
+        token = token.lower()
+        if token not in self._token_positions:
+            self._token_positions[token] = find_all(self.html_lower, token)
+        return self._token_positions[token]
+
+    def token_index(self, tokens: tuple[str, ...]) -> TokenIndex:
+        """TokenIndex de `tokens` (en minúsculas) sobre `html_lower`, armado una vez por grupo."""
+        if tokens not in self._token_indexes:
+            self._token_indexes[tokens] = TokenIndex(self.html_lower, tuple(t.lower() for t in tokens))
+        return self._token_indexes[tokens]
+
+    @cached_property
+    def html_text(self) -> str:
+        return html_to_text(self.html)
+
+    @cached_property
+    def source_text(self) -> str:
+        """Markdown seguido del texto plano del HTML."""
+        if not self.html_text:
+            return self.markdown
+        return f"{self.markdown}\n\n{self.html_text}"
+
+    @cached_property
+    def scripts(self) -> list[ScriptBlock]:
+        return [ScriptBlock(m.group(1), m.group(2)) for m in _SCRIPT_RE.finditer(self.html)]
+
+    @cached_property
+    def img_tags(self) -> list[ImgTag]:
+        return [ImgTag(m.start(), m.end(), m.group(0)) for m in _IMG_TAG_RE.finditer(self.html)]
+
+    @cached_property
+    def _meta_index(self) -> tuple[dict[str, str], dict[str, str]]:
+        # Dos índices para respetar la prioridad original: primero los tags con la clave
+        # antes que `content`, después los que la tienen al revés.
+        key_first: dict[str, str] = {}
+        content_first: dict[str, str] = {}
+        for tag_match in _META_TAG_RE.finditer(self.html):
+            tag = tag_match.group(0)
+            content_match = _META_CONTENT_RE.search(tag)
+            if not content_match:
+                continue
+            for key_match in _META_KEY_RE.finditer(tag):
+                target = key_first if key_match.start() < content_match.start() else content_first
+                target.setdefault(key_match.group(1).lower(), content_match.group(1))
+        return key_first, content_first
+
+    def meta(self, *keys: str) -> str:
+        """Primer valor de <meta property|name=...> para las claves pedidas, en orden."""
+        key_first, content_first = self._meta_index
+        for key in keys:
+            value = key_first.get(key.lower()) or content_first.get(key.lower())
+            if value:
+                return _WHITESPACE_RE.sub(" ", unescape(value)).strip()
+        return ""
+
+    @cached_property
+    def json_ld(self) -> dict[str, Any]:
+        """Primer nodo JSON-LD que describe el aviso (con offers, address o image)."""
+
+        def _iter_items(node: Any) -> list[dict[str, Any]]:
+            if isinstance(node, list):
+                items: list[dict[str, Any]] = []
+                for item in node:
+                    items.extend(_iter_items(item))
+                return items
+            if isinstance(node, dict):
+                graph = node.get("@graph")
+                if isinstance(graph, list):
+                    items = [node]
+                    for item in graph:
+                        items.extend(_iter_items(item))
+                    return items
+                return [node]
+            return []
+
+        for script in self.scripts:
+            if not script.is_ld_json:
+                continue
+            raw = unescape(script.content or "").strip()
+            if not raw:
+                continue
+            try:
+                payload = json.loads(raw)
+            except Exception:
+                continue
+            for item in _iter_items(payload):
+                if not isinstance(item, dict):
+                    continue
+                if item.get("offers") or item.get("address") or item.get("image"):
+                    return item
+        return {}
+
+    def memo(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Resultado de un extractor calculado una sola vez para este documento."""
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
@@ -1,21 +1,65 @@
 import os
 import re
-import shutil
+import threading
 import urllib.parse
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor, wait
 from email.message import Message
 from typing import Any
 
 from repositories.property_repository import PropertyRepository
+from services.image_store import ImageBlobStore
 
 
 MAX_IMAGES = 30  # consistente con scraper_service.MAX_IMAGES
+DOWNLOAD_WORKERS = 8
+DOWNLOAD_PER_HOST_CONCURRENCY = 4
+DOWNLOAD_DEADLINE_SECONDS = 90
+MIN_IMAGE_SIDE_PX = 250
+# Se lee de a HEADER_CHUNK_BYTES hasta encontrar el tamaño de la imagen (el SOF de un
+# JPEG puede venir después de un EXIF grande); pasado HEADER_PROBE_BYTES se acepta igual.
+HEADER_CHUNK_BYTES = 16 * 1024
+HEADER_PROBE_BYTES = 256 * 1024
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+# Nombre de las fotos dentro de la carpeta de una ficha: 01.jpg, 02.webp, ...
+_IMAGE_FILENAME_RE = re.compile(r"\d{2,3}\.[a-z0-9]{1,5}")
+
+
+class _DownloadCancelled(Exception):
+    """El lote venció su tiempo límite mientras se bajaba esta imagen."""
 
 
 class PropertyService:
-    def __init__(self, property_repo: PropertyRepository, base_dir: str):
+    def __init__(
+        self,
+        property_repo: PropertyRepository,
+        base_dir: str,
+        *,
+        download_workers: int = DOWNLOAD_WORKERS,
+        per_host_concurrency: int = DOWNLOAD_PER_HOST_CONCURRENCY,
+        download_deadline_seconds: float = DOWNLOAD_DEADLINE_SECONDS,
+        image_store: ImageBlobStore | None = None,
+    ):
         self.property_repo = property_repo
         self.base_dir = base_dir
+        if image_store is None:
+            image_store = ImageBlobStore(os.path.join(base_dir, "image_blobs"))
+            # Antes vivían dentro de static/ y se podían descargar.
+            image_store.adopt_legacy_dir(os.path.join(base_dir, "static", "properties", ".blobs"))
+        self.image_store = image_store
+        self.download_workers = max(1, int(download_workers))
+        self.per_host_concurrency = max(1, int(per_host_concurrency))
+        # Compartidos por todas las generaciones del proceso: el tope es por CDN, no por ficha.
+        self._host_limits: dict[str, threading.BoundedSemaphore] = {}
+        self._host_limits_lock = threading.Lock()
+        self.download_deadline_seconds = download_deadline_seconds
+
+    def _host_limit(self, host: str) -> threading.BoundedSemaphore:
+        with self._host_limits_lock:
+            limit = self._host_limits.get(host)
+            if limit is None:
+                limit = self._host_limits[host] = threading.BoundedSemaphore(self.per_host_concurrency)
+            return limit
 
     def save_scraped_property(
         self,
@@ -70,55 +114,77 @@ class PropertyService:
         target_dir = os.path.join(self.base_dir, "static", "properties", str(property_id))
         os.makedirs(target_dir, exist_ok=True)
 
-        saved: list[str] = []
-        failed = 0
         origin = self._origin_from_url(referer_url)
-        # Intentamos descargar todas las imágenes útiles detectadas, con un tope amplio.
-        for index, image_url in enumerate(image_urls[:MAX_IMAGES], start=1):
-            try:
-                last_err: Exception | None = None
-                data = b""
-                ext = self._guess_ext(image_url)
-                header_sets = [
-                    self._image_request_headers(referer_url=referer_url, origin=origin, include_referer=True),
-                    self._image_request_headers(referer_url=referer_url, origin=origin, include_referer=False),
-                ]
-                for headers in header_sets:
-                    req = urllib.request.Request(image_url, headers=headers)
-                    try:
-                        with urllib.request.urlopen(req, timeout=30) as response:
-                            data = response.read()
-                            ext = self._guess_ext(image_url, response.headers)
-                        last_err = None
-                        break
-                    except Exception as e:
-                        last_err = e
-                if last_err is not None:
-                    raise last_err
-                # Filtrar imágenes demasiado pequeñas (iconos, badges, UI).
-                dims = self._read_image_dimensions(data)
-                if dims is not None:
-                    w, h = dims
-                    if min(w, h) < 250:
-                        log(f"Imagen #{index} omitida (resolución {w}x{h}, probable ícono)")
-                        continue
-                filename = f"{index:02d}{ext}"
-                file_path = os.path.join(target_dir, filename)
-                with open(file_path, "wb") as f:
-                    f.write(data)
-                saved.append(f"/static/properties/{property_id}/{filename}")
-            except Exception as e:
-                failed += 1
+        candidates = list(enumerate(image_urls[:MAX_IMAGES], start=1))
+        # Se descargan en paralelo, con tope de conexiones por host para no disparar
+        # bloqueos anti-bot del CDN; el índice conserva el orden de la galería.
+        cancelled = threading.Event()
+        manifest: dict[str, str] = {}
+        # Cerrar el manifiesto y sumarle una foto se excluyen: la que llega tarde se deshace.
+        manifest_lock = threading.Lock()
+
+        def download(index: int, image_url: str) -> str | None:
+            host = urllib.parse.urlsplit(image_url or "").netloc.lower()
+            with self._host_limit(host):
+                if cancelled.is_set():
+                    return None
+                return self._download_image(
+                    index,
+                    image_url,
+                    property_id=property_id,
+                    target_dir=target_dir,
+                    referer_url=referer_url,
+                    origin=origin,
+                    cancelled=cancelled,
+                    manifest=manifest,
+                    manifest_lock=manifest_lock,
+                    log=log,
+                )
+
+        saved_by_index: dict[int, str] = {}
+        failed = 0
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, min(self.download_workers, len(candidates) or 1)),
+            thread_name_prefix="imagenes",
+        )
+        try:
+            futures = {executor.submit(download, index, url): (index, url) for index, url in candidates}
+            done, not_done = wait(futures, timeout=self.download_deadline_seconds)
+            if not_done:
+                cancelled.set()
+                for future in not_done:
+                    future.cancel()
+                log(
+                    f"Tiempo límite de descarga ({self.download_deadline_seconds}s) alcanzado: "
+                    f"{len(not_done)} imágenes sin descargar"
+                )
+                failed += len(not_done)
+            for future in done:
+                index, image_url = futures[future]
                 try:
-                    preview_url = image_url
-                    if len(preview_url) > 140:
-                        preview_url = preview_url[:140] + "..."
-                    log(f"No se pudo descargar la imagen #{index} ({preview_url}): {type(e).__name__}: {e}")
-                except Exception:
-                    # Si fallara el propio log, no rompemos el flujo de descarga.
-                    pass
-                continue
+                    path = future.result()
+                except Exception as e:
+                    failed += 1
+                    try:
+                        preview_url = image_url
+                        if len(preview_url) > 140:
+                            preview_url = preview_url[:140] + "..."
+                        log(f"No se pudo descargar la imagen #{index} ({preview_url}): {type(e).__name__}: {e}")
+                    except Exception:
+                        # Si fallara el propio log, no rompemos el flujo de descarga.
+                        pass
+                    continue
+                if path:
+                    saved_by_index[index] = path
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            # Los hilos que sigan vivos ven `cancelled` y no suman nada al manifiesto.
+            with manifest_lock:
+                cancelled.set()
+                final_manifest = dict(manifest)
 
+        saved = [saved_by_index[index] for index in sorted(saved_by_index)]
+        self.image_store.write_manifest(target_dir, final_manifest)
         if saved:
             log(f"Imagenes descargadas: {len(saved)} de {min(len(image_urls), MAX_IMAGES)}")
             if failed:
@@ -133,6 +199,88 @@ class PropertyService:
                 saved = [self._placeholder_svg_url()] * 5
         return saved
 
+    def _download_image(
+        self,
+        index: int,
+        image_url: str,
+        *,
+        property_id: int,
+        target_dir: str,
+        referer_url: str,
+        origin: str,
+        cancelled: threading.Event,
+        manifest: dict[str, str],
+        manifest_lock: threading.Lock,
+        log,
+    ) -> str | None:
+        """Descarga una imagen y la guarda como NN.ext (enlace a su blob).
+
+        Lee primero el encabezado: si la imagen es chica (ícono) corta la transferencia
+        sin bajar el resto; si no, la escribe a disco a medida que llega.
+        Devuelve la ruta pública o None si se descarta.
+        """
+        last_err: Exception | None = None
+        blob = None
+        ext = self._guess_ext(image_url)
+        filename = None
+        header_sets = [
+            self._image_request_headers(referer_url=referer_url, origin=origin, include_referer=True),
+            self._image_request_headers(referer_url=referer_url, origin=origin, include_referer=False),
+        ]
+        for headers in header_sets:
+            req = urllib.request.Request(image_url, headers=headers)
+            try:
+                with urllib.request.urlopen(req, timeout=30) as response:
+                    ext = self._guess_ext(image_url, response.headers)
+                    head = b""
+                    dims = None
+                    while len(head) < HEADER_PROBE_BYTES:
+                        chunk = response.read(HEADER_CHUNK_BYTES)
+                        if not chunk:
+                            break
+                        head += chunk
+                        dims = self._read_image_dimensions(head)
+                        if dims is not None:
+                            break
+                    # Filtrar imágenes demasiado pequeñas (iconos, badges, UI) sin bajar el resto.
+                    if dims is not None and min(dims) < MIN_IMAGE_SIDE_PX:
+                        log(f"Imagen #{index} omitida (resolución {dims[0]}x{dims[1]}, probable ícono)")
+                        return None
+                    filename = f"{index:02d}{ext}"
+                    blob = self.image_store.put_chunks(
+                        self._iter_body(response, head, cancelled), ext, target_dir, filename
+                    )
+                last_err = None
+                break
+            except _DownloadCancelled:
+                # Venció el tiempo límite: el job siguió sin esta imagen.
+                return None
+            except Exception as e:
+                last_err = e
+        if last_err is not None:
+            raise last_err
+        with manifest_lock:
+            if cancelled.is_set():
+                # Terminó después del tiempo límite: el manifiesto ya se cerró sin esta foto.
+                self.image_store.unlink(blob, target_dir, filename)
+                return None
+            manifest[filename] = blob
+        return f"/static/properties/{property_id}/{filename}"
+
+    @staticmethod
+    def _iter_body(response, head: bytes, cancelled: threading.Event):
+        """Encabezado ya leído + resto de la respuesta, de a DOWNLOAD_CHUNK_BYTES."""
+        yield head
+        while True:
+            if cancelled.is_set():
+                raise _DownloadCancelled()
+            chunk = response.read(DOWNLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+        if cancelled.is_set():
+            raise _DownloadCancelled()
+
     def save_from_cache(
         self,
         *,
@@ -187,18 +335,58 @@ class PropertyService:
             log("Imágenes en caché son remotas, reutilizando URLs originales")
             return cached_image_paths
 
-        os.makedirs(target_dir, exist_ok=True)
+        # Las fotos no se copian: la ficha nueva enlaza los mismos blobs que la original.
+        source_manifest = self.image_store.read_manifest(source_dir)
+        adopted = False
+        manifest: dict[str, str] = {}
         new_paths = []
         for old_path in cached_image_paths:
             filename = os.path.basename(old_path)
             src = os.path.join(source_dir, filename)
-            dst = os.path.join(target_dir, filename)
-            if os.path.isfile(src):
-                shutil.copy2(src, dst)
-                new_paths.append(f"/static/properties/{new_id}/{filename}")
-            else:
+            try:
+                blob = source_manifest.get(filename)
+                if not blob or not os.path.isfile(self.image_store.blob_path(blob)):
+                    # Ficha anterior al store: su archivo pasa a ser el blob.
+                    blob = self.image_store.adopt_file(src)
+                    source_manifest[filename] = blob
+                    adopted = True
+                self.image_store.link_into(blob, target_dir, filename)
+            except OSError:
                 new_paths.append(old_path)
-        log(f"Imágenes copiadas desde caché: {len([p for p in new_paths if p.startswith('/static/')])}")
+                continue
+            manifest[filename] = blob
+            new_paths.append(f"/static/properties/{new_id}/{filename}")
+        if adopted:
+            self.image_store.write_manifest(source_dir, source_manifest)
+        self.image_store.write_manifest(target_dir, manifest)
+        log(f"Imágenes reutilizadas desde caché: {len(manifest)}")
+        return new_paths
+
+    def image_manifest(self, property_id: int) -> dict[str, str]:
+        """Archivo → blob de las fotos locales de una ficha."""
+        return self.image_store.read_manifest(os.path.join(self.base_dir, "static", "properties", str(property_id)))
+
+    def link_imported_images(self, property_id: int, image_paths: list[str], blobs: dict[str, str]) -> list[str]:
+        """Enlaza en la carpeta de una ficha importada las fotos cuyo blob existe en este servidor.
+
+        `image_paths` son las rutas de la ficha original y `blobs` su manifiesto (archivo → blob).
+        Devuelve las rutas nuevas de las fotos enlazadas, en el orden original.
+        """
+        target_dir = os.path.join(self.base_dir, "static", "properties", str(property_id))
+        manifest: dict[str, str] = {}
+        new_paths = []
+        for old_path in image_paths:
+            filename = os.path.basename(old_path)
+            blob = blobs.get(filename)
+            if not _IMAGE_FILENAME_RE.fullmatch(filename) or not self.image_store.has_blob(blob):
+                continue
+            try:
+                self.image_store.link_into(blob, target_dir, filename)
+            except OSError:
+                continue
+            manifest[filename] = blob
+            new_paths.append(f"/static/properties/{property_id}/{filename}")
+        self.image_store.write_manifest(target_dir, manifest)
         return new_paths
 
     def delete_property(self, property_id: int, owner_username: str | None = None) -> bool:
@@ -208,8 +396,8 @@ class PropertyService:
 
         target_dir = os.path.join(self.base_dir, "static", "properties", str(property_id))
         try:
-            if os.path.isdir(target_dir):
-                shutil.rmtree(target_dir)
+            # Los blobs que siguen enlazados desde otras fichas no se tocan.
+            self.image_store.release_dir(target_dir)
         except Exception:
             # Si falla el borrado de imagenes no bloqueamos la eliminacion en BD.
             pass
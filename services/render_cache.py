@@ -0,0 +1,107 @@
+import hashlib
+import os
+import shutil
+import threading
+from collections import OrderedDict
+
+from services.cache_utils import atomic_write
+
+
+class RenderCache:
+    """Caché del HTML ya renderizado de cada ficha, en memoria (LRU) y en disco.
+
+    La clave es (property_id, vista de dueño, versión): la versión cambia con cada
+    escritura de la propiedad, así que nunca se sirve un HTML viejo. `invalidate`
+    libera lo guardado para una propiedad (o todo, con None) apenas cambia.
+    Disco: ``<dir>/<property_id>/<owner|public>-<sha256(versión)>.html``.
+    """
+
+    def __init__(self, cache_dir: str, memory_entries: int = 256, disk_enabled: bool = True):
+        self.cache_dir = cache_dir
+        self.memory_entries = max(0, int(memory_entries))
+        self.disk_enabled = disk_enabled
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[tuple[int, bool, str], str] = OrderedDict()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.memory_entries > 0 or self.disk_enabled
+
+    def _disk_path(self, property_id: int, is_owner: bool, version: str) -> str:
+        digest = hashlib.sha256(version.encode("utf-8")).hexdigest()[:32]
+        view = "owner" if is_owner else "public"
+        return os.path.join(self.cache_dir, str(int(property_id)), f"{view}-{digest}.html")
+
+    def get(self, property_id: int, is_owner: bool, version: str) -> str | None:
+        if not self.enabled:
+            return None
+        key = (int(property_id), bool(is_owner), version)
+        with self._lock:
+            html = self._memory.get(key)
+            if html is not None:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return html
+
+        if self.disk_enabled:
+            try:
+                with open(self._disk_path(*key), "r", encoding="utf-8") as f:
+                    html = f.read()
+            except OSError:
+                html = None
+            if html is not None:
+                with self._lock:
+                    self._counters["disk_hits"] += 1
+                    self._remember(key, html)
+                return html
+
+        with self._lock:
+            self._counters["misses"] += 1
+        return None
+
+    def put(self, property_id: int, is_owner: bool, version: str, html: str) -> None:
+        if not self.enabled:
+            return
+        key = (int(property_id), bool(is_owner), version)
+        with self._lock:
+            self._remember(key, html)
+        if not self.disk_enabled:
+            return
+        path = self._disk_path(*key)
+        view_prefix = os.path.basename(path).split("-", 1)[0] + "-"
+        try:
+            atomic_write(path, html.encode("utf-8"))
+            # Solo queda la versión vigente de cada vista.
+            for entry in os.scandir(os.path.dirname(path)):
+                if entry.name.startswith(view_prefix) and entry.path != path:
+                    os.remove(entry.path)
+        except OSError:
+            pass
+
+    def invalidate(self, property_id: int | None = None) -> None:
+        """Borra las entradas de una propiedad, o todas si `property_id` es None."""
+        with self._lock:
+            if property_id is None:
+                self._memory.clear()
+            else:
+                for key in [k for k in self._memory if k[0] == int(property_id)]:
+                    del self._memory[key]
+        if not self.disk_enabled:
+            return
+        target = self.cache_dir if property_id is None else os.path.join(self.cache_dir, str(int(property_id)))
+        shutil.rmtree(target, ignore_errors=True)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {**self._counters, "memory_entries": len(self._memory)}
+
+    def _remember(self, key: tuple[int, bool, str], html: str) -> None:
+        if self.memory_entries <= 0:
+            return
+        for stale in [k for k in self._memory if k[:2] == key[:2] and k != key]:
+            del self._memory[stale]
+        self._memory[key] = html
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
@@ -0,0 +1,119 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+from typing import Any, Iterator
+
+from services.cache_utils import DiskLRU, atomic_write, normalize_url
+
+
+CACHE_MODES = {"off", "on", "replay"}
+
+
+class ScrapeCacheMiss(RuntimeError):
+    """En modo replay no hay respuesta guardada para la URL pedida."""
+
+
+class ScrapeCache(DiskLRU):
+    """Caché en disco de las respuestas crudas de Firecrawl (markdown/html/rawHtml/images).
+
+    La clave combina la URL normalizada con el perfil de la llamada (formatos, acciones,
+    opciones), así un cambio en las acciones del portal no reutiliza respuestas viejas.
+
+    Modos:
+      - ``off``: no lee ni escribe.
+      - ``on``: sirve entradas vigentes (TTL) y guarda cada respuesta nueva.
+      - ``replay``: solo lee, ignora el TTL y nunca llama a Firecrawl (tests, benchmarks,
+        re-extracción después de cambiar el parser).
+
+    En modo ``on`` las entradas vencidas se borran de disco y el total se mantiene bajo
+    `max_bytes` (0 = sin tope) sacando las más viejas; ver `evict`.
+    """
+
+    # El archivo se escribe una sola vez, así que su mtime es el fetched_at.
+    ENTRY_SUFFIX = ".json.gz"
+    # Aunque no se llegue al tope, cada tanto un put barre las entradas vencidas.
+    _SWEEP_INTERVAL_SECONDS = 3600
+
+    def __init__(self, cache_dir: str, ttl_seconds: int, mode: str = "on", max_bytes: int = 0):
+        super().__init__(cache_dir, max_bytes, ttl_seconds)
+        self.mode = mode if mode in CACHE_MODES else "on"
+        self._next_sweep_at = 0.0
+
+    @property
+    def replay(self) -> bool:
+        return self.mode == "replay"
+
+    @staticmethod
+    def profile_key(options: dict[str, Any]) -> str:
+        encoded = json.dumps(options, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+    def _path(self, url: str, profile: str) -> str:
+        digest = hashlib.sha256(f"{normalize_url(url)}|{profile}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.json.gz")
+
+    def get(self, url: str, profile: str) -> dict[str, Any] | None:
+        if self.mode == "off":
+            return None
+        entry = self._read(self._path(url, profile))
+        if entry is None:
+            return None
+        if not self.replay and time.time() - float(entry.get("fetched_at") or 0) > self.ttl_seconds:
+            return None
+        payload = entry.get("payload")
+        return payload if isinstance(payload, dict) else None
+
+    def put(self, url: str, profile: str, payload: dict[str, Any]) -> None:
+        if self.mode != "on" or self.ttl_seconds <= 0:
+            return
+        entry = {
+            "url": url,
+            "profile": profile,
+            "fetched_at": time.time(),
+            "payload": payload,
+        }
+        data = gzip.compress(json.dumps(entry, ensure_ascii=False).encode("utf-8"), compresslevel=6)
+        path = self._path(url, profile)
+        try:
+            previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+            atomic_write(path, data)
+        except OSError:
+            # El caché es una optimización: si falla el disco seguimos sin él.
+            return
+
+        self._record_write(len(data), previous_size, sweep=time.monotonic() >= self._next_sweep_at)
+
+    def evict(self) -> int:
+        """Borra entradas vencidas y, si se pasa de `max_bytes`, las más viejas. Devuelve bytes liberados.
+
+        En modo replay no borra nada: ahí las entradas se usan sin importar el TTL.
+        """
+        if self.mode != "on":
+            return 0
+        freed = super().evict()
+        self._next_sweep_at = time.monotonic() + self._SWEEP_INTERVAL_SECONDS
+        return freed
+
+    def iter_entries(self) -> Iterator[dict[str, Any]]:
+        """Recorre todas las entradas guardadas (url, profile, fetched_at, payload)."""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for folder in sorted(os.scandir(self.cache_dir), key=lambda e: e.name):
+            if not folder.is_dir():
+                continue
+            for entry in sorted(os.scandir(folder.path), key=lambda e: e.name):
+                if entry.name.endswith(".json.gz"):
+                    loaded = self._read(entry.path)
+                    if loaded is not None:
+                        yield loaded
+
+    @staticmethod
+    def _read(path: str) -> dict[str, Any] | None:
+        try:
+            with gzip.open(path, "rb") as f:
+                entry = json.loads(f.read().decode("utf-8"))
+        except (OSError, ValueError, EOFError):
+            return None
+        return entry if isinstance(entry, dict) else None
@@ -2,6 +2,7 @@ import os
 import re
 import json
 import unicodedata
+from bisect import bisect_left, bisect_right
 from html import unescape
 import urllib.error
 import urllib.parse
@@ -10,12 +11,300 @@ from typing import Any, Callable
 
 from firecrawl import Firecrawl
 
+from services.listing_document import ListingDocument, find_all
+from services.scrape_cache import ScrapeCache, ScrapeCacheMiss
+
 
 MAX_IMAGES = 30
 MIN_PRIMARY_GALLERY_IMAGES = 6
+# Ventana de HTML (a cada lado del ID del aviso) que se usa como contexto del JSON.
+LISTING_CONTEXT_RADIUS = 30000
+# Caracteres a cada lado de un <img> en los que se buscan señales de galería.
+GALLERY_CONTEXT_RADIUS = 800
+
+# Patrones compilados una sola vez al importar el módulo (ver benchmarks/bench_regex.py).
+_PRICE_AMOUNT_RE = re.compile(r"(?:USD|U\$S|AR\$|\$)\s*[\d.,]+", re.I)
+_NON_IMAGE_EXT_RE = re.compile(r"\.(css|js|svg|gif|ico|woff2?)(\?|$)")
+_ESCAPED_URL_RE = re.compile(r"""https?:\\/\\/[^\s"'<>]+""", re.I)
+_URL_RE = re.compile(r"""https?://[^\s"'<>]+""", re.I)
+_ZONAPROP_CDN_SIZE_RE = re.compile(r'/\d{2,4}x\d{2,4}/')
+_WIDTH_PARAM_RE = re.compile(r'[?&]w=\d+')
+_ML_SIZE_SUFFIX_RE = re.compile(r'_\w+\.jpg')
+_RESIZE_SEGMENT_RE = re.compile(r"(?:fit-in|crop|thumb|thumbnail|small|medium|large)")
+_SIZE_SEGMENT_RE = re.compile(r"(?:w|h)?\d{2,4}x\d{2,4}")
+_ZONAPROP_ID_RE = re.compile(r"-(\d{6,})\.html", re.I)
+_ARGENPROP_ID_RE = re.compile(r"--(\d{5,})(?:[/?#]|$)")
+_MERCADOLIBRE_ID_RE = re.compile(r"[/-]MLA-?(\d{6,})", re.I)
+_WHITESPACE_RE = re.compile(r"\s+")
+_JSON_PRICE_AMOUNT_RE = re.compile(r'"(?:price|priceAmount)"\s*:\s*"?([\d.,]+)"?', re.I)
+_JSON_PRICE_CURRENCY_RE = re.compile(r'"(?:priceCurrency|currency)"\s*:\s*"?(USD|U\$S|ARS|AR\$|\$)"?', re.I)
+_ZONAPROP_ID_SUFFIX_RE = re.compile(r"-(\d{6,})\.html$", re.I)
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_MD_H1_RE = re.compile(r"^#\s+(.+)$", re.M)
+_MD_IMAGE_URL_RE = re.compile(r"!\[[^\]]*\]\((https?://[^\s)]+)\)", re.I)
+_MD_URL_RE = re.compile(r"https?://[^\s)\"']+", re.I)
+_IMAGE_EXT_RE = re.compile(r"\.(jpg|jpeg|png|webp|avif)(\?|$)")
+_NOISE_WORDS_RE = re.compile(r"\b(Favorito|Compartir|Notas personales|Ocultar aviso|Ver menos|Ver más avisos|Ver más anuncios)\b", re.I)
+_MD_LINK_LINE_RE = re.compile(r"^\[.+\]\(https?://")
+_MD_IMAGE_ONLY_LINE_RE = re.compile(r"!?(\[[^\]]*\])?!?\[[^\]]*\]\([^)]+\)\s*")
+_MD_IMAGE_RE = re.compile(r"!\[[^\]]*\]\(https?://")
+_LETTER_RE = re.compile(r"[A-Za-zÁÉÍÓÚáéíóúñ]")
+_DESCRIPTION_HEADER_RE = re.compile(r"(#+\s*)?(DESCRIPCION|DESCRIPCIÓN)\s*:?\s*", re.I)
+_DESC_QUESTIONS_RE = re.compile(r"Preguntas para la inmobiliaria|Seleccioná una o más preguntas", re.I)
+_UPPERCASE_HEADING_RE = re.compile(r"[A-ZÁÉÍÓÚÑ ]{4,}")
+_FEATURES_HEADER_RE = re.compile(r"(#+\s*)?(CARACTERISTICAS|CARACTERÍSTICAS)\s*:?\s*", re.I)
+_FEATURE_NOISE_WORDS_RE = re.compile(r"\b(Favorito|Compartir|Notas personales|Ocultar aviso)\b", re.I)
+_MD_BULLET_RE = re.compile(r"^[-*]\s+(.+)$")
+_HTML_TITLE_RE = re.compile(r"<title>\s*(.*?)\s*</title>", re.I | re.S)
+_TITLE_PORTAL_SUFFIX_RE = re.compile(r"\s*[|\-—]\s*(?:ZonaProp|Argenprop|MercadoLibre|Propiedades\.com).*$", re.I)
+_NON_PRICE_CHARS_RE = re.compile(r"[^\d.,]")
+_HTML_PRICE_RE = re.compile(r'(?:"price"|priceAmount)\s*[:=]\s*"?(USD|U\$S|AR\$|\$)?\s*([\d.,]+)"?', re.I)
+_HTML_TITLE_LOCATION_RE = re.compile(r'<h2[^>]*class="[^"]*title-location[^"]*"[^>]*>\s*([^<]{10,200})\s*</h2>', re.I)
+_HTML_LOCATION_CLASS_RE = re.compile(r'<(?:span|div|p)[^>]*class="[^"]*(?:location|address|ubicacion)[^"]*"[^>]*>\s*([^<]{10,200})\s*</(?:span|div|p)>', re.I)
+_HTML_ADDRESS_TESTID_RE = re.compile(r'data-testid="[^"]*address[^"]*"[^>]*>\s*([^<]{10,200})\s*<', re.I)
+_JSON_STREET_ADDRESS_RE = re.compile(r'"streetAddress"\s*:\s*"([^"]{6,180})"', re.I)
+_TEXT_STREET_RE = re.compile(
+    r'((?:Av(?:enida)?|Calle|Bv|Blvd|Ruta|Pasaje|Pje)\.?\s+[A-ZÁÉÍÓÚÑ][^\n]{5,100}'
+    r'(?:,\s*(?:entre|esq|y)\s+[^\n]{5,60})?'
+    r'(?:,\s*[A-ZÁÉÍÓÚÑ][a-záéíóúñ ]{3,40})*)',
+    re.I,
+)
+_TRAILING_SPACE_NEWLINE_RE = re.compile(r"\s+\n")
+_DESC_VER_DATOS_RE = re.compile(r"\bVer datos\b\.?", re.I)
+_DESC_LEER_MAS_RE = re.compile(r"\b(?:Leer m[aÃ¡]s|Leer menos|Ver m[aÃ¡]s)\b\.?", re.I)
+_DESC_LEPORE_SAN_CRISTOBAL_RE = re.compile(r"\bLEPORE SAN CRISTOBAL\b.*$", re.I | re.S)
+_DESC_LEPORE_PROPIEDADES_RE = re.compile(r"\bLEPORE PROPIEDADES\b.*$", re.I | re.S)
+_DESC_AVISO_LEGAL_RE = re.compile(r"\bAVISO LEGAL:.*$", re.I | re.S)
+_DESC_XINTEL_RE = re.compile(r"\bXINTEL.*$", re.I | re.S)
+_DESC_APTA_PERSONAS_RE = re.compile(r"\bEsta unidad es apta para personas.*$", re.I | re.S)
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+_MULTI_SPACE_RE = re.compile(r"[ \t]{2,}")
+_SCRIPT_BLOCK_RE = re.compile(r"(?is)<script[^>]*>.*?</script>")
+_STYLE_BLOCK_RE = re.compile(r"(?is)<style[^>]*>.*?</style>")
+_BR_TAG_RE = re.compile(r"(?i)<br\s*/?>")
+_BLOCK_END_TAG_RE = re.compile(r"(?i)</p>|</div>|</li>|</section>|</article>")
+_ANY_TAG_RE = re.compile(r"(?is)<[^>]+>")
+_CR_RE = re.compile(r"\r")
+_SPACES_AROUND_NEWLINE_RE = re.compile(r" *\n *")
+_LI_ICON_FEATURE_RE = re.compile(r'<li[^>]*class="[^"]*icon-feature[^"]*"[^>]*>(.*?)</li>', re.I | re.S)
+_TAG_RE = re.compile(r"<[^>]+>")
+_HTML_FEATURE_NOISE_RE = re.compile(r"\b(Departamento|Venta de|Favorito|Compartir|Notas personales|Ocultar aviso|Leer menos|Ver todas las fotos)\b", re.I)
+_HTML_FEATURE_HINT_RE = re.compile(r"\b(\d+\s*m[²2]|\d+\s+ambientes?|\d+\s+bañ[oa]s?|balc[oó]n|terraza|patio|parrilla|pileta|lavadero|suite|luminos[oa]|apto cr[eé]dito|seguridad|sum|quincho|jard[ií]n|cocina independiente|living-comedor|placard)\b", re.I)
+_CURRENCY_RE = re.compile(r"(USD|U\$S|AR\$|\$)", re.I)
+_TITLE_NOISE_WORDS_RE = re.compile(r"\b(favorito|compartir|publicado|actualizado|ver más avisos|ver más anuncios)\b", re.I)
+_MD_LINK_GROUPS_RE = re.compile(r"\[([^\]]+)\]\((https?://[^)]+)\)")
+_ANY_URL_RE = re.compile(r"https?://\S+")
+_NOISE_LINE_WORDS_RE = re.compile(r"\b(Favorito|Compartir|Notas personales|Ocultar aviso|Ver menos|Contactar|Denunciar)\b", re.I)
+_MD_LINK_RE = re.compile(r"\[[^\]]+\]\(https?://")
+_SYMBOLS_ONLY_RE = re.compile(r"[#>*\-\s\d|.:/]+")
+_MD_LINK_TEXT_RE = re.compile(r"\[([^\]]+)\]\(https?://[^)]+\)")
+_NUMBER_GROUP_RE = re.compile(r"(\d+(?:[.,]\d+)?)")
+_PRICE_LINE_RE = re.compile(r"(USD|U\$S|AR\$|\$)\s*[\d.,]+", re.I)
+_FEATURE_DETAIL_HINT_RE = re.compile(r"\b(?:m[²2]|ambientes?|bañ[oa]s?|cocheras?|expensas?|dorm(?:itorios?|\.?)|a estrenar|frente|contrafrente)\b", re.I)
+_FEATURE_AMENITY_HINT_RE = re.compile(r"\b(balc[oó]n|terraza|patio|parrilla|pileta|lavadero|suite|luminos[oa]|apto cr[eé]dito|seguridad|sum|quincho|jard[ií]n)\b", re.I)
+_URL_RESIZE_DIR_RE = re.compile(r"/(fit-in|crop|thumb|thumbnail|small|medium|large)/")
+_URL_SIZE_SUFFIX_RE = re.compile(r"[-_](?:\d{2,4}x\d{2,4}|w\d{2,4}|h\d{2,4})")
+_IMAGE_EXT_END_RE = re.compile(r"\.(jpg|jpeg|png|webp|avif)$")
+_URL_VARIANT_SUFFIX_RE = re.compile(r"[-_](?:scaled|thumb|thumbnail|small|medium|large)$")
+_TITLE_PIPE_RE = re.compile(r"\s+\|\s+")
+_ITEM_M2_TOTAL_RE = re.compile(r"(\d+(?:[.,]\d+)?)\s*m[²2]\s*tot", re.I)
+_ITEM_M2_CUBIERTOS_RE = re.compile(r"(\d+(?:[.,]\d+)?)\s*m[²2]\s*cub", re.I)
+_ITEM_AMBIENTES_RE = re.compile(r"(\d+)\s*amb", re.I)
+_BANOS_RE = re.compile(r"(\d+)\s*bañ[oa]s?", re.I)
+_ITEM_DORMITORIOS_RE = re.compile(r"(\d+)\s*dorm", re.I)
+_ESTADO_RE = re.compile(r"\b(A estrenar|Excelente estado|Muy buen estado|Buen estado|En construcción)\b", re.I)
+_DISPOSICION_RE = re.compile(r"\b(Frente|Contrafrente|Interno|Lateral)\b", re.I)
+_ITEM_ORIENTACION_RE = re.compile(r"\b(Norte|Sur|Este|Oeste|NE|NO|SE|SO|^[NSEO]$)\b", re.I)
+_COCHERAS_RE = re.compile(r"(\d+)\s*coch\.?", re.I)
+_ANTIGUEDAD_RE = re.compile(r"(\d+)\s*años?", re.I)
+_LUMINOSIDAD_RE = re.compile(r"\b(Muy luminoso|Luminoso|Poco luminoso)\b", re.I)
+_LINE_M2_TOTAL_RE = re.compile(r"(\d+)\s*m[²2]\s*tot\.?", re.I)
+_LINE_M2_CUBIERTOS_RE = re.compile(r"(\d+)\s*m[²2]\s*cub\.?", re.I)
+_LINE_AMBIENTES_RE = re.compile(r"(\d+)\s*amb\.?", re.I)
+_LINE_DORMITORIOS_RE = re.compile(r"(\d+)\s*dorm\.?", re.I)
+_LINE_ORIENTACION_RE = re.compile(r"\b(Norte|Sur|Este|Oeste|NE|NO|SE|SO)\b", re.I)
+_FEAT_EN_VENTA_RE = re.compile(r"\bdepartamentos?\s+en\s+venta\b")
+_FEAT_LOCATION_NOISE_RE = re.compile(r"\b(?:san\s+crist[oó]bal|capital\s+federal|ver\s+datos)\b")
+_FEAT_UI_NOISE_RE = re.compile(r"\b(publicado|actualizado|favorito|compartir|notas personales)\b")
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)?")
+_FEAT_DEPARTAMENTO_RE = re.compile(r"\bdepartamento\b")
+_FEAT_AMB_RE = re.compile(r"\bamb")
+_FEAT_STREET_WORD_RE = re.compile(r"\b(?:av|avenida|calle|pasaje|pje|ruta|boulevard|blvd|bv)\b")
+_FEAT_STREET_NUMBER_RE = re.compile(r"\d{3,5}")
+_FEAT_BANOS_RE = re.compile(r"\d+\s+bañ[oa]s?")
+_FEAT_SURFACE_RE = re.compile(r"\d+\s*m[²2]\s*(tot(?:ales?)?|cub(?:iertos?)?)?")
+_FEAT_AMBIENTES_PREFIX_RE = re.compile(r"^ambientes?\s+")
+
+# Fotos dentro de los items de imageGrid (Zonaprop), en orden.
+_HTML_GRID_IMAGE_RE = re.compile(r'class="[^"]*imageGrid-module__item[^"]*"[^>]*>.*?<img[^>]+src="([^"]+)"', re.I | re.S)
+
+# Atributos con la URL de la foto en los <img> del carrusel, en orden de preferencia.
+_GALLERY_IMAGE_ATTRS_RE = tuple(
+    re.compile(rf'{attr}=["\']([^"\']+)["\']', re.I)
+    for attr in (
+        "src", "data-src", "data-lazy", "data-url", "data-original",
+        "data-image", "data-bg", "data-flickity-lazyload",
+    )
+)
+
+# Scripts con JSON de la página: __NEXT_DATA__ primero, luego cualquier application/json.
+_JSON_SCRIPT_ATTRS_RE = (
+    re.compile(r'id=["\']__NEXT_DATA__["\']', re.I),
+    re.compile(r'type=["\']application/json["\']', re.I),
+)
+
+# Cantidad de fotos que anuncia el aviso ("Ver las 24 fotos").
+_GALLERY_LIMIT_RE = (
+    re.compile(r"ver(?:\s+todas)?\s+las?\s+(\d{1,3})\s+fotos", re.I),
+    re.compile(r"galer[ií]a(?:\s+de)?\s+(\d{1,3})\s+fotos", re.I),
+    re.compile(r"(\d{1,3})\s+fotos?\s+y\s+\d+\s+videos?", re.I),
+    re.compile(r"(\d{1,3})\s+fotos?\b", re.I),
+)
+
+# Detalles del JSON embebido del aviso (_extract_listing_payload_from_html).
+_PAYLOAD_DETAILS_RE = {
+    "metros_totales": (re.compile(r'"(?:surfaceTotal|totalArea|coveredSurfaceTotal|areaTotal)"\s*:\s*"?(\d+(?:[.,]\d+)?)"?', re.I),),
+    "metros_cubiertos": (re.compile(r'"(?:surfaceCovered|coveredArea|area)"\s*:\s*"?(\d+(?:[.,]\d+)?)"?', re.I),),
+    "ambientes": (re.compile(r'"(?:rooms|ambiences|roomAmount)"\s*:\s*"?(\d+)"?', re.I),),
+    "banos": (re.compile(r'"(?:bathrooms|bathroomsAmount|bathRoomAmount)"\s*:\s*"?(\d+)"?', re.I),),
+    "dormitorios": (re.compile(r'"(?:bedrooms|bedroomsAmount|bedroomAmount)"\s*:\s*"?(\d+)"?', re.I),),
+    "antiguedad": (re.compile(r'"(?:age|antiquity|propertyAge)"\s*:\s*"?(.*?)"?(?:,|\})', re.I),),
+    "disposicion": (re.compile(r'"(?:disposition|layout)"\s*:\s*"([^"]{2,40})"', re.I),),
+    "orientacion": (re.compile(r'"(?:orientation)"\s*:\s*"([^"]{1,20})"', re.I),),
+    "estado": (re.compile(r'"(?:condition|state|propertyState)"\s*:\s*"([^"]{2,60})"', re.I),),
+    "expensas": (re.compile(r'"(?:expenses|expensas)"\s*:\s*"?(?:\$|AR\$|USD|U\$S)?\s*([\d.,]+)"?', re.I),),
+}
+
+
+def _json_string_pattern(key: str, min_len: int, max_len: int) -> re.Pattern:
+    # Usar (?:[^"\\]|\\.)*  para capturar strings JSON con comillas escapadas
+    return re.compile(fr'"{re.escape(key)}"\s*:\s*"((?:[^"\\\\]|\\\\.){{{min_len},{max_len}}})"', re.I)
+
+
+# Strings del JSON embebido que lee _extract_listing_payload_from_html, por (clave, mín, máx).
+_PAYLOAD_STRINGS_RE = {
+    (key, min_len, max_len): _json_string_pattern(key, min_len, max_len)
+    for keys, min_len, max_len in (
+        (("title", "postingTitle", "seoTitle", "publicationTitle"), 8, 220),
+        (("formattedPrice", "priceFormatted"), 4, 80),
+        (("titleLocation", "locationName", "postingLocation"), 8, 220),
+        (("streetAddress",), 4, 180),
+        (("addressLocality", "addressRegion"), 2, 80),
+    )
+    for key in keys
+}
+
+# Imágenes lazy-loaded (_html_image_urls).
+_LAZY_IMAGE_ATTRS_RE = tuple(
+    re.compile(rf'{re.escape(attr)}=["\']?(https?://[^\s"\'<>]+)', re.I)
+    for attr in ("data-src", "data-lazy", "data-url", "data-original", "data-image", "data-bg")
+)
+
+# Ubicación completa en el JSON del HTML (_extract_location_from_html).
+_FULL_LOCATION_RE = (
+    re.compile(r'"titleLocation"\s*:\s*"([^"]{10,220})"', re.I),
+    re.compile(r'"locationName"\s*:\s*"([^"]{10,220})"', re.I),
+    re.compile(r'"postingLocation"\s*:\s*"([^"]{10,220})"', re.I),
+    re.compile(r'"location"\s*:\s*"([^"]{10,220}(?:Capital Federal|Buenos Aires|CABA)[^"]*)"', re.I),
+)
+
+# Localidad y provincia que completan la calle de "streetAddress".
+_ADDRESS_LOCALITY_RE = tuple(
+    re.compile(fr'"{key}"\s*:\s*"([^"]{{2,80}})"', re.I)
+    for key in ("addressLocality", "addressRegion")
+)
+
+# Descripción en el HTML: primero el contenedor, después el texto plano.
+_DESCRIPTION_CONTAINERS_RE = (
+    re.compile(r'<(?:div|section)[^>]+(?:data-testid|class)=["\'][^"\']*(?:description|description-section|description-text|ad-description|post-description)[^"\']*["\'][^>]*>(.*?)</(?:div|section)>', re.I | re.S),
+    re.compile(r'<p[^>]+(?:data-testid|class)=["\'][^"\']*(?:description|description-text|ad-description)[^"\']*["\'][^>]*>(.*?)</p>', re.I | re.S),
+)
+
+_DESCRIPTION_TEXT_RE = (
+    re.compile(r"Descripci[oó]n\s*(?:completa\s*)?(.+?)(?:Preguntas para la inmobiliaria|Conocé más sobre|Leer menos|Características|Caracter[ií]sticas|Servicios|Ubicaci[oó]n|Mapa|Ver en Google Maps|Ambientes|Propiedades similares|Anuncios similares)", re.I | re.S),
+    re.compile(r"(Venta de .*?(?:Capital Federal|Buenos Aires)\..+?)(?:LEPORE|AVISO LEGAL|XINTEL|Leer menos|Preguntas para la inmobiliaria)", re.I | re.S),
+    re.compile(r"(Departamento .*?(?:Capital Federal|Buenos Aires)\..+?)(?:LEPORE|AVISO LEGAL|XINTEL|Leer menos|Preguntas para la inmobiliaria)", re.I | re.S),
+)
+
+# Descripción en el JSON embebido (_extract_description_from_json_context).
+_JSON_DESCRIPTION_RE = tuple(
+    re.compile(fr'"{re.escape(key)}"\s*:\s*"((?:[^"\\]|\\.){{40,20000}})"', re.I | re.S)
+    for key in ("description", "descriptionText")
+)
+
+# Ubicación en el markdown (_extract_location).
+_MARKDOWN_LOCATION_RE = (
+    re.compile(r"(?:Dirección|Ubicación)\s*:?\s*(.+)", re.I),
+    re.compile(r"(?m)^(Capital Federal|CABA|Buenos Aires|San Cristóbal|San Cristobal|Palermo|Belgrano|Caballito|Recoleta|Vicente López|Vicente Lopez|San Isidro)\s*$", re.I),
+    re.compile(r"(?m)^[>#\-\*\s]*([A-ZÁÉÍÓÚÑ][^\n]{6,120},\s*[A-ZÁÉÍÓÚÑa-záéíóúñ ]{3,80})$", re.I),
+    re.compile(r"(?m)^[>#\-\*\s]*([A-ZÁÉÍÓÚÑ][^\n]{6,120}\b(?:CABA|Capital Federal|Buenos Aires|Vicente López|San Isidro|Olivos|Palermo|Belgrano)\b[^\n]*)$", re.I),
+)
+
+# Detalles en el markdown (_extract_detail_candidates), en orden de preferencia.
+_DETAIL_CANDIDATES_RE = {
+    "ambientes": (
+        re.compile(r"(\d+)\s+ambientes?", re.I),
+        re.compile(r"Ambientes?\s*:?\s*(\d+)", re.I),
+    ),
+    "dormitorios": (
+        re.compile(r"(\d+)\s+dorm(?:itorios?|\.?)", re.I),
+        re.compile(r"Dormitorios?\s*:?\s*(\d+)", re.I),
+    ),
+    "banos": (
+        re.compile(r"(\d+)\s+bañ[oa]s?", re.I),
+        re.compile(r"Baños?\s*:?\s*(\d+)", re.I),
+    ),
+    "metros_totales": (
+        re.compile(r"(\d+(?:[.,]\d+)?)\s*m[²2](?:\s*tot\.?|\s*totales?)", re.I),
+        re.compile(r"Sup(?:erficie)?\s*total\s*:?\s*(\d+(?:[.,]\d+)?)\s*m[²2]", re.I),
+    ),
+    "metros_cubiertos": (
+        re.compile(r"(\d+(?:[.,]\d+)?)\s*m[²2](?:\s*cub\.?|\s*cubiertos?)", re.I),
+        re.compile(r"Sup(?:erficie)?\s*cubierta\s*:?\s*(\d+(?:[.,]\d+)?)\s*m[²2]", re.I),
+    ),
+    "cocheras": (
+        re.compile(r"(\d+)\s+cocheras?", re.I),
+        re.compile(r"Cocheras?\s*:?\s*(\d+)", re.I),
+    ),
+    "antiguedad": (
+        re.compile(r"Antigüedad\s*:?\s*([^\n|]{1,40})", re.I),
+        re.compile(r"Antiguedad\s*:?\s*([^\n|]{1,40})", re.I),
+    ),
+    "expensas": (
+        re.compile(r"Expensas\s*:?\s*((?:USD|U\$S|AR\$|\$)\s*[\d.,]+)", re.I),
+    ),
+    "disposicion": (
+        re.compile(r"\b(Frente|Contrafrente|Interno|Lateral)\b", re.I),
+    ),
+    "orientacion": (
+        re.compile(r"\b(Norte|Sur|Este|Oeste|NE|NO|SE|SO)\b", re.I),
+    ),
+    "estado": (
+        re.compile(r"\b(A estrenar|Excelente estado|Muy buen estado|Buen estado|En construcción)\b", re.I),
+    ),
+}
+
+# Tokens que delatan el bloque con los datos del aviso (_extract_listing_context).
+_LISTING_CONTEXT_TOKENS = (
+    "titlelocation", "streetaddress", "price", "description",
+    "m2", "cub", "tot", "bath", "room", "dorm", "image",
+)
+
+
+# Tokens cerca de un <img> que lo marcan como foto de la galería o lo descartan.
+_GALLERY_TOKENS = (
+    "imagegrid", "gallery", "carousel", "slider", "multimedia",
+    "photo", "photos", "foto", "fotos", "cover", "slide",
+)
+_GALLERY_BLOCKED_TOKENS = (
+    "logo", "icon", "sprite", "placeholder", "favicon",
+    "floorplan", "planos", "plano", "mapa", "staticmap",
+)
 
 
 class ScraperService:
+    def __init__(self, payload_cache: ScrapeCache | None = None):
+        self.payload_cache = payload_cache
 
     # ──────────────────────────────────────────────
     # Punto de entrada público
@@ -35,7 +324,8 @@ class ScraperService:
         raw_html = payload["raw_html"]
 
         log("Procesando contenido estructurado desde Firecrawl...")
-        extracted = self._extract_structured_data(markdown, html, raw_html, source_url, log)
+        document = ListingDocument(markdown, raw_html or html)
+        extracted = self._extract_structured_data(document, source_url, log)
         validation_error = self._validate_extracted_listing(
             portal=portal,
             source_url=source_url,
@@ -52,8 +342,7 @@ class ScraperService:
         log(f"URLs de imágenes extraídas del HTML: {len(image_urls_llm)}, Firecrawl: {len(firecrawl_images)}")
         image_urls = self._select_image_urls(
             portal=portal,
-            markdown=markdown,
-            html=raw_html or html,
+            document=document,
             llm_urls=image_urls_llm,
             firecrawl_urls=firecrawl_images,
             log=log,
@@ -98,6 +387,25 @@ class ScraperService:
     def _fetch_content(
         self, url: str, portal: str, log: Callable[[str], None]
     ) -> dict[str, Any]:
+        scrape_options = {
+            "formats": ["markdown", "html", "rawHtml", "images"],
+            "only_main_content": False,
+            "wait_for": 1500,
+            "timeout": 30000,
+            "location": {"country": "AR", "languages": ["es-AR", "es"]},
+            "actions": self._actions_for_portal(portal),
+        }
+        profile = ScrapeCache.profile_key(scrape_options)
+        if self.payload_cache is not None:
+            cached_payload = self.payload_cache.get(url, profile)
+            if cached_payload is not None:
+                log("Respuesta de Firecrawl reutilizada desde caché local")
+                return cached_payload
+            if self.payload_cache.replay:
+                raise ScrapeCacheMiss(
+                    f"Modo replay: no hay respuesta de Firecrawl guardada para {url}"
+                )
+
         api_key = os.getenv("FIRECRAWL_API_KEY", "").strip()
         if not api_key:
             raise RuntimeError(
@@ -108,15 +416,7 @@ class ScraperService:
         app = Firecrawl(api_key=api_key)
 
         try:
-            result = app.scrape(
-                url,
-                formats=["markdown", "html", "rawHtml", "images"],
-                only_main_content=False,
-                wait_for=1500,
-                timeout=30000,
-                location={"country": "AR", "languages": ["es-AR", "es"]},
-                actions=self._actions_for_portal(portal),
-            )
+            result = app.scrape(url, **scrape_options)
         except Exception as e:
             raise RuntimeError(f"Error llamando a Firecrawl: {e}") from e
 
@@ -147,52 +447,54 @@ class ScraperService:
         log(f"Imágenes detectadas por Firecrawl: {len(image_urls)}")
         if raw_html or html:
             log(f"HTML obtenido desde Firecrawl: {len(raw_html or html)} caracteres")
-        return {
+        payload = {
             "markdown": markdown,
             "images": image_urls,
             "html": html,
             "raw_html": raw_html,
         }
+        if self.payload_cache is not None:
+            self.payload_cache.put(url, profile, payload)
+        return payload
 
     # ──────────────────────────────────────────────
     # Paso 2: Markdown → dict estructurado
     # ──────────────────────────────────────────────
 
     def _extract_structured_data(
-        self, markdown: str, html: str, raw_html: str, source_url: str, log: Callable[[str], None]
+        self, document: ListingDocument, source_url: str, log: Callable[[str], None]
     ) -> dict[str, Any]:
         log("Usando extracción heurística mejorada desde Markdown de Firecrawl.")
-        return self._build_fallback_from_content(markdown, raw_html or html, source_url)
+        return self._build_fallback_from_content(document, source_url)
 
     # ──────────────────────────────────────────────
     # Extracción heurística
     # ──────────────────────────────────────────────
 
-    def _build_fallback_from_content(self, markdown: str, html: str, source_url: str) -> dict[str, Any]:
-        focused_markdown = self._focus_listing_content(markdown)
-        focused_html = self._focus_listing_content(html)
-        source_text = self._merge_sources(focused_markdown, focused_html)
-        full_source_text = self._merge_sources(markdown, html)  # Versión sin focus como fallback
-        listing_payload = self._extract_listing_payload_from_html(html, source_url)
-        trusted_html = focused_html if listing_payload.get("_listing_id_found") else ""
-        price_match = re.search(r"(?:USD|U\$S|AR\$|\$)\s*[\d.,]+", focused_markdown or markdown, re.I)
-        titulo_html = listing_payload.get("titulo") or self._extract_title_from_html(trusted_html)
-        precio_html = listing_payload.get("precio") or self._extract_price_from_html(trusted_html)
+    def _build_fallback_from_content(self, document: ListingDocument, source_url: str) -> dict[str, Any]:
+        focused = document.focused
+        source_text = focused.source_text
+        full_source_text = document.source_text  # Versión sin focus como fallback
+        listing_payload = self._extract_listing_payload_from_html(document, source_url)
+        trusted = focused if listing_payload.get("_listing_id_found") else ListingDocument("", "")
+        price_match = _PRICE_AMOUNT_RE.search(focused.markdown or document.markdown)
+        titulo_html = listing_payload.get("titulo") or self._extract_title_from_html(trusted)
+        precio_html = listing_payload.get("precio") or self._extract_price_from_html(trusted)
         descripcion = (
-            self._extract_description(source_text, focused_html, full_source_text, html)
+            self._extract_description(source_text, focused, full_source_text, document)
             or listing_payload.get("descripcion")
             or self._best_text_block(source_text)
         )
-        caracteristicas = self._extract_features(source_text, focused_html)
+        caracteristicas = self._extract_features(source_text, focused)
         detalles = self._extract_detail_candidates(source_text)
-        detalles_html = self._extract_detail_candidates_from_html(focused_html)
+        detalles_html = self._extract_detail_candidates_from_html(focused)
         detalles.update({k: v for k, v in detalles_html.items() if v})
         detalles.update({k: v for k, v in (listing_payload.get("detalles") or {}).items() if v})
 
         # FIX: ubicación — intentar primero desde HTML (dirección completa)
         ubicacion = (
             listing_payload.get("ubicacion")
-            or self._extract_location_from_html(trusted_html)
+            or self._extract_location_from_html(trusted)
             or self._extract_location(source_text)
             or "Ver en el portal"
         )
@@ -214,7 +516,7 @@ class ScraperService:
             "disposicion":     detalles.get("disposicion"),
             "orientacion":     detalles.get("orientacion"),
             "caracteristicas": self._merge_feature_lists(caracteristicas, self._details_to_features(detalles)),
-            "image_urls":      (listing_payload.get("image_urls") or []) + self._extract_contextual_image_urls_from_html(focused_html),
+            "image_urls":      (listing_payload.get("image_urls") or []) + self._extract_contextual_image_urls_from_html(focused),
             "_listing_id_found": bool(listing_payload.get("_listing_id_found")),
         }
 
@@ -227,10 +529,9 @@ class ScraperService:
 
         # Buscar TODAS las imágenes dentro de divs con imageGrid-module__item__
         # Patrón simple: cualquier img dentro de imageGrid-module__item__
-        pattern = r'class="[^"]*imageGrid-module__item[^"]*"[^>]*>.*?<img[^>]+src="([^"]+)"'
 
         urls = []
-        for match in re.finditer(pattern, html, re.I | re.S):
+        for match in _HTML_GRID_IMAGE_RE.finditer(html):
             url = match.group(1).strip()
             if url and url not in urls:  # Evitar duplicados
                 urls.append(url)
@@ -239,39 +540,51 @@ class ScraperService:
         return urls
 
     @staticmethod
-    def _extract_ordered_gallery_image_urls_from_html(html: str) -> list[str]:
+    def _gallery_uses_token_index(document: ListingDocument) -> bool:
+        """Si las ventanas alrededor de los <img> suman más que el documento.
+
+        Con muchas fotos las ventanas se pisan: conviene pasar el HTML a minúsculas y
+        ubicar los tokens una sola vez, y consultar por posición. Con pocas, mirar cada
+        ventana es más barato que recorrer el documento entero.
+        """
+        return len(document.img_tags) * (2 * GALLERY_CONTEXT_RADIUS) > len(document.html)
+
+    @staticmethod
+    def _extract_ordered_gallery_image_urls_from_html(document: ListingDocument) -> list[str]:
         """Extrae las fotos del carrusel en el mismo orden en que aparecen en el DOM."""
+        html = document.html
         if not html:
             return []
 
-        gallery_tokens = (
-            "imagegrid", "gallery", "carousel", "slider", "multimedia",
-            "photo", "photos", "foto", "fotos", "cover", "slide",
-        )
-        blocked_tokens = (
-            "logo", "icon", "sprite", "placeholder", "favicon",
-            "floorplan", "planos", "plano", "mapa", "staticmap",
-        )
-        attribute_patterns = (
-            "src", "data-src", "data-lazy", "data-url", "data-original",
-            "data-image", "data-bg", "data-flickity-lazyload",
-        )
+        img_tags = document.img_tags
+        radius = GALLERY_CONTEXT_RADIUS
+        if ScraperService._gallery_uses_token_index(document):
+            gallery = document.token_index(_GALLERY_TOKENS)
+            blocked = document.token_index(_GALLERY_BLOCKED_TOKENS)
+            near_gallery = gallery.any_within
+            near_blocked = blocked.any_within
+        else:
+            def near_gallery(start: int, end: int) -> bool:
+                context = html[start:end].lower()
+                return any(token in context for token in _GALLERY_TOKENS)
 
-        ordered: list[str] = []
-        for match in re.finditer(r"<img\b[^>]*>", html, re.I | re.S):
-            tag = match.group(0)
-            start = max(0, match.start() - 800)
-            end = min(len(html), match.end() + 800)
-            context = html[start:end].lower()
+            def near_blocked(start: int, end: int) -> bool:
+                context = html[start:end].lower()
+                return any(token in context for token in _GALLERY_BLOCKED_TOKENS)
 
-            if not any(token in context for token in gallery_tokens):
+        ordered: list[str] = []
+        for img in img_tags:
+            tag = img.tag
+            start = max(0, img.start - radius)
+            end = min(len(html), img.end + radius)
+            if not near_gallery(start, end):
                 continue
-            if any(token in context for token in blocked_tokens):
+            if near_blocked(start, end):
                 continue
 
             url = ""
-            for attr in attribute_patterns:
-                attr_match = re.search(rf'{attr}=["\']([^"\']+)["\']', tag, re.I)
+            for attr_pattern in _GALLERY_IMAGE_ATTRS_RE:
+                attr_match = attr_pattern.search(tag)
                 if not attr_match:
                     continue
                 candidate = ScraperService._decode_json_string(attr_match.group(1).strip())
@@ -284,39 +597,39 @@ class ScraperService:
                 continue
 
             lower_url = url.lower()
-            if any(token in lower_url for token in blocked_tokens):
+            if any(token in lower_url for token in _GALLERY_BLOCKED_TOKENS):
                 continue
-            if re.search(r"\.(css|js|svg|gif|ico|woff2?)(\?|$)", lower_url):
+            if _NON_IMAGE_EXT_RE.search(lower_url):
                 continue
             ordered.append(url)
+            if len(ordered) >= MAX_IMAGES:
+                break
 
-        return ordered[:MAX_IMAGES]
+        return ordered
 
     @staticmethod
-    def _extract_image_urls_from_next_data(html: str) -> list[str]:
+    def _extract_image_urls_from_next_data(document: ListingDocument) -> list[str]:
         """Extrae URLs de imágenes del bloque __NEXT_DATA__ (Next.js) o cualquier
         <script type="application/json"> que contenga arrays de fotos."""
-        if not html:
+        if not document.html:
             return []
 
         # Buscar __NEXT_DATA__ primero, luego cualquier JSON grande con fotos
-        patterns = [
-            r'<script[^>]+id=["\']__NEXT_DATA__["\'][^>]*>(.*?)</script>',
-            r'<script[^>]+type=["\']application/json["\'][^>]*>(.*?)</script>',
-        ]
         candidates: list[str] = []
-        for pattern in patterns:
-            for m in re.finditer(pattern, html, re.I | re.S):
-                script_content = m.group(1).strip()
+        for pattern in _JSON_SCRIPT_ATTRS_RE:
+            for script in document.scripts:
+                if not pattern.search(script.attrs):
+                    continue
+                script_content = script.content.strip()
                 if not script_content:
                     continue
                 try:
                     data = json.loads(script_content)
                 except Exception:
                     # Si no parsea limpio, buscar URLs directamente con regex
-                    for url_raw in re.findall(r"""https?:\\/\\/[^\s"'<>]+""", script_content, re.I):
+                    for url_raw in _ESCAPED_URL_RE.findall(script_content):
                         candidates.append(ScraperService._decode_json_string(url_raw))
-                    for url_raw in re.findall(r"""https?://[^\s"'<>]+""", script_content, re.I):
+                    for url_raw in _URL_RE.findall(script_content):
                         candidates.append(url_raw)
                     continue
                 # Recorrer el JSON buscando todas las strings que parezcan imágenes
@@ -363,19 +676,17 @@ class ScraperService:
         self,
         *,
         portal: str,
-        markdown: str,
-        html: str,
+        document: ListingDocument,
         llm_urls: list[str],
         firecrawl_urls: list[str],
         log: Callable[[str], None] | None = None,
     ) -> list[str]:
-        focused_markdown = self._focus_listing_content(markdown)
-        focused_html = self._focus_listing_content(html)
-        gallery_limit = self._extract_gallery_limit(focused_markdown, focused_html)
+        focused = document.focused
+        gallery_limit = self._extract_gallery_limit(focused)
 
         # Extracción específica de __NEXT_DATA__ (Next.js / ZonaProp / Argenprop)
-        dom_ordered_urls = self._extract_ordered_gallery_image_urls_from_html(html)
-        next_data_urls = self._extract_image_urls_from_next_data(html)
+        dom_ordered_urls = self._extract_ordered_gallery_image_urls_from_html(document)
+        next_data_urls = self._extract_image_urls_from_next_data(document)
 
         if portal == "zonaprop" and dom_ordered_urls:
             result = dom_ordered_urls[: gallery_limit or MAX_IMAGES]
@@ -401,7 +712,7 @@ class ScraperService:
                 return result
 
         # PRIORIDAD 2: Extraer imágenes del HTML grid (solo si next_data no tiene suficientes)
-        grid_urls = self._extract_image_urls_from_html_grid(html)
+        grid_urls = self._extract_image_urls_from_html_grid(document.html)
         if grid_urls and len(grid_urls) >= MIN_PRIMARY_GALLERY_IMAGES:
             result = grid_urls[: gallery_limit or MAX_IMAGES]
             if log:
@@ -415,9 +726,9 @@ class ScraperService:
         # Fallback: mezclar de múltiples fuentes (solo si next_data_urls no fue suficiente)
         primary_candidates: list[str] = []
         for group in (
-            self._extract_contextual_image_urls_from_html(focused_html),
-            self._extract_image_urls_from_html(focused_html),
-            self._extract_image_urls_from_markdown(focused_markdown),
+            self._extract_contextual_image_urls_from_html(focused),
+            self._extract_image_urls_from_html(focused),
+            self._extract_image_urls_from_markdown(focused.markdown),
         ):
             self._append_unique_urls(primary_candidates, group)
 
@@ -438,7 +749,7 @@ class ScraperService:
                 next_data_urls,
                 self._filter_image_urls(llm_urls, strict=False),
                 self._filter_image_urls(firecrawl_urls, strict=False),
-                self._extract_contextual_image_urls_from_html(html),
+                self._extract_contextual_image_urls_from_html(document),
             ):
                 self._append_unique_urls(merged, group, preferred_group=preferred_group)
             result = merged[: gallery_limit or MAX_IMAGES]
@@ -449,9 +760,9 @@ class ScraperService:
                 primary_candidates,
                 self._filter_image_urls(llm_urls, strict=False),
                 self._filter_image_urls(firecrawl_urls, strict=False),
-                self._extract_contextual_image_urls_from_html(html),
-                self._extract_image_urls_from_html(html),
-                self._extract_image_urls_from_markdown(markdown),
+                self._extract_contextual_image_urls_from_html(document),
+                self._extract_image_urls_from_html(document),
+                self._extract_image_urls_from_markdown(document.markdown),
             ):
                 self._append_unique_urls(merged, group)
             result = merged[: gallery_limit or MAX_IMAGES]
@@ -473,12 +784,12 @@ class ScraperService:
 
         # ZonaProp CDN (imgar.zonapropcdn.com): resolución en el path /NxN/
         if 'imgar.zonapropcdn.com' in url or 'imgar.zonaprop' in url:
-            url = re.sub(r'/\d{2,4}x\d{2,4}/', '/1200x1200/', url)
+            url = _ZONAPROP_CDN_SIZE_RE.sub('/1200x1200/', url)
             return url
 
         # ZonaProp/Argenprop: cambiar parámetro 'w' (width) a máximo
         if 'img.zp.com.ar' in url or 'img.mercadolibre.com' in url or 'imgmercadolibre' in url:
-            url = re.sub(r'[?&]w=\d+', '', url)
+            url = _WIDTH_PARAM_RE.sub('', url)
             if '?' not in url:
                 url += '?w=2000'
             else:
@@ -487,7 +798,7 @@ class ScraperService:
 
         # MercadoLibre: cambiar calidad/tamaño
         if 'mlstatic.com' in url or 'mluruguay' in url or 'mlbrasil' in url or 'mlchile' in url:
-            url = re.sub(r'_\w+\.jpg', '.jpg', url)
+            url = _ML_SIZE_SUFFIX_RE.sub('.jpg', url)
             return url
 
         return url
@@ -501,34 +812,10 @@ class ScraperService:
                 target.append(url)
 
     @staticmethod
-    def _focus_listing_content(text: str) -> str:
-        if not text:
-            return ""
-        boundaries = [
-            r"Propiedades similares",
-            r"Tambi[eé]n te puede interesar",
-            r"Te puede interesar",
-            r"Publicaciones del anunciante",
-            r"Preguntas para la inmobiliaria",
-            r"Denunciar aviso",
-            r"Aviso legal",
-        ]
-        end_positions = [match.start() for pattern in boundaries for match in [re.search(pattern, text, re.I)] if match]
-        if not end_positions:
-            return text
-        return text[: min(end_positions)]
-
-    @staticmethod
-    def _extract_gallery_limit(markdown: str, html: str) -> int | None:
-        haystack = "\n".join(part for part in (markdown, ScraperService._html_to_text(html)) if part)
-        patterns = [
-            r"ver(?:\s+todas)?\s+las?\s+(\d{1,3})\s+fotos",
-            r"galer[ií]a(?:\s+de)?\s+(\d{1,3})\s+fotos",
-            r"(\d{1,3})\s+fotos?\s+y\s+\d+\s+videos?",
-            r"(\d{1,3})\s+fotos?\b",
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, haystack, re.I)
+    def _extract_gallery_limit(document: ListingDocument) -> int | None:
+        haystack = "\n".join(part for part in (document.markdown, document.html_text) if part)
+        for pattern in _GALLERY_LIMIT_RE:
+            match = pattern.search(haystack)
             if not match:
                 continue
             count = int(match.group(1))
@@ -537,15 +824,18 @@ class ScraperService:
         return None
 
     @staticmethod
-    def _extract_contextual_image_urls_from_html(html: str) -> list[str]:
+    def _extract_contextual_image_urls_from_html(document: ListingDocument) -> list[str]:
+        return document.memo(
+            "contextual_image_urls",
+            lambda: ScraperService._contextual_image_urls(document.html),
+        )
+
+    @staticmethod
+    def _contextual_image_urls(html: str) -> list[str]:
         if not html:
             return []
 
         candidates: list[str] = []
-        patterns = (
-            r"""https?://[^\s"'<>]+""",
-            r"""https?:\\/\\/[^\s"'<>]+""",
-        )
         required_tokens = (
             "image", "images", "photo", "photos", "gallery",
             "carousel", "cover", "slide", "multimedia",
@@ -557,8 +847,8 @@ class ScraperService:
             "agent", "broker", "banner",
         )
 
-        for pattern in patterns:
-            for match in re.finditer(pattern, html, re.I):
+        for pattern in (_URL_RE, _ESCAPED_URL_RE):
+            for match in pattern.finditer(html):
                 raw_url = match.group(0)
                 url = raw_url.replace("\\/", "/")
                 start = max(0, match.start() - 220)
@@ -595,9 +885,9 @@ class ScraperService:
         parts = [part for part in (parsed.path or "").lower().split("/") if part]
         cleaned_parts: list[str] = []
         for part in parts[:-1]:
-            if re.fullmatch(r"(?:fit-in|crop|thumb|thumbnail|small|medium|large)", part):
+            if _RESIZE_SEGMENT_RE.fullmatch(part):
                 continue
-            if re.fullmatch(r"(?:w|h)?\d{2,4}x\d{2,4}", part):
+            if _SIZE_SEGMENT_RE.fullmatch(part):
                 continue
             cleaned_parts.append(part)
         prefix = "/".join(cleaned_parts[:4])
@@ -615,22 +905,23 @@ class ScraperService:
     @staticmethod
     def _extract_listing_id_from_url(source_url: str) -> str:
         # ZonaProp: -58320209.html
-        match = re.search(r"-(\d{6,})\.html", source_url or "", re.I)
+        match = _ZONAPROP_ID_RE.search(source_url or "")
         if match:
             return match.group(1)
         # Argenprop: --5918487 al final de la URL
-        match = re.search(r"--(\d{5,})(?:[/?#]|$)", source_url or "")
+        match = _ARGENPROP_ID_RE.search(source_url or "")
         if match:
             return match.group(1)
         # MercadoLibre: -MLA-XXXXXXXXX o /MLA-XXXXXXXXX
-        match = re.search(r"[/-]MLA-?(\d{6,})", source_url or "", re.I)
+        match = _MERCADOLIBRE_ID_RE.search(source_url or "")
         if match:
             return match.group(1)
         return ""
 
     @staticmethod
-    def _extract_listing_context(html: str, listing_id: str) -> str:
-        listing_object = ScraperService._extract_listing_object(html, listing_id)
+    def _extract_listing_context(document: ListingDocument, listing_id: str) -> str:
+        html = document.html
+        listing_object = ScraperService._extract_listing_object(document, listing_id)
         if listing_object:
             try:
                 return json.dumps(listing_object, ensure_ascii=False)
@@ -639,59 +930,50 @@ class ScraperService:
         if not html or not listing_id:
             return ""
 
-        positions = [match.start() for match in re.finditer(re.escape(listing_id), html)]
+        positions = find_all(html, listing_id)
         if not positions:
             return ""
 
-        best_window = html
+        # Cada ventana se puntúa contando, por búsqueda binaria, cuántas apariciones de
+        # cada token (indexadas una vez sobre todo el HTML) caen enteras adentro.
+        tokens = [(document.token_positions(token), len(token)) for token in _LISTING_CONTEXT_TOKENS]
+        best_start, best_end = 0, len(html)
         best_score = -1
         for position in positions:
-            start = max(0, position - 30000)
-            end = min(len(html), position + 30000)
-            window = html[start:end]
-            score = 0
-            for token in (
-                "titleLocation", "streetAddress", "price", "description",
-                "m2", "cub", "tot", "bath", "room", "dorm", "image",
-            ):
-                score += window.lower().count(token.lower())
+            start = max(0, position - LISTING_CONTEXT_RADIUS)
+            end = min(len(html), position + LISTING_CONTEXT_RADIUS)
+            score = sum(
+                bisect_right(found, end - length) - bisect_left(found, start)
+                for found, length in tokens
+            )
             if score > best_score:
                 best_score = score
-                best_window = window
-        return best_window
+                best_start, best_end = start, end
+        return html[best_start:best_end]
 
     @staticmethod
-    def _extract_listing_object(html: str, listing_id: str) -> dict[str, Any]:
-        if not html or not listing_id:
+    def _extract_listing_object(document: ListingDocument, listing_id: str) -> dict[str, Any]:
+        if not document.html or not listing_id:
             return {}
 
-        script_matches = re.finditer(
-            r'<script[^>]*>\s*(.*?)\s*</script>',
-            html,
-            re.I | re.S,
-        )
-        for match in script_matches:
-            script_content = unescape(match.group(1) or "")
+        for script in document.scripts:
+            script_content = script.text
             if listing_id not in script_content:
                 continue
 
-            candidates: list[Any] = []
-            stripped = script_content.strip().rstrip(";")
-            for candidate in (stripped,):
-                try:
-                    candidates.append(json.loads(candidate))
-                except Exception:
-                    pass
+            # El JSON del script se parsea una sola vez por documento (ScriptBlock.parsed_json);
+            # el objeto que rodea al ID solo se busca si el script completo no alcanza.
+            listing_node = ScraperService._find_listing_node(script.parsed_json, listing_id)
+            if listing_node:
+                return listing_node
 
             object_text = ScraperService._extract_json_object_containing(script_content, listing_id)
             if object_text:
                 try:
-                    candidates.append(json.loads(object_text))
+                    listing_object = json.loads(object_text)
                 except Exception:
-                    pass
-
-            for candidate in candidates:
-                listing_node = ScraperService._find_listing_node(candidate, listing_id)
+                    continue
+                listing_node = ScraperService._find_listing_node(listing_object, listing_id)
                 if listing_node:
                     return listing_node
 
@@ -762,9 +1044,9 @@ class ScraperService:
         return {}
 
     @staticmethod
-    def _extract_listing_payload_from_html(html: str, source_url: str) -> dict[str, Any]:
+    def _extract_listing_payload_from_html(document: ListingDocument, source_url: str) -> dict[str, Any]:
         listing_id = ScraperService._extract_listing_id_from_url(source_url)
-        context = ScraperService._extract_listing_context(html, listing_id)
+        context = ScraperService._extract_listing_context(document, listing_id)
         payload: dict[str, Any] = {
             "detalles": {},
             "image_urls": [],
@@ -776,10 +1058,10 @@ class ScraperService:
 
         def extract_string(*keys: str, min_len: int = 1, max_len: int = 4000) -> str:
             for key in keys:
-                # Usar (?:[^"\\]|\\.)*  para capturar strings JSON con comillas escapadas
-                match = re.search(fr'"{re.escape(key)}"\s*:\s*"((?:[^"\\\\]|\\\\.){{{min_len},{max_len}}})"', context, re.I)
+                pattern = _PAYLOAD_STRINGS_RE.get((key, min_len, max_len)) or _json_string_pattern(key, min_len, max_len)
+                match = pattern.search(context)
                 if match:
-                    value = re.sub(r"\s+", " ", ScraperService._decode_json_string(match.group(1))).strip(" ,")
+                    value = _WHITESPACE_RE.sub(" ", ScraperService._decode_json_string(match.group(1))).strip(" ,")
                     if value:
                         return value
             return ""
@@ -798,39 +1080,27 @@ class ScraperService:
                 payload["ubicacion"] = ", ".join(dict.fromkeys(parts))
 
         if not payload["precio"]:
-            amount_match = re.search(r'"(?:price|priceAmount)"\s*:\s*"?([\d.,]+)"?', context, re.I)
-            currency_match = re.search(r'"(?:priceCurrency|currency)"\s*:\s*"?(USD|U\$S|ARS|AR\$|\$)"?', context, re.I)
+            amount_match = _JSON_PRICE_AMOUNT_RE.search(context)
+            currency_match = _JSON_PRICE_CURRENCY_RE.search(context)
             if amount_match:
                 currency = (currency_match.group(1) if currency_match else "USD").upper().replace("U$S", "USD")
                 prefix = "USD" if currency == "USD" else "$"
                 payload["precio"] = f"{prefix} {amount_match.group(1)}"
 
-        detail_patterns = {
-            "metros_totales": [r'"(?:surfaceTotal|totalArea|coveredSurfaceTotal|areaTotal)"\s*:\s*"?(\d+(?:[.,]\d+)?)"?'],
-            "metros_cubiertos": [r'"(?:surfaceCovered|coveredArea|area)"\s*:\s*"?(\d+(?:[.,]\d+)?)"?'],
-            "ambientes": [r'"(?:rooms|ambiences|roomAmount)"\s*:\s*"?(\d+)"?'],
-            "banos": [r'"(?:bathrooms|bathroomsAmount|bathRoomAmount)"\s*:\s*"?(\d+)"?'],
-            "dormitorios": [r'"(?:bedrooms|bedroomsAmount|bedroomAmount)"\s*:\s*"?(\d+)"?'],
-            "antiguedad": [r'"(?:age|antiquity|propertyAge)"\s*:\s*"?(.*?)"?(?:,|\})'],
-            "disposicion": [r'"(?:disposition|layout)"\s*:\s*"([^"]{2,40})"'],
-            "orientacion": [r'"(?:orientation)"\s*:\s*"([^"]{1,20})"'],
-            "estado": [r'"(?:condition|state|propertyState)"\s*:\s*"([^"]{2,60})"'],
-            "expensas": [r'"(?:expenses|expensas)"\s*:\s*"?(?:\$|AR\$|USD|U\$S)?\s*([\d.,]+)"?'],
-        }
-        for key, patterns in detail_patterns.items():
+        for key, patterns in _PAYLOAD_DETAILS_RE.items():
             for pattern in patterns:
-                match = re.search(pattern, context, re.I)
+                match = pattern.search(context)
                 if match:
-                    value = re.sub(r"\s+", " ", ScraperService._decode_json_string(match.group(1))).strip(" ,")
+                    value = _WHITESPACE_RE.sub(" ", ScraperService._decode_json_string(match.group(1))).strip(" ,")
                     if value:
                         payload["detalles"][key] = value
                         break
 
         payload["image_urls"] = ScraperService._filter_image_urls(
-            re.findall(r"""https?://[^\s"'<>]+""", context, re.I)
+            _URL_RE.findall(context)
             + [
                 ScraperService._decode_json_string(url)
-                for url in re.findall(r"""https?:\\/\\/[^\s"'<>]+""", context, re.I)
+                for url in _ESCAPED_URL_RE.findall(context)
             ]
         )
         return payload
@@ -889,9 +1159,9 @@ class ScraperService:
     def _source_url_tokens(source_url: str) -> list[str]:
         path = urllib.parse.urlsplit(source_url or "").path
         slug = urllib.parse.unquote(os.path.basename(path or ""))
-        slug = re.sub(r"-(\d{6,})\.html$", "", slug, flags=re.I)
+        slug = _ZONAPROP_ID_SUFFIX_RE.sub("", slug)
         normalized = ScraperService._normalize_text(slug)
-        raw_tokens = [token for token in re.split(r"[^a-z0-9]+", normalized) if token]
+        raw_tokens = [token for token in _NON_ALNUM_RE.split(normalized) if token]
         anchor_tokens = {
             "departamento", "departamentos", "depto", "casa", "ph",
             "monoambiente", "ambiente", "ambientes", "local", "oficina",
@@ -925,17 +1195,17 @@ class ScraperService:
         value = (value or "").strip().lower()
         value = unicodedata.normalize("NFKD", value)
         value = "".join(ch for ch in value if not unicodedata.combining(ch))
-        return re.sub(r"\s+", " ", value)
+        return _WHITESPACE_RE.sub(" ", value)
 
     @staticmethod
     def _first_h1(markdown: str) -> str:
-        m = re.search(r"^#\s+(.+)$", markdown, re.M)
+        m = _MD_H1_RE.search(markdown)
         return m.group(1).strip() if m else ""
 
     @staticmethod
     def _extract_image_urls_from_markdown(markdown: str) -> list[str]:
-        md_image_urls = re.findall(r"!\[[^\]]*\]\((https?://[^\s)]+)\)", markdown, re.I)
-        raw_urls = re.findall(r"https?://[^\s)\"']+", markdown, re.I)
+        md_image_urls = _MD_IMAGE_URL_RE.findall(markdown)
+        raw_urls = _MD_URL_RE.findall(markdown)
         urls = md_image_urls + raw_urls
         return ScraperService._filter_image_urls(urls)
 
@@ -963,11 +1233,11 @@ class ScraperService:
                 continue
             if not (lu.startswith("http://") or lu.startswith("https://")):
                 continue
-            if re.search(r"\.(css|js|svg|gif|ico|woff2?)(\?|$)", lu):
+            if _NON_IMAGE_EXT_RE.search(lu):
                 continue
             if strict:
                 looks_like_image = (
-                    re.search(r"\.(jpg|jpeg|png|webp|avif)(\?|$)", lu)
+                    _IMAGE_EXT_RE.search(lu)
                     or any(token in lu for token in image_path_tokens)
                 )
                 if not looks_like_image:
@@ -981,31 +1251,33 @@ class ScraperService:
         return filtered[:MAX_IMAGES]
 
     @staticmethod
-    def _extract_description(text: str, html: str, full_text: str = "", full_html: str = "") -> str:
+    def _extract_description(
+        text: str, document: ListingDocument, full_text: str = "", full_document: ListingDocument | None = None
+    ) -> str:
         """Extrae descripción con múltiples estrategias. Si falla con focused, intenta con full."""
-        html_description = ScraperService._extract_description_from_html(html)
+        html_description = ScraperService._extract_description_from_html(document)
         if html_description:
             return html_description
 
-        if full_html:
-            html_description = ScraperService._extract_description_from_html(full_html)
+        if full_document is not None and full_document.html:
+            html_description = ScraperService._extract_description_from_html(full_document)
             if html_description:
                 return html_description
 
         def _is_noise(line: str) -> bool:
             if not line:
                 return False
-            if re.search(r"\b(Favorito|Compartir|Notas personales|Ocultar aviso|Ver menos|Ver más avisos|Ver más anuncios)\b", line, re.I):
+            if _NOISE_WORDS_RE.search(line):
                 return True
-            if re.search(r"^\[.+\]\(https?://", line):
+            if _MD_LINK_LINE_RE.search(line):
                 return True
-            if re.fullmatch(r"!?(\[[^\]]*\])?!?\[[^\]]*\]\([^)]+\)\s*", line):
+            if _MD_IMAGE_ONLY_LINE_RE.fullmatch(line):
                 return True
-            if len(re.findall(r"!\[[^\]]*\]\(https?://", line)) >= 2:
+            if len(_MD_IMAGE_RE.findall(line)) >= 2:
                 return True
-            if re.search(r"!\[[^\]]*\]\(https?://", line):
+            if _MD_IMAGE_RE.search(line):
                 return True
-            if not re.search(r"[A-Za-zÁÉÍÓÚáéíóúñ]", line):
+            if not _LETTER_RE.search(line):
                 return True
             return False
 
@@ -1016,7 +1288,7 @@ class ScraperService:
             lines = [l.strip() for l in source_text.splitlines()]
             start_idx = -1
             for i, l in enumerate(lines):
-                if re.fullmatch(r"(#+\s*)?(DESCRIPCION|DESCRIPCIÓN)\s*:?\s*", l, re.I):
+                if _DESCRIPTION_HEADER_RE.fullmatch(l):
                     start_idx = i + 1
                     break
 
@@ -1025,13 +1297,13 @@ class ScraperService:
 
             collected: list[str] = []
             for l in lines[start_idx:]:
-                if re.search(r"Preguntas para la inmobiliaria|Seleccioná una o más preguntas", l, re.I):
+                if _DESC_QUESTIONS_RE.search(l):
                     break
                 if not l:
                     if collected:
                         collected.append("")
                     continue
-                if re.fullmatch(r"[A-ZÁÉÍÓÚÑ ]{4,}", l) and len(collected) > 3:
+                if _UPPERCASE_HEADING_RE.fullmatch(l) and len(collected) > 3:
                     break
                 if _is_noise(l):
                     continue
@@ -1058,12 +1330,12 @@ class ScraperService:
         return candidate.strip()
 
     @staticmethod
-    def _extract_features(text: str, html: str) -> list[str]:
-        html_features = ScraperService._extract_features_from_html(html)
+    def _extract_features(text: str, document: ListingDocument) -> list[str]:
+        html_features = ScraperService._extract_features_from_html(document)
         lines = [l.strip() for l in text.splitlines()]
         start_idx = -1
         for i, l in enumerate(lines):
-            if re.fullmatch(r"(#+\s*)?(CARACTERISTICAS|CARACTERÍSTICAS)\s*:?\s*", l, re.I):
+            if _FEATURES_HEADER_RE.fullmatch(l):
                 start_idx = i + 1
                 break
         feats: list[str] = []
@@ -1076,11 +1348,11 @@ class ScraperService:
         for l in lines[start_idx:]:
             if not l:
                 continue
-            if re.fullmatch(r"[A-ZÁÉÍÓÚÑ ]{4,}", l) and len(feats) >= 5:
+            if _UPPERCASE_HEADING_RE.fullmatch(l) and len(feats) >= 5:
                 break
-            if re.search(r"\b(Favorito|Compartir|Notas personales|Ocultar aviso)\b", l, re.I):
+            if _FEATURE_NOISE_WORDS_RE.search(l):
                 continue
-            m = re.match(r"^[-*]\s+(.+)$", l)
+            m = _MD_BULLET_RE.match(l)
             val = m.group(1).strip() if m else l.strip()
             if not val or len(val) > 120:
                 continue
@@ -1248,117 +1520,42 @@ class ScraperService:
         ]
 
     @staticmethod
-    def _merge_sources(markdown: str, html: str) -> str:
-        html_text = ScraperService._html_to_text(html)
-        if not html_text:
-            return markdown
-        return f"{markdown}\n\n{html_text}"
-
-    @staticmethod
-    def _html_to_text(html: str) -> str:
-        if not html:
-            return ""
-        text = re.sub(r"(?is)<script[^>]*>.*?</script>", " ", html)
-        text = re.sub(r"(?is)<style[^>]*>.*?</style>", " ", text)
-        text = re.sub(r"(?i)<br\s*/?>", "\n", text)
-        text = re.sub(r"(?i)</p>|</div>|</li>|</section>|</article>|</h\d>", "\n", text)
-        text = re.sub(r"(?is)<[^>]+>", " ", text)
-        text = unescape(text)
-        text = text.replace("\xa0", " ")
-        text = re.sub(r"\r", "", text)
-        text = re.sub(r"\n{3,}", "\n\n", text)
-        text = re.sub(r"[ \t]{2,}", " ", text)
-        return text.strip()
-
-    @staticmethod
-    def _extract_meta_content(html: str, *keys: str) -> str:
-        if not html:
-            return ""
-        for key in keys:
-            escaped = re.escape(key)
-            patterns = [
-                rf'<meta[^>]+(?:property|name)=["\']{escaped}["\'][^>]+content=["\']([^"\']+)["\']',
-                rf'<meta[^>]+content=["\']([^"\']+)["\'][^>]+(?:property|name)=["\']{escaped}["\']',
-            ]
-            for pattern in patterns:
-                match = re.search(pattern, html, re.I)
-                if match:
-                    return re.sub(r"\s+", " ", unescape(match.group(1))).strip()
-        return ""
-
-    @staticmethod
-    def _extract_listing_json_ld(html: str) -> dict[str, Any]:
-        if not html:
-            return {}
-
-        def _iter_items(node: Any) -> list[dict[str, Any]]:
-            if isinstance(node, list):
-                items: list[dict[str, Any]] = []
-                for item in node:
-                    items.extend(_iter_items(item))
-                return items
-            if isinstance(node, dict):
-                graph = node.get("@graph")
-                if isinstance(graph, list):
-                    items = [node]
-                    for item in graph:
-                        items.extend(_iter_items(item))
-                    return items
-                return [node]
-            return []
-
-        for match in re.finditer(r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', html, re.I | re.S):
-            raw = unescape(match.group(1) or "").strip()
-            if not raw:
-                continue
-            try:
-                payload = json.loads(raw)
-            except Exception:
-                continue
-            for item in _iter_items(payload):
-                if not isinstance(item, dict):
-                    continue
-                if item.get("offers") or item.get("address") or item.get("image"):
-                    return item
-        return {}
-
-    @staticmethod
-    def _extract_title_from_html(html: str) -> str:
-        title = ScraperService._extract_meta_content(html, "og:title", "twitter:title")
+    def _extract_title_from_html(document: ListingDocument) -> str:
+        title = document.meta("og:title", "twitter:title")
         if not title:
-            json_ld = ScraperService._extract_listing_json_ld(html)
+            json_ld = document.json_ld
             title = (json_ld.get("name") or "").strip() if isinstance(json_ld, dict) else ""
         if not title:
-            match = re.search(r"<title>\s*(.*?)\s*</title>", html, re.I | re.S)
+            match = _HTML_TITLE_RE.search(document.html)
             if match:
-                title = re.sub(r"\s+", " ", unescape(match.group(1))).strip()
+                title = _WHITESPACE_RE.sub(" ", unescape(match.group(1))).strip()
         if not title:
             return ""
-        title = re.sub(r"\s*[|\-—]\s*(?:ZonaProp|Argenprop|MercadoLibre|Propiedades\.com).*$", "", title, flags=re.I)
+        title = _TITLE_PORTAL_SUFFIX_RE.sub("", title)
         return ScraperService._clean_title(title)
 
     @staticmethod
-    def _extract_price_from_html(html: str) -> str:
-        meta_amount = ScraperService._extract_meta_content(html, "product:price:amount")
-        meta_currency = ScraperService._extract_meta_content(html, "product:price:currency")
+    def _extract_price_from_html(document: ListingDocument) -> str:
+        meta_amount = document.meta("product:price:amount")
+        meta_currency = document.meta("product:price:currency")
         if meta_amount:
-            amount = re.sub(r"[^\d.,]", "", meta_amount)
+            amount = _NON_PRICE_CHARS_RE.sub("", meta_amount)
             currency = (meta_currency or "USD").upper()
             prefix = "USD" if currency in {"USD", "U$S"} else "$"
             return f"{prefix} {amount}"
 
-        json_ld = ScraperService._extract_listing_json_ld(html)
+        json_ld = document.json_ld
         offers = json_ld.get("offers") if isinstance(json_ld, dict) else None
         if isinstance(offers, list):
             offers = offers[0] if offers else None
         if isinstance(offers, dict):
-            amount = re.sub(r"[^\d.,]", "", str(offers.get("price") or ""))
+            amount = _NON_PRICE_CHARS_RE.sub("", str(offers.get("price") or ""))
             currency = str(offers.get("priceCurrency") or "USD").upper()
             if amount:
                 prefix = "USD" if currency in {"USD", "U$S"} else "$"
                 return f"{prefix} {amount}"
 
-        match = re.search(r'(?:"price"|priceAmount)\s*[:=]\s*"?(USD|U\$S|AR\$|\$)?\s*([\d.,]+)"?', html, re.I)
+        match = _HTML_PRICE_RE.search(document.html)
         if match:
             prefix = (match.group(1) or "USD").upper().replace("U$S", "USD")
             prefix = "USD" if prefix == "USD" else "$"
@@ -1366,127 +1563,111 @@ class ScraperService:
         return ""
 
     @staticmethod
-    def _extract_image_urls_from_html(html: str) -> list[str]:
+    def _extract_image_urls_from_html(document: ListingDocument) -> list[str]:
+        return document.memo("html_image_urls", lambda: ScraperService._html_image_urls(document.html))
+
+    @staticmethod
+    def _html_image_urls(html: str) -> list[str]:
         if not html:
             return []
-        urls = re.findall(r"""https?://[^\s"'<>]+""", html, re.I)
+        urls = _URL_RE.findall(html)
         urls.extend(
             ScraperService._decode_json_string(url)
-            for url in re.findall(r"""https?:\\/\\/[^\s"'<>]+""", html, re.I)
+            for url in _ESCAPED_URL_RE.findall(html)
         )
         # Lazy-loaded images: data-src, data-lazy, data-url, data-original, data-image
-        for attr in ("data-src", "data-lazy", "data-url", "data-original", "data-image", "data-bg"):
-            for match in re.finditer(
-                rf'{re.escape(attr)}=["\']?(https?://[^\s"\'<>]+)', html, re.I
-            ):
+        for pattern in _LAZY_IMAGE_ATTRS_RE:
+            for match in pattern.finditer(html):
                 urls.append(match.group(1))
         return ScraperService._filter_image_urls(urls)
 
     # FIX: extrae la dirección completa desde el HTML
     @staticmethod
-    def _extract_location_from_html(html: str) -> str:
-        if not html:
+    def _extract_location_from_html(document: ListingDocument) -> str:
+        if not document.html:
             return ""
-        meta_location = ScraperService._extract_meta_content(html, "og:street-address", "street-address")
+        meta_location = document.meta("og:street-address", "street-address")
         if meta_location and len(meta_location) >= 10:
             return meta_location
 
-        json_ld = ScraperService._extract_listing_json_ld(html)
+        json_ld = document.json_ld
         if isinstance(json_ld, dict):
             address = json_ld.get("address")
             if isinstance(address, dict):
-                street = re.sub(r"\s+", " ", str(address.get("streetAddress") or "")).strip(" ,")
+                street = _WHITESPACE_RE.sub(" ", str(address.get("streetAddress") or "")).strip(" ,")
                 locality_parts = [
-                    re.sub(r"\s+", " ", str(address.get(key) or "")).strip(" ,")
+                    _WHITESPACE_RE.sub(" ", str(address.get(key) or "")).strip(" ,")
                     for key in ("addressLocality", "addressRegion")
                 ]
                 locality_parts = [part for part in locality_parts if part and part.lower() not in street.lower()]
                 value = ", ".join([street] + locality_parts).strip(" ,")
                 if len(value) >= 10:
                     return value
-        html = ScraperService._focus_listing_content(html)
+        focused = document.focused
+        html = focused.html
         # ZonaProp: <h2 class="title-location">Av. Independencia 1977...</h2>
-        m = re.search(r'<h2[^>]*class="[^"]*title-location[^"]*"[^>]*>\s*([^<]{10,200})\s*</h2>', html, re.I)
+        m = _HTML_TITLE_LOCATION_RE.search(html)
         if m:
-            return re.sub(r"\s+", " ", unescape(m.group(1))).strip()
+            return _WHITESPACE_RE.sub(" ", unescape(m.group(1))).strip()
         # ZonaProp: dirección en un span/div con class que contiene "location" o "address"
-        m = re.search(r'<(?:span|div|p)[^>]*class="[^"]*(?:location|address|ubicacion)[^"]*"[^>]*>\s*([^<]{10,200})\s*</(?:span|div|p)>', html, re.I)
+        m = _HTML_LOCATION_CLASS_RE.search(html)
         if m:
-            return re.sub(r"\s+", " ", unescape(m.group(1))).strip()
+            return _WHITESPACE_RE.sub(" ", unescape(m.group(1))).strip()
         # Argenprop / MercadoLibre: data-testid o class con "address"
-        m = re.search(r'data-testid="[^"]*address[^"]*"[^>]*>\s*([^<]{10,200})\s*<', html, re.I)
+        m = _HTML_ADDRESS_TESTID_RE.search(html)
         if m:
-            return re.sub(r"\s+", " ", unescape(m.group(1))).strip()
+            return _WHITESPACE_RE.sub(" ", unescape(m.group(1))).strip()
         # Fallback: buscar patrón de dirección argentina en el texto del HTML
-        full_location_patterns = [
-            r'"titleLocation"\s*:\s*"([^"]{10,220})"',
-            r'"locationName"\s*:\s*"([^"]{10,220})"',
-            r'"postingLocation"\s*:\s*"([^"]{10,220})"',
-            r'"location"\s*:\s*"([^"]{10,220}(?:Capital Federal|Buenos Aires|CABA)[^"]*)"',
-        ]
-        for pattern in full_location_patterns:
-            match = re.search(pattern, html, re.I)
+        for pattern in _FULL_LOCATION_RE:
+            match = pattern.search(html)
             if not match:
                 continue
-            value = re.sub(r"\s+", " ", ScraperService._decode_json_string(match.group(1))).strip(" ,")
+            value = _WHITESPACE_RE.sub(" ", ScraperService._decode_json_string(match.group(1))).strip(" ,")
             if len(value) >= 15:
                 return value
 
-        street_match = re.search(r'"streetAddress"\s*:\s*"([^"]{6,180})"', html, re.I)
+        street_match = _JSON_STREET_ADDRESS_RE.search(html)
         if street_match:
-            street = re.sub(r"\s+", " ", ScraperService._decode_json_string(street_match.group(1))).strip(" ,")
+            street = _WHITESPACE_RE.sub(" ", ScraperService._decode_json_string(street_match.group(1))).strip(" ,")
             locality_parts: list[str] = []
-            for key in ("addressLocality", "addressRegion"):
-                match = re.search(fr'"{key}"\s*:\s*"([^"]{{2,80}})"', html, re.I)
+            for pattern in _ADDRESS_LOCALITY_RE:
+                match = pattern.search(html)
                 if not match:
                     continue
-                part = re.sub(r"\s+", " ", ScraperService._decode_json_string(match.group(1))).strip(" ,")
+                part = _WHITESPACE_RE.sub(" ", ScraperService._decode_json_string(match.group(1))).strip(" ,")
                 if part and part.lower() not in street.lower():
                     locality_parts.append(part)
             value = ", ".join([street] + locality_parts)
             if len(value) >= 15:
                 return value
 
-        text = ScraperService._html_to_text(html)
-        m = re.search(
-            r'((?:Av(?:enida)?|Calle|Bv|Blvd|Ruta|Pasaje|Pje)\.?\s+[A-ZÁÉÍÓÚÑ][^\n]{5,100}'
-            r'(?:,\s*(?:entre|esq|y)\s+[^\n]{5,60})?'
-            r'(?:,\s*[A-ZÁÉÍÓÚÑ][a-záéíóúñ ]{3,40})*)',
-            text, re.I
-        )
+        text = focused.html_text
+        m = _TEXT_STREET_RE.search(text)
         if m:
-            value = re.sub(r"\s+", " ", m.group(1)).strip(" ,")
+            value = _WHITESPACE_RE.sub(" ", m.group(1)).strip(" ,")
             if len(value) >= 15:
                 return value
         return ""
 
     @staticmethod
-    def _extract_description_from_html(html: str) -> str:
+    def _extract_description_from_html(document: ListingDocument) -> str:
+        html = document.html
         if not html:
             return ""
-        container_patterns = [
-            r'<(?:div|section)[^>]+(?:data-testid|class)=["\'][^"\']*(?:description|description-section|description-text|ad-description|post-description)[^"\']*["\'][^>]*>(.*?)</(?:div|section)>',
-            r'<p[^>]+(?:data-testid|class)=["\'][^"\']*(?:description|description-text|ad-description)[^"\']*["\'][^>]*>(.*?)</p>',
-        ]
-        for pattern in container_patterns:
-            for match in re.finditer(pattern, html, re.I | re.S):
+        for pattern in _DESCRIPTION_CONTAINERS_RE:
+            for match in pattern.finditer(html):
                 candidate = ScraperService._html_fragment_to_text(match.group(1))
                 candidate = ScraperService._clean_description(candidate)
                 if len(candidate) >= 80:
                     return candidate
 
-        text = ScraperService._html_to_text(html)
+        text = document.html_text
         if not text:
             return ""
-        patterns = [
-            r"Descripci[oó]n\s*(?:completa\s*)?(.+?)(?:Preguntas para la inmobiliaria|Conocé más sobre|Leer menos|Características|Caracter[ií]sticas|Servicios|Ubicaci[oó]n|Mapa|Ver en Google Maps|Ambientes|Propiedades similares|Anuncios similares)",
-            r"(Venta de .*?(?:Capital Federal|Buenos Aires)\..+?)(?:LEPORE|AVISO LEGAL|XINTEL|Leer menos|Preguntas para la inmobiliaria)",
-            r"(Departamento .*?(?:Capital Federal|Buenos Aires)\..+?)(?:LEPORE|AVISO LEGAL|XINTEL|Leer menos|Preguntas para la inmobiliaria)",
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text, re.I | re.S)
+        for pattern in _DESCRIPTION_TEXT_RE:
+            match = pattern.search(text)
             if match:
-                candidate = re.sub(r"\s+\n", "\n", match.group(1)).strip()
+                candidate = _TRAILING_SPACE_NEWLINE_RE.sub("\n", match.group(1)).strip()
                 candidate = ScraperService._clean_description(candidate)
                 if len(candidate) >= 80:
                     return candidate
@@ -1496,27 +1677,23 @@ class ScraperService:
     def _clean_description(text: str) -> str:
         if not text:
             return ""
-        text = re.sub(r"\bVer datos\b\.?", "", text, flags=re.I)
-        text = re.sub(r"\b(?:Leer m[aÃ¡]s|Leer menos|Ver m[aÃ¡]s)\b\.?", "", text, flags=re.I)
-        text = re.sub(r"\bLEPORE SAN CRISTOBAL\b.*$", "", text, flags=re.I | re.S)
-        text = re.sub(r"\bLEPORE PROPIEDADES\b.*$", "", text, flags=re.I | re.S)
-        text = re.sub(r"\bAVISO LEGAL:.*$", "", text, flags=re.I | re.S)
-        text = re.sub(r"\bXINTEL.*$", "", text, flags=re.I | re.S)
-        text = re.sub(r"\bEsta unidad es apta para personas.*$", "", text, flags=re.I | re.S)
-        text = re.sub(r"\n{3,}", "\n\n", text)
-        text = re.sub(r"[ \t]{2,}", " ", text)
+        text = _DESC_VER_DATOS_RE.sub("", text)
+        text = _DESC_LEER_MAS_RE.sub("", text)
+        text = _DESC_LEPORE_SAN_CRISTOBAL_RE.sub("", text)
+        text = _DESC_LEPORE_PROPIEDADES_RE.sub("", text)
+        text = _DESC_AVISO_LEGAL_RE.sub("", text)
+        text = _DESC_XINTEL_RE.sub("", text)
+        text = _DESC_APTA_PERSONAS_RE.sub("", text)
+        text = _BLANK_LINES_RE.sub("\n\n", text)
+        text = _MULTI_SPACE_RE.sub(" ", text)
         return text.strip(" .\n")
 
     @staticmethod
     def _extract_description_from_json_context(context: str) -> str:
         if not context:
             return ""
-        for key in ("description", "descriptionText"):
-            match = re.search(
-                fr'"{re.escape(key)}"\s*:\s*"((?:[^"\\]|\\.){{40,20000}})"',
-                context,
-                re.I | re.S,
-            )
+        for pattern in _JSON_DESCRIPTION_RE:
+            match = pattern.search(context)
             if not match:
                 continue
             candidate = ScraperService._decode_json_string(match.group(1))
@@ -1530,36 +1707,34 @@ class ScraperService:
     def _html_fragment_to_text(fragment: str) -> str:
         if not fragment:
             return ""
-        text = re.sub(r"(?is)<script[^>]*>.*?</script>", " ", fragment)
-        text = re.sub(r"(?is)<style[^>]*>.*?</style>", " ", text)
-        text = re.sub(r"(?i)<br\s*/?>", "\n", text)
-        text = re.sub(r"(?i)</p>|</div>|</li>|</section>|</article>", "\n\n", text)
-        text = re.sub(r"(?is)<[^>]+>", " ", text)
+        text = _SCRIPT_BLOCK_RE.sub(" ", fragment)
+        text = _STYLE_BLOCK_RE.sub(" ", text)
+        text = _BR_TAG_RE.sub("\n", text)
+        text = _BLOCK_END_TAG_RE.sub("\n\n", text)
+        text = _ANY_TAG_RE.sub(" ", text)
         text = unescape(text)
         text = text.replace("\xa0", " ")
-        text = re.sub(r"\r", "", text)
-        text = re.sub(r"\n{3,}", "\n\n", text)
-        text = re.sub(r"[ \t]{2,}", " ", text)
-        text = re.sub(r" *\n *", "\n", text)
+        text = _CR_RE.sub("", text)
+        text = _BLANK_LINES_RE.sub("\n\n", text)
+        text = _MULTI_SPACE_RE.sub(" ", text)
+        text = _SPACES_AROUND_NEWLINE_RE.sub("\n", text)
         return text.strip()
 
     @staticmethod
-    def _extract_features_from_html(html: str) -> list[str]:
+    def _extract_features_from_html(document: ListingDocument) -> list[str]:
+        html = document.html
         if not html:
             return []
 
         # FIX: extraer específicamente los <li class="icon-feature"> de ZonaProp
         # Ejemplo: <li class="icon-feature"><span>104 m² tot.</span></li>
         icon_features: list[str] = []
-        li_matches = re.findall(
-            r'<li[^>]*class="[^"]*icon-feature[^"]*"[^>]*>(.*?)</li>',
-            html, re.I | re.S
-        )
+        li_matches = _LI_ICON_FEATURE_RE.findall(html)
         for li_html in li_matches:
             # quitar tags internos y dejar solo el texto
-            text = re.sub(r"<[^>]+>", " ", li_html)
+            text = _TAG_RE.sub(" ", li_html)
             text = unescape(text)
-            text = re.sub(r"\s+", " ", text).strip()
+            text = _WHITESPACE_RE.sub(" ", text).strip()
             if text and len(text) >= 2 and len(text) <= 80:
                 icon_features.append(text)
 
@@ -1567,14 +1742,14 @@ class ScraperService:
             return icon_features
 
         # Fallback: extracción por palabras clave del texto plano
-        text = ScraperService._html_to_text(html)
+        text = document.html_text
         candidates: list[str] = []
         for line in [l.strip(" -") for l in text.splitlines()]:
             if len(line) < 3 or len(line) > 100:
                 continue
-            if re.search(r"\b(Departamento|Venta de|Favorito|Compartir|Notas personales|Ocultar aviso|Leer menos|Ver todas las fotos)\b", line, re.I):
+            if _HTML_FEATURE_NOISE_RE.search(line):
                 continue
-            if re.search(r"\b(\d+\s*m[²2]|\d+\s+ambientes?|\d+\s+bañ[oa]s?|balc[oó]n|terraza|patio|parrilla|pileta|lavadero|suite|luminos[oa]|apto cr[eé]dito|seguridad|sum|quincho|jard[ií]n|cocina independiente|living-comedor|placard)\b", line, re.I):
+            if _HTML_FEATURE_HINT_RE.search(line):
                 candidates.append(line)
         return ScraperService._merge_feature_lists(candidates)
 
@@ -1583,7 +1758,7 @@ class ScraperService:
         merged: list[str] = []
         for group in groups:
             for item in group:
-                cleaned = re.sub(r"\s+", " ", (item or "")).strip(" -|")
+                cleaned = _WHITESPACE_RE.sub(" ", item or "").strip(" -|")
                 if cleaned and cleaned not in merged:
                     merged.append(cleaned)
         return merged[:40]
@@ -1596,32 +1771,26 @@ class ScraperService:
         for line in [l.strip("# ").strip() for l in markdown.splitlines()]:
             if len(line) < 12 or len(line) > 140:
                 continue
-            if re.search(r"(USD|U\$S|AR\$|\$)", line, re.I):
+            if _CURRENCY_RE.search(line):
                 continue
-            if re.search(r"\b(favorito|compartir|publicado|actualizado|ver más avisos|ver más anuncios)\b", line, re.I):
+            if _TITLE_NOISE_WORDS_RE.search(line):
                 continue
             # Ignorar líneas que son links markdown: [texto](url)
-            if re.search(r"^\[.+\]\(https?://", line):
+            if _MD_LINK_LINE_RE.search(line):
                 continue
-            if re.search(r"[A-Za-zÁÉÍÓÚáéíóúñ]", line):
+            if _LETTER_RE.search(line):
                 return ScraperService._clean_title(line)
         return ""
 
     @staticmethod
     def _extract_location(markdown: str) -> str:
         # limpiar links markdown antes de buscar
-        markdown = re.sub(r"\[([^\]]+)\]\((https?://[^)]+)\)", r"\1", markdown)
-        patterns = [
-            r"(?:Dirección|Ubicación)\s*:?\s*(.+)",
-            r"(?m)^(Capital Federal|CABA|Buenos Aires|San Cristóbal|San Cristobal|Palermo|Belgrano|Caballito|Recoleta|Vicente López|Vicente Lopez|San Isidro)\s*$",
-            r"(?m)^[>#\-\*\s]*([A-ZÁÉÍÓÚÑ][^\n]{6,120},\s*[A-ZÁÉÍÓÚÑa-záéíóúñ ]{3,80})$",
-            r"(?m)^[>#\-\*\s]*([A-ZÁÉÍÓÚÑ][^\n]{6,120}\b(?:CABA|Capital Federal|Buenos Aires|Vicente López|San Isidro|Olivos|Palermo|Belgrano)\b[^\n]*)$",
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, markdown, re.I)
+        markdown = _MD_LINK_GROUPS_RE.sub(r"\1", markdown)
+        for pattern in _MARKDOWN_LOCATION_RE:
+            match = pattern.search(markdown)
             if match:
-                value = re.sub(r"\s+", " ", match.group(1)).strip(" -|")
-                value = re.sub(r"https?://\S+", "", value).strip()
+                value = _WHITESPACE_RE.sub(" ", match.group(1)).strip(" -|")
+                value = _ANY_URL_RE.sub("", value).strip()
                 if len(value) <= 120:
                     return value
         return ""
@@ -1672,69 +1841,27 @@ class ScraperService:
     def _is_noise_line(line: str) -> bool:
         if not line:
             return True
-        if re.search(r"\b(Favorito|Compartir|Notas personales|Ocultar aviso|Ver menos|Contactar|Denunciar)\b", line, re.I):
+        if _NOISE_LINE_WORDS_RE.search(line):
             return True
         # FIX: filtrar links markdown [texto](url)
-        if re.search(r"\[[^\]]+\]\(https?://", line):
+        if _MD_LINK_RE.search(line):
             return True
-        if re.fullmatch(r"[#>*\-\s\d|.:/]+", line):
+        if _SYMBOLS_ONLY_RE.fullmatch(line):
             return True
-        if not re.search(r"[A-Za-zÁÉÍÓÚáéíóúñ]", line):
+        if not _LETTER_RE.search(line):
             return True
         return False
 
     @staticmethod
     def _extract_detail_candidates(markdown: str) -> dict[str, str | None]:
         # limpiar links markdown antes de aplicar regex
-        clean_md = re.sub(r"\[([^\]]+)\]\(https?://[^)]+\)", r"\1", markdown)
-        patterns = {
-            "ambientes": [
-                r"(\d+)\s+ambientes?",
-                r"Ambientes?\s*:?\s*(\d+)",
-            ],
-            "dormitorios": [
-                r"(\d+)\s+dorm(?:itorios?|\.?)",
-                r"Dormitorios?\s*:?\s*(\d+)",
-            ],
-            "banos": [
-                r"(\d+)\s+bañ[oa]s?",
-                r"Baños?\s*:?\s*(\d+)",
-            ],
-            "metros_totales": [
-                r"(\d+(?:[.,]\d+)?)\s*m[²2](?:\s*tot\.?|\s*totales?)",
-                r"Sup(?:erficie)?\s*total\s*:?\s*(\d+(?:[.,]\d+)?)\s*m[²2]",
-            ],
-            "metros_cubiertos": [
-                r"(\d+(?:[.,]\d+)?)\s*m[²2](?:\s*cub\.?|\s*cubiertos?)",
-                r"Sup(?:erficie)?\s*cubierta\s*:?\s*(\d+(?:[.,]\d+)?)\s*m[²2]",
-            ],
-            "cocheras": [
-                r"(\d+)\s+cocheras?",
-                r"Cocheras?\s*:?\s*(\d+)",
-            ],
-            "antiguedad": [
-                r"Antigüedad\s*:?\s*([^\n|]{1,40})",
-                r"Antiguedad\s*:?\s*([^\n|]{1,40})",
-            ],
-            "expensas": [
-                r"Expensas\s*:?\s*((?:USD|U\$S|AR\$|\$)\s*[\d.,]+)",
-            ],
-            "disposicion": [
-                r"\b(Frente|Contrafrente|Interno|Lateral)\b",
-            ],
-            "orientacion": [
-                r"\b(Norte|Sur|Este|Oeste|NE|NO|SE|SO)\b",
-            ],
-            "estado": [
-                r"\b(A estrenar|Excelente estado|Muy buen estado|Buen estado|En construcción)\b",
-            ],
-        }
-        out: dict[str, str | None] = {key: None for key in patterns}
-        for key, regexes in patterns.items():
+        clean_md = _MD_LINK_TEXT_RE.sub(r"\1", markdown)
+        out: dict[str, str | None] = {key: None for key in _DETAIL_CANDIDATES_RE}
+        for key, regexes in _DETAIL_CANDIDATES_RE.items():
             for regex in regexes:
-                match = re.search(regex, clean_md, re.I)
+                match = regex.search(clean_md)
                 if match:
-                    out[key] = re.sub(r"\s+", " ", match.group(1)).strip(" -|")
+                    out[key] = _WHITESPACE_RE.sub(" ", match.group(1)).strip(" -|")
                     break
         split_values = ScraperService._extract_split_detail_candidates(clean_md)
         for key, value in split_values.items():
@@ -1751,9 +1878,9 @@ class ScraperService:
             "banos": None,
             "dormitorios": None,
         }
-        lines = [re.sub(r"\s+", " ", line).strip(" -|") for line in text.splitlines()]
+        lines = [_WHITESPACE_RE.sub(" ", line).strip(" -|") for line in text.splitlines()]
         for index, line in enumerate(lines):
-            number_match = re.fullmatch(r"(\d+(?:[.,]\d+)?)", line)
+            number_match = _NUMBER_GROUP_RE.fullmatch(line)
             if not number_match:
                 continue
             label_candidates = []
@@ -1763,7 +1890,7 @@ class ScraperService:
                 label_candidates.append(f"{lines[index + 1]} {lines[index + 2]}".lower())
 
             for label in label_candidates:
-                normalized_label = re.sub(r"\s+", " ", label).strip(" .").lower()
+                normalized_label = _WHITESPACE_RE.sub(" ", label).strip(" .").lower()
                 normalized_label = normalized_label.replace("\u00c2", "").replace("\u00b2", "2")
                 normalized_label = normalized_label.replace("\u00c3\u00b1", "n").replace("\u00f1", "n")
                 if not values["metros_totales"] and normalized_label.startswith("m2") and "tot" in normalized_label:
@@ -1780,23 +1907,23 @@ class ScraperService:
 
     @staticmethod
     def _infer_feature_lines(markdown: str) -> list[str]:
-        clean_md = re.sub(r"\[([^\]]+)\]\(https?://[^)]+\)", r"\1", markdown)
+        clean_md = _MD_LINK_TEXT_RE.sub(r"\1", markdown)
         candidates: list[str] = []
         for line in [l.strip(" -*#\t") for l in clean_md.splitlines()]:
             if len(line) < 3 or len(line) > 90:
                 continue
             if ScraperService._is_noise_line(line):
                 continue
-            if re.search(r"(USD|U\$S|AR\$|\$)\s*[\d.,]+", line, re.I):
+            if _PRICE_LINE_RE.search(line):
                 continue
-            if re.search(r"\b(?:m[²2]|ambientes?|bañ[oa]s?|cocheras?|expensas?|dorm(?:itorios?|\.?)|a estrenar|frente|contrafrente)\b", line, re.I):
+            if _FEATURE_DETAIL_HINT_RE.search(line):
                 candidates.append(line)
                 continue
-            if re.search(r"\b(balc[oó]n|terraza|patio|parrilla|pileta|lavadero|suite|luminos[oa]|apto cr[eé]dito|seguridad|sum|quincho|jard[ií]n)\b", line, re.I):
+            if _FEATURE_AMENITY_HINT_RE.search(line):
                 candidates.append(line)
         deduped: list[str] = []
         for item in candidates:
-            cleaned = re.sub(r"\s+", " ", item).strip(" -|")
+            cleaned = _WHITESPACE_RE.sub(" ", item).strip(" -|")
             if cleaned and cleaned not in deduped:
                 deduped.append(cleaned)
         return deduped[:20]
@@ -1805,22 +1932,22 @@ class ScraperService:
     def _image_dedupe_key(url: str) -> str:
         parsed = urllib.parse.urlsplit(url)
         path = (parsed.path or "").lower()
-        path = re.sub(r"/(fit-in|crop|thumb|thumbnail|small|medium|large)/", "/", path)
-        path = re.sub(r"[-_](?:\d{2,4}x\d{2,4}|w\d{2,4}|h\d{2,4})", "", path)
+        path = _URL_RESIZE_DIR_RE.sub("/", path)
+        path = _URL_SIZE_SUFFIX_RE.sub("", path)
         filename = path.rsplit("/", 1)[-1]
-        stem = re.sub(r"\.(jpg|jpeg|png|webp|avif)$", "", filename)
-        stem = re.sub(r"[-_](?:scaled|thumb|thumbnail|small|medium|large)$", "", stem)
+        stem = _IMAGE_EXT_END_RE.sub("", filename)
+        stem = _URL_VARIANT_SUFFIX_RE.sub("", stem)
         return stem or path or url.lower()
 
     @staticmethod
     def _clean_title(title: str) -> str:
-        title = re.sub(r"\s+", " ", (title or "")).strip()
+        title = _WHITESPACE_RE.sub(" ", title or "").strip()
         title = title.replace("\\", "")
-        title = re.sub(r"\s+\|\s+", " | ", title)
+        title = _TITLE_PIPE_RE.sub(" | ", title)
         return title.strip(" -|")
 
     @staticmethod
-    def _extract_detail_candidates_from_html(html: str) -> dict[str, str | None]:
+    def _extract_detail_candidates_from_html(document: ListingDocument) -> dict[str, str | None]:
         # FIX: primero intentar parsear <li class="icon-feature"> de ZonaProp
         # que contienen texto como "104 m² tot.", "73 m² cub.", "4 amb.", "2 baños", etc.
         values: dict[str, str | None] = {
@@ -1830,50 +1957,48 @@ class ScraperService:
             "cocheras": None, "antiguedad": None,
         }
 
+        html = document.html
         if html:
-            li_matches = re.findall(
-                r'<li[^>]*class="[^"]*icon-feature[^"]*"[^>]*>(.*?)</li>',
-                html, re.I | re.S
-            )
+            li_matches = _LI_ICON_FEATURE_RE.findall(html)
             for li_html in li_matches:
-                t = re.sub(r"\s+", " ", unescape(re.sub(r"<[^>]+>", " ", li_html))).strip()
+                t = _WHITESPACE_RE.sub(" ", unescape(_TAG_RE.sub(" ", li_html))).strip()
                 if not t:
                     continue
                 if not values["metros_totales"]:
-                    m = re.search(r"(\d+(?:[.,]\d+)?)\s*m[²2]\s*tot", t, re.I)
+                    m = _ITEM_M2_TOTAL_RE.search(t)
                     if m: values["metros_totales"] = m.group(1)
                 if not values["metros_cubiertos"]:
-                    m = re.search(r"(\d+(?:[.,]\d+)?)\s*m[²2]\s*cub", t, re.I)
+                    m = _ITEM_M2_CUBIERTOS_RE.search(t)
                     if m: values["metros_cubiertos"] = m.group(1)
                 if not values["ambientes"]:
-                    m = re.search(r"(\d+)\s*amb", t, re.I)
+                    m = _ITEM_AMBIENTES_RE.search(t)
                     if m: values["ambientes"] = m.group(1)
                 if not values["banos"]:
-                    m = re.search(r"(\d+)\s*bañ[oa]s?", t, re.I)
+                    m = _BANOS_RE.search(t)
                     if m: values["banos"] = m.group(1)
                 if not values["dormitorios"]:
-                    m = re.search(r"(\d+)\s*dorm", t, re.I)
+                    m = _ITEM_DORMITORIOS_RE.search(t)
                     if m: values["dormitorios"] = m.group(1)
                 if not values["estado"]:
-                    m = re.search(r"\b(A estrenar|Excelente estado|Muy buen estado|Buen estado|En construcción)\b", t, re.I)
+                    m = _ESTADO_RE.search(t)
                     if m: values["estado"] = m.group(1)
                 if not values["disposicion"]:
-                    m = re.search(r"\b(Frente|Contrafrente|Interno|Lateral)\b", t, re.I)
+                    m = _DISPOSICION_RE.search(t)
                     if m: values["disposicion"] = m.group(1)
                 if not values["orientacion"]:
-                    m = re.search(r"\b(Norte|Sur|Este|Oeste|NE|NO|SE|SO|^[NSEO]$)\b", t, re.I)
+                    m = _ITEM_ORIENTACION_RE.search(t)
                     if m: values["orientacion"] = m.group(1)
                 if not values["cocheras"]:
-                    m = re.search(r"(\d+)\s*coch\.?", t, re.I)
+                    m = _COCHERAS_RE.search(t)
                     if m: values["cocheras"] = m.group(1)
                 if not values["antiguedad"]:
-                    m = re.search(r"(\d+)\s*años?", t, re.I)
+                    m = _ANTIGUEDAD_RE.search(t)
                     if m: values["antiguedad"] = m.group(1)
                 if not values.get("luminosidad"):
-                    m = re.search(r"\b(Muy luminoso|Luminoso|Poco luminoso)\b", t, re.I)
+                    m = _LUMINOSIDAD_RE.search(t)
                     if m: values["luminosidad"] = m.group(1)
 
-            split_values = ScraperService._extract_split_detail_candidates(ScraperService._html_to_text(html))
+            split_values = ScraperService._extract_split_detail_candidates(document.html_text)
             for key, value in split_values.items():
                 if value and not values.get(key):
                     values[key] = value
@@ -1883,43 +2008,43 @@ class ScraperService:
                 return values
 
         # Fallback: texto plano del HTML
-        text = ScraperService._html_to_text(html)
-        lines = [re.sub(r"\s+", " ", line).strip() for line in text.splitlines()]
+        text = document.html_text
+        lines = [_WHITESPACE_RE.sub(" ", line).strip() for line in text.splitlines()]
         for line in lines:
             if not line:
                 continue
             if not values["metros_totales"]:
-                m = re.search(r"(\d+)\s*m[²2]\s*tot\.?", line, re.I)
+                m = _LINE_M2_TOTAL_RE.search(line)
                 if m: values["metros_totales"] = m.group(1)
             if not values["metros_cubiertos"]:
-                m = re.search(r"(\d+)\s*m[²2]\s*cub\.?", line, re.I)
+                m = _LINE_M2_CUBIERTOS_RE.search(line)
                 if m: values["metros_cubiertos"] = m.group(1)
             if not values["ambientes"]:
-                m = re.search(r"(\d+)\s*amb\.?", line, re.I)
+                m = _LINE_AMBIENTES_RE.search(line)
                 if m: values["ambientes"] = m.group(1)
             if not values["banos"]:
-                m = re.search(r"(\d+)\s*bañ[oa]s?", line, re.I)
+                m = _BANOS_RE.search(line)
                 if m: values["banos"] = m.group(1)
             if not values["dormitorios"]:
-                m = re.search(r"(\d+)\s*dorm\.?", line, re.I)
+                m = _LINE_DORMITORIOS_RE.search(line)
                 if m: values["dormitorios"] = m.group(1)
             if not values["estado"]:
-                m = re.search(r"\b(A estrenar|Excelente estado|Muy buen estado|Buen estado|En construcción)\b", line, re.I)
+                m = _ESTADO_RE.search(line)
                 if m: values["estado"] = m.group(1)
             if not values["disposicion"]:
-                m = re.search(r"\b(Frente|Contrafrente|Interno|Lateral)\b", line, re.I)
+                m = _DISPOSICION_RE.search(line)
                 if m: values["disposicion"] = m.group(1)
             if not values["orientacion"]:
-                m = re.search(r"\b(Norte|Sur|Este|Oeste|NE|NO|SE|SO)\b", line, re.I)
+                m = _LINE_ORIENTACION_RE.search(line)
                 if m: values["orientacion"] = m.group(1)
             if not values["cocheras"]:
-                m = re.search(r"(\d+)\s*coch\.?", line, re.I)
+                m = _COCHERAS_RE.search(line)
                 if m: values["cocheras"] = m.group(1)
             if not values["antiguedad"]:
-                m = re.search(r"(\d+)\s*años?", line, re.I)
+                m = _ANTIGUEDAD_RE.search(line)
                 if m: values["antiguedad"] = m.group(1)
             if not values.get("luminosidad"):
-                m = re.search(r"\b(Muy luminoso|Luminoso|Poco luminoso)\b", line, re.I)
+                m = _LUMINOSIDAD_RE.search(line)
                 if m: values["luminosidad"] = m.group(1)
         split_values = ScraperService._extract_split_detail_candidates(text)
         for key, value in split_values.items():
@@ -1953,7 +2078,7 @@ class ScraperService:
         seen_normalized: set[str] = set()
 
         for feature in features:
-            value = re.sub(r"\s+", " ", (feature or "")).strip(" -|:.,")
+            value = _WHITESPACE_RE.sub(" ", feature or "").strip(" -|:.,")
             if not value:
                 continue
             normalized = value.lower()
@@ -1966,23 +2091,23 @@ class ScraperService:
                 "departamentos", "propiedades",
             }:
                 continue
-            if re.search(r"\bdepartamentos?\s+en\s+venta\b", normalized):
+            if _FEAT_EN_VENTA_RE.search(normalized):
                 continue
-            if re.search(r"\b(?:san\s+crist[oó]bal|capital\s+federal|ver\s+datos)\b", normalized):
+            if _FEAT_LOCATION_NOISE_RE.search(normalized):
                 continue
-            if re.search(r"\b(publicado|actualizado|favorito|compartir|notas personales)\b", normalized):
+            if _FEAT_UI_NOISE_RE.search(normalized):
                 continue
-            if re.fullmatch(r"\d+(?:[.,]\d+)?", normalized):
+            if _NUMBER_RE.fullmatch(normalized):
                 continue
-            if re.search(r"\bdepartamento\b", normalized) and re.search(r"\bamb", normalized):
+            if _FEAT_DEPARTAMENTO_RE.search(normalized) and _FEAT_AMB_RE.search(normalized):
                 continue
-            if re.search(r"\b(?:av|avenida|calle|pasaje|pje|ruta|boulevard|blvd|bv)\b", normalized) and re.search(r"\d{3,5}", normalized):
+            if _FEAT_STREET_WORD_RE.search(normalized) and _FEAT_STREET_NUMBER_RE.search(normalized):
                 continue
-            if re.fullmatch(r"\d+\s+bañ[oa]s?", normalized):
+            if _FEAT_BANOS_RE.fullmatch(normalized):
                 continue
-            if re.fullmatch(r"\d+\s*m[²2]\s*(tot(?:ales?)?|cub(?:iertos?)?)?", normalized):
+            if _FEAT_SURFACE_RE.fullmatch(normalized):
                 continue
-            normalized = re.sub(r"^ambientes?\s+", "", normalized).strip()
+            normalized = _FEAT_AMBIENTES_PREFIX_RE.sub("", normalized).strip()
             if normalized in seen_normalized:
                 continue
             seen_normalized.add(normalized)